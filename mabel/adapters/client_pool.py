@@ -0,0 +1,106 @@
+"""
+Client Pool
+
+Creating storage clients is expensive, each client authenticates and creates its
+own connection pool, so rather than creating clients for each blob, clients are
+created once and shared by all of the readers and writers in the process.
+
+Clients are keyed by the credentials and endpoint they were created with, and are
+shared by all of the threads in the process, so the short-lived thread pools the
+readers create to prefetch and list blobs reuse the same clients and connections.
+
+Forked processes (e.g. the multiprocess Reader) start with an empty pool, the
+connections of the parent's clients can't be shared with the child.
+"""
+
+import os
+import threading
+from typing import Hashable
+
+_lock = threading.Lock()
+_gcs_clients: dict = {}
+_minio_clients: dict = {}
+
+
+def _key(value) -> Hashable:
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return id(value)
+
+
+def _get_gcs_entry(credentials):
+    from google.auth.credentials import AnonymousCredentials  # type:ignore
+    from google.cloud import storage  # type:ignore
+
+    emulator = os.environ.get("STORAGE_EMULATOR_HOST")
+    key = (emulator, None if emulator else _key(credentials))
+
+    with _lock:
+        if key not in _gcs_clients:
+            # this means we're testing
+            if emulator is not None:
+                client = storage.Client(credentials=AnonymousCredentials())
+            else:  # pragma: no cover
+                client = storage.Client(credentials=credentials)
+            # the client and its bucket handles
+            _gcs_clients[key] = (client, {})
+        return _gcs_clients[key]
+
+
+def get_gcs_client(credentials=None):
+    """
+    Get a Google Cloud Storage client, shared by all of the threads in the process.
+
+    When the `STORAGE_EMULATOR_HOST` environment variable is set, an anonymous
+    client is created for the emulator.
+    """
+    return _get_gcs_entry(credentials)[0]
+
+
+def get_gcs_bucket(bucket: str, credentials=None):
+    """
+    Get a handle for a Google Cloud Storage bucket, the handle is created without
+    a round trip to the service to retrieve the bucket's metadata.
+    """
+    client, buckets = _get_gcs_entry(credentials)
+    with _lock:
+        if bucket not in buckets:
+            buckets[bucket] = client.bucket(bucket)
+        return buckets[bucket]
+
+
+def get_minio_client(end_point: str, access_key: str, secret_key: str, secure: bool = True):
+    """
+    Get a MinIO client, shared by all of the threads in the process.
+    """
+    from minio import Minio  # type:ignore
+
+    key = (end_point, access_key, secret_key, bool(secure))
+    with _lock:
+        if key not in _minio_clients:
+            _minio_clients[key] = Minio(end_point, access_key, secret_key, secure=secure)
+        return _minio_clients[key]
+
+
+def clear():
+    """
+    Discard all of the pooled clients.
+    """
+    with _lock:
+        _gcs_clients.clear()
+        _minio_clients.clear()
+
+
+def _reset_after_fork():
+    # the lock may have been held by another thread when the process forked, so
+    # it's replaced rather than acquired
+    global _lock
+    _lock = threading.Lock()
+    _gcs_clients.clear()
+    _minio_clients.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from ...data.readers.internals.base_inner_reader import BUFFER_SIZE
 from ...data.readers.internals.base_inner_reader import BaseInnerReader
 
@@ -18,3 +20,11 @@ class DiskReader(BaseInnerReader):
     def get_blob_bytes(self, blob_name: str) -> bytes:
         with open(blob_name, "rb") as f:
             return f.read()
+
+    def get_blob_stream(self, blob_name: str):
+        return open(blob_name, "rb")
+
+    def get_blob_range(self, blob_name: str, start: int, end: Optional[int] = None) -> bytes:
+        with open(blob_name, "rb") as f:
+            f.seek(start)
+            return f.read(-1 if end is None else end - start)
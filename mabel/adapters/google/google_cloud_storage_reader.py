@@ -3,19 +3,24 @@ Google Cloud Storage Reader
 """
 
 import os
+from typing import Optional
 
+from mabel.adapters.client_pool import _key
+from mabel.adapters.client_pool import get_gcs_bucket
+from mabel.adapters.client_pool import get_gcs_client
 from mabel.data.readers.internals.base_inner_reader import BaseInnerReader
 from mabel.errors import MissingDependencyError
 from mabel.utils import paths
 
 try:
-    from google.auth.credentials import AnonymousCredentials  # type:ignore
     from google.cloud import storage  # type:ignore
 
     google_cloud_storage_installed = True
 except ImportError:  # pragma: no cover
     google_cloud_storage_installed = False
 
+STREAM_CHUNK_SIZE: int = 8 * 1024 * 1024  # 8Mb
+
 
 class GoogleCloudStorageReader(BaseInnerReader):
     def __init__(self, credentials=None, **kwargs):
@@ -26,38 +31,50 @@ class GoogleCloudStorageReader(BaseInnerReader):
 
         super().__init__(**kwargs)
         self.credentials = credentials
+        self.listing_cache_scope = (os.environ.get("STORAGE_EMULATOR_HOST"), _key(credentials))
 
     def get_blob_bytes(self, blob_name):
         bucket, object_path, name, extension = paths.get_parts(blob_name)
         blob = get_blob(
             bucket=bucket,
             blob_name=object_path + name + extension,
+            credentials=self.credentials,
         )
         stream = blob.download_as_bytes()
         return stream
 
+    def get_blob_stream(self, blob_name):
+        bucket, object_path, name, extension = paths.get_parts(blob_name)
+        blob = get_blob(
+            bucket=bucket,
+            blob_name=object_path + name + extension,
+            credentials=self.credentials,
+        )
+        # the blob is downloaded in chunks as it is consumed
+        return blob.open("rb", chunk_size=STREAM_CHUNK_SIZE)
+
+    def get_blob_range(self, blob_name: str, start: int, end: Optional[int] = None) -> bytes:
+        bucket, object_path, name, extension = paths.get_parts(blob_name)
+        blob = get_blob(
+            bucket=bucket,
+            blob_name=object_path + name + extension,
+            credentials=self.credentials,
+        )
+        # the end byte is inclusive
+        return blob.download_as_bytes(start=start, end=None if end is None else end - 1)
+
     def get_blobs_at_path(self, path):
         bucket, object_path, name, extension = paths.get_parts(path)
 
-        # this means we're testing
-        if os.environ.get("STORAGE_EMULATOR_HOST") is not None:
-            client = storage.Client(credentials=AnonymousCredentials())
-        else:  # pragma: no cover
-            client = storage.Client()
-
-        gcs_bucket = client.get_bucket(bucket)
+        client = get_gcs_client(self.credentials)
+        gcs_bucket = get_gcs_bucket(bucket, self.credentials)
         blobs = list(client.list_blobs(bucket_or_name=gcs_bucket, prefix=object_path))
 
         yield from [bucket + "/" + blob.name for blob in blobs if not blob.name.endswith("/")]
 
 
-def get_blob(bucket: str = None, blob_name: str = None):
-    # this means we're testing
-    if os.environ.get("STORAGE_EMULATOR_HOST") is not None:
-        client = storage.Client(credentials=AnonymousCredentials())
-    else:  # pragma: no cover
-        client = storage.Client()
-
-    gcs_bucket = client.get_bucket(bucket)
-    blob = gcs_bucket.get_blob(blob_name)
+def get_blob(bucket: str = None, blob_name: str = None, credentials=None):
+    # the blob handle is created without retrieving the blob's metadata
+    gcs_bucket = get_gcs_bucket(bucket, credentials)
+    blob = gcs_bucket.blob(blob_name)
     return blob
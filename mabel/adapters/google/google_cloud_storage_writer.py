@@ -1,8 +1,7 @@
-import os
-
 from orso.logging.create_logger import get_logger
 from urllib3.exceptions import ProtocolError  # type:ignore
 
+from mabel.adapters.client_pool import get_gcs_bucket
 from mabel.data.writers.internals.base_inner_writer import BaseInnerWriter
 from mabel.errors import MissingDependencyError
 
@@ -10,7 +9,6 @@ try:
     from google.api_core import retry  # type:ignore
     from google.api_core.exceptions import InternalServerError  # type:ignore
     from google.api_core.exceptions import TooManyRequests
-    from google.auth.credentials import AnonymousCredentials  # type:ignore
     from google.cloud import storage  # type:ignore
 
     google_cloud_storage_installed = True
@@ -27,6 +25,8 @@ class GoogleCloudStorageWriter(BaseInnerWriter):
 
         super().__init__(**kwargs)
         self.credentials = credentials
+        # the blob names don't include the bucket
+        self.filename = self.filename_without_bucket
 
         predicate = retry.if_exception_type(
             ConnectionResetError, ProtocolError, InternalServerError, TooManyRequests
@@ -34,13 +34,7 @@ class GoogleCloudStorageWriter(BaseInnerWriter):
         self.retry = retry.Retry(predicate)
 
     def commit(self, byte_data, override_blob_name=None):
-        # this means we're testing
-        if os.environ.get("STORAGE_EMULATOR_HOST") is not None:
-            client = storage.Client(credentials=AnonymousCredentials())
-        else:  # pragma: no cover
-            client = storage.Client(credentials=self.credentials)
-        self.gcs_bucket = client.get_bucket(self.bucket)
-        self.filename = self.filename_without_bucket
+        gcs_bucket = get_gcs_bucket(self.bucket, self.credentials)
 
         # if we've been given the filename, use that, otherwise get the
         # name from the path builder
@@ -50,7 +44,7 @@ class GoogleCloudStorageWriter(BaseInnerWriter):
             blob_name = self._build_path()
 
         try:
-            blob = self.gcs_bucket.blob(blob_name)
+            blob = gcs_bucket.blob(blob_name)
             self.retry(blob.upload_from_string)(byte_data, content_type="application/octet-stream")
             return blob_name
         except Exception as err:  # pragma: no cover
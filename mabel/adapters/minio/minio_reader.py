@@ -2,9 +2,11 @@
 MinIo Reader - also works with AWS
 """
 
+from typing import Optional
+
+from ...adapters.client_pool import get_minio_client
 from ...data.readers.internals.base_inner_reader import BaseInnerReader
 from ...errors import MissingDependencyError
-from ...utils import dates
 from ...utils import paths
 
 try:
@@ -31,19 +33,18 @@ class MinIoReader(BaseInnerReader):
 
         super().__init__(**kwargs)
         secure = kwargs.get("secure", True)
-        self.minio = Minio(end_point, access_key, secret_key, secure=secure)
+        self.minio = get_minio_client(end_point, access_key, secret_key, secure=secure)
+        self.listing_cache_scope = (end_point, access_key, secret_key, bool(secure))
 
     def get_blobs_at_path(self, path):
+        # the path has already had the dates applied, each date in the range is
+        # listed separately by get_list_of_blobs
         bucket, object_path, _, _ = paths.get_parts(path)
-        for cycle_date in dates.date_range(self.start_date, self.end_date):
-            cycle_path = paths.build_path(path=object_path, date=cycle_date)
-            blobs = self.minio.list_objects(bucket_name=bucket, prefix=cycle_path, recursive=True)
+        blobs = self.minio.list_objects(bucket_name=bucket, prefix=object_path, recursive=True)
 
-            yield from [
-                bucket + "/" + blob.object_name
-                for blob in blobs
-                if not blob.object_name.endswith("/")
-            ]
+        yield from [
+            bucket + "/" + blob.object_name for blob in blobs if not blob.object_name.endswith("/")
+        ]
 
     def get_blob_bytes(self, blob_name: str) -> bytes:
         try:
@@ -52,3 +53,20 @@ class MinIoReader(BaseInnerReader):
             return stream.read()
         finally:
             stream.close()
+
+    def get_blob_stream(self, blob_name: str):
+        bucket, object_path, name, extension = paths.get_parts(blob_name)
+        # the response is read from the network as it is consumed
+        return self.minio.get_object(bucket, object_path + name + extension)
+
+    def get_blob_range(self, blob_name: str, start: int, end: Optional[int] = None) -> bytes:
+        bucket, object_path, name, extension = paths.get_parts(blob_name)
+        # a length of zero reads to the end of the object
+        length = 0 if end is None else end - start
+        stream = self.minio.get_object(
+            bucket, object_path + name + extension, offset=start, length=length
+        )
+        try:
+            return stream.read()
+        finally:
+            stream.close()
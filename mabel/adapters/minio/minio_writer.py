@@ -1,5 +1,6 @@
 import io
 
+from ...adapters.client_pool import get_minio_client
 from ...data.writers.internals.base_inner_writer import BaseInnerWriter
 from ...errors import MissingDependencyError
 
@@ -21,7 +22,7 @@ class MinIoWriter(BaseInnerWriter):
             )
         super().__init__(**kwargs)
 
-        self.client = Minio(end_point, access_key, secret_key, secure=secure)
+        self.client = get_minio_client(end_point, access_key, secret_key, secure=secure)
         self.filename = self.filename_without_bucket
 
     def commit(self, byte_data, override_blob_name=None):
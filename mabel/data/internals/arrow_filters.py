@@ -0,0 +1,164 @@
+"""
+Vectorized evaluation of DNF filters against Arrow tables.
+
+The predicates are compiled to `pyarrow.compute` functions which create a boolean
+mask for the table, rather than being evaluated one record at a time. The results
+match `dnf_filters.evaluate`, in particular, a missing or null value never matches
+a predicate.
+
+Where a predicate can't be evaluated on the column it refers to (for example `like`
+on a numeric column) CannotVectorize is raised, callers are expected to fall back
+to evaluating the filters against each record.
+"""
+
+from typing import Union
+
+from mabel.errors import InvalidSyntaxError
+from mabel.errors import MissingDependencyError
+
+try:
+    import pyarrow  # type:ignore
+    import pyarrow.compute as pc  # type:ignore
+except ImportError:  # pragma: no cover
+    pyarrow = None  # type:ignore
+
+
+class CannotVectorize(Exception):
+    """
+    The filters can't be evaluated against the table, they need to be evaluated
+    against each record instead.
+    """
+
+
+# the operators which compare the column to a single value
+COMPARISONS = {
+    "=": "equal",
+    "==": "equal",
+    "is": "equal",
+    "!=": "not_equal",
+    "<>": "not_equal",
+    "<": "less",
+    ">": "greater",
+    "<=": "less_equal",
+    ">=": "greater_equal",
+}
+
+
+def _is_string(column):
+    return pyarrow.types.is_string(column.type) or pyarrow.types.is_large_string(column.type)
+
+
+def _is_list(column):
+    return pyarrow.types.is_list(column.type) or pyarrow.types.is_large_list(column.type)
+
+
+def _list_contains(column, value):
+    # find the list items which match and mark the rows they belong to
+    flattened = pc.list_flatten(column)
+    parents = pc.list_parent_indices(column)
+    matching_rows = pc.unique(pc.filter(parents, pc.equal(flattened, value)))
+    return pc.is_in(pyarrow.array(range(len(column)), type=parents.type), value_set=matching_rows)
+
+
+def _evaluate_predicate(predicate: tuple, table):
+    key, op, value = predicate
+    op = op.lower()
+
+    if key not in table.column_names:
+        return pyarrow.array([False] * table.num_rows, type=pyarrow.bool_())
+    column = table.column(key)
+    if column.num_chunks != 1:
+        column = column.combine_chunks()
+    else:
+        column = column.chunk(0)
+
+    if op in COMPARISONS:
+        if value is None:
+            return pyarrow.array([False] * table.num_rows, type=pyarrow.bool_())
+        mask = getattr(pc, COMPARISONS[op])(column, value)
+    elif op == "like":
+        if not _is_string(column) or not isinstance(value, str):
+            raise CannotVectorize(f"`like` can't be vectorized on `{column.type}`")
+        mask = pc.match_like(column, value, ignore_case=True)
+    elif op in ("matches", "~"):
+        if not _is_string(column) or not isinstance(value, str):
+            raise CannotVectorize(f"`{op}` can't be vectorized on `{column.type}`")
+        mask = pc.match_substring_regex(column, value)
+    elif op in ("in", "!in", "not in"):
+        if not isinstance(value, (list, tuple, set, frozenset)):
+            raise CannotVectorize(f"`{op}` can only be vectorized for collections")
+        mask = pc.is_in(column, value_set=pyarrow.array(list(value)))
+        if op != "in":
+            mask = pc.invert(mask)
+    elif op in ("contains", "!contains"):
+        if _is_string(column) and isinstance(value, str):
+            mask = pc.match_substring(column, value)
+        elif _is_list(column):
+            mask = _list_contains(column, value)
+        else:
+            raise CannotVectorize(f"`{op}` can't be vectorized on `{column.type}`")
+        if op != "contains":
+            mask = pc.invert(mask)
+    else:
+        raise InvalidSyntaxError(f"Unknown operator `{op}` in Filter")
+
+    # nulls never match, regardless of the operator
+    return pc.and_(pc.is_valid(column), pc.fill_null(mask, False))
+
+
+def evaluate(predicate: Union[tuple, list], table):
+    """
+    Create a boolean mask for the table from a DNF filter; predicates in the same
+    list are joined with an AND and adjacent lists are joined with an OR.
+    """
+    if pyarrow is None:  # pragma: no cover
+        raise MissingDependencyError(
+            "`pyarrow` is missing, please install or include in requirements.txt"
+        )
+
+    if isinstance(predicate, tuple):
+        try:
+            return _evaluate_predicate(predicate, table)
+        except (pyarrow.ArrowException, TypeError, ValueError) as err:
+            # usually the value is a different type to the column
+            raise CannotVectorize(f"`{predicate}` can't be vectorized - {err}") from err
+
+    if isinstance(predicate, list):
+        if all(isinstance(p, tuple) for p in predicate):
+            combine = pc.and_
+        elif all(isinstance(p, list) for p in predicate):
+            combine = pc.or_
+        else:
+            raise InvalidSyntaxError("Unable to evaluate Filter")  # pragma: no cover
+
+        mask = None
+        for part in predicate:
+            part_mask = evaluate(part, table)
+            mask = part_mask if mask is None else combine(mask, part_mask)
+        if mask is None:
+            return pyarrow.array([True] * table.num_rows, type=pyarrow.bool_())
+        return mask
+
+    raise InvalidSyntaxError("Unable to evaluate Filter")  # pragma: no cover
+
+
+def filter_table(dnf_filter, table):
+    """
+    Apply a DnfFilters to an Arrow table.
+    """
+    if dnf_filter.empty_filter:
+        return table
+    return table.filter(evaluate(dnf_filter.predicates, table))
+
+
+def row_numbers(mask, first_row: int = 0, numbers=None):
+    """
+    The numbers of the rows a mask selects, counting from `first_row` unless the
+    `numbers` of the rows are provided.
+    """
+    indices = pc.indices_nonzero(mask)
+    if numbers is not None:
+        return [numbers[index] for index in indices.to_pylist()]
+    if first_row:
+        indices = pc.add(indices, first_row)
+    return indices.to_pylist()
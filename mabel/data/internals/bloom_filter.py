@@ -0,0 +1,154 @@
+"""
+Bloom Filters
+
+A compact, probabilistic, record of the values in a column of a blob. The filter
+can say a value is definitely not in the blob, or that it might be. These are
+written by the BlobWriter to the manifests, with the zone maps, for the columns
+nominated with `bloom_on` and used by the Reader to skip blobs which don't
+contain values for equality (`=`, `==`) and `in` filters. Unlike zone maps, these
+are useful for high-cardinality columns, like identifiers.
+
+The filters are sized for the number of distinct values in the column, to have a
+false positive rate of about 1%, up to a maximum size. Values are hashed the same
+way as the secondary indexes, so values which are equal (e.g. 1 and 1.0) are
+treated as the same value.
+"""
+
+import base64
+import math
+from typing import Iterable
+from typing import Optional
+
+from bitarray import bitarray
+
+from mabel.data.internals.secondary_index import value_hash
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+FALSE_POSITIVE_RATE: float = 0.01
+# the filters are written to the manifests, large filters make manifests slow to read
+MAXIMUM_BITS: int = 8 * 1024 * 1024  # 1Mb
+MINIMUM_BITS: int = 64
+
+
+class BloomFilter:
+    __slots__ = ("bits", "hash_count")
+
+    def __init__(self, bits: bitarray, hash_count: int):
+        self.bits = bits
+        self.hash_count = hash_count
+
+    @classmethod
+    def create(cls, distinct_values: int, false_positive_rate: float = FALSE_POSITIVE_RATE):
+        """
+        Create an empty filter sized for a number of distinct values.
+        """
+        distinct_values = max(distinct_values, 1)
+        size = -distinct_values * math.log(false_positive_rate) / (math.log(2) ** 2)
+        size = min(max(int(math.ceil(size)), MINIMUM_BITS), MAXIMUM_BITS)
+        hash_count = max(1, int(round((size / distinct_values) * math.log(2))))
+        bits = bitarray(size)
+        bits.setall(0)
+        return cls(bits, hash_count)
+
+    @classmethod
+    def build(cls, values: Iterable) -> "BloomFilter":
+        """
+        Build a filter from the values in a column. Nulls aren't added.
+
+        Raises:
+            TypeError if any of the values can't be hashed
+        """
+        hashes = {value_hash(value) for value in values if value is not None}
+        bloom_filter = cls.create(len(hashes))
+        if numpy is None or len(hashes) == 0:  # pragma: no cover
+            for hashed in hashes:
+                bloom_filter._add_hash(hashed)
+            return bloom_filter
+
+        # set the bits for all of the values at once
+        size = len(bloom_filter.bits)
+        hashed = numpy.fromiter(hashes, dtype=numpy.uint64, count=len(hashes))
+        first = hashed & numpy.uint64(0xFFFFFFFF)
+        second = hashed >> numpy.uint64(32)
+        bits = numpy.zeros(size, dtype=numpy.bool_)
+        for i in range(bloom_filter.hash_count):
+            bits[(first + numpy.uint64(i) * second) % numpy.uint64(size)] = True
+        bloom_filter.bits = bitarray()
+        bloom_filter.bits.frombytes(numpy.packbits(bits).tobytes())
+        del bloom_filter.bits[size:]
+        return bloom_filter
+
+    def _positions(self, hashed: int):
+        # double hashing, using the two halves of the 64-bit hash
+        size = len(self.bits)
+        first = hashed & 0xFFFFFFFF
+        second = hashed >> 32
+        return ((first + i * second) % size for i in range(self.hash_count))
+
+    def _add_hash(self, hashed: int):
+        bits = self.bits
+        for position in self._positions(hashed):
+            bits[position] = 1
+
+    def add(self, value):
+        self._add_hash(value_hash(value))
+
+    def __contains__(self, value) -> bool:
+        """
+        False if the value definitely isn't in the filter, True if it might be.
+        """
+        try:
+            hashed = value_hash(value)
+        except TypeError:
+            # we don't know about values we can't hash
+            return True
+        bits = self.bits
+        return all(bits[position] for position in self._positions(hashed))
+
+    def false_positive_rate(self) -> float:
+        """
+        The estimated false positive rate, from the proportion of bits set.
+        """
+        return (self.bits.count(1) / len(self.bits)) ** self.hash_count
+
+    def excludes(self, op: str, value) -> bool:
+        """
+        Determine if the filter shows there are no values which match a predicate.
+        """
+        op = op.lower()
+        if value is None:
+            return False
+        if op in ("=", "=="):
+            return value not in self
+        if op == "in" and isinstance(value, (list, tuple, set, frozenset)):
+            return all(item is not None and item not in self for item in value)
+        return False
+
+    def to_dict(self) -> dict:
+        """
+        Convert the filter to a dictionary which can be written to a manifest.
+        """
+        return {
+            "size": len(self.bits),
+            "hashes": self.hash_count,
+            "bits": base64.b64encode(self.bits.tobytes()).decode(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Optional["BloomFilter"]:
+        """
+        Read a filter from a manifest, None if the filter can't be read.
+        """
+        try:
+            bits = bitarray()
+            bits.frombytes(base64.b64decode(data["bits"]))
+            del bits[data["size"] :]
+            if len(bits) != data["size"] or len(bits) == 0:
+                return None
+            return cls(bits, int(data["hashes"]))
+        except (KeyError, TypeError, ValueError):
+            return None
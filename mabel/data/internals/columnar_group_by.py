@@ -0,0 +1,382 @@
+"""
+ColumnarGroupBy
+
+An alternative to GroupBy which works on batches of records rather than a record
+at a time.
+
+The values in the group columns of each batch are factorised into integer codes
+(the first group seen is 0, the next new group is 1 and so on) and the results
+of the aggregations for each group are held in numpy arrays indexed by the code,
+so each aggregation is applied to a batch in a single numpy operation. Groups are
+identified by the string of their values, as GroupBy does, so the groups and their
+order are the same as GroupBy's (e.g. 1 and "1" are the same group, 1 and True
+aren't).
+
+Integers are summed as int64 and floats as float64, values which are neither (e.g.
+Decimals, or numeric strings) are summed as Decimals, as are all values when
+`decimals` is set. Sums which could overflow an int64 are also summed as Decimals.
+MIN and MAX work on any values which can be compared, and return the value with
+its type (e.g. an integer in a column which also has floats is returned as an
+integer).
+
+The groups are held in memory, if there are more groups than will fit in memory,
+use GroupBy which writes the groups to disk.
+"""
+
+import decimal
+
+from siphashc import siphash
+
+from mabel.data.internals.group_by import HASH_SEED
+from mabel.data.internals.group_by import _expand_aggregations
+from mabel.errors import MissingDependencyError
+
+try:
+    import numpy  # type:ignore
+except ImportError:  # pragma: no cover
+    numpy = None  # type:ignore
+
+BATCH_SIZE = 10000
+# sums which could be larger than this are summed as Decimals
+MAXIMUM_INTEGER = 2**62
+
+
+def _grow(array, capacity):
+    if capacity <= len(array):
+        return array
+    return numpy.concatenate((array, numpy.zeros(capacity - len(array), dtype=array.dtype)))
+
+
+def _kind(values):
+    # the type of the array to hold the values in
+    types = set(map(type, values))
+    if types <= {int, bool}:
+        return numpy.int64
+    if types <= {int, bool, float}:
+        return numpy.float64
+    return object
+
+
+def _exact_kind(values):
+    # the type of the array to hold values which need to keep their type
+    types = set(map(type, values))
+    if types == {int}:
+        return numpy.int64
+    if types == {float}:
+        return numpy.float64
+    return object
+
+
+def _to_decimal(value):
+    if isinstance(value, decimal.Decimal):
+        return value
+    return decimal.Decimal(value)
+
+
+class _Aggregation:
+    """
+    The results of an aggregation for each group, and the number of values which
+    have been aggregated for each group.
+    """
+
+    def __init__(self, function: str, decimals: bool = False):
+        self.function = function
+        # only SUM treats the values as Decimals
+        self.decimals = decimals and function == "SUM"
+        self.counts = numpy.zeros(0, dtype=numpy.int64)
+        self.values = numpy.zeros(0, dtype=object if self.decimals else numpy.int64)
+
+    def resize(self, groups: int):
+        if groups > len(self.counts):
+            capacity = max(groups, len(self.counts) * 2)
+            self.counts = _grow(self.counts, capacity)
+            self.values = _grow(self.values, capacity)
+
+    def _promote(self, dtype):
+        # change the type of the results, int64 -> float64 -> object
+        if self.values.dtype == dtype or self.values.dtype == object:
+            return
+        if dtype == object or self.values.dtype == numpy.int64:
+            self.values = self.values.astype(dtype)
+
+    def add(self, codes, values):
+        """
+        Aggregate a batch of values, `codes` are the groups the values are in.
+        """
+        if len(codes) == 0:
+            return
+        counts = numpy.bincount(codes, minlength=len(self.counts))
+        if self.function == "COUNT":
+            self.counts += counts
+            return
+
+        if self.function == "SUM":
+            kind = object if self.decimals else _kind(values)
+        else:
+            # MIN and MAX return the values, so they keep their types, values of
+            # different types are compared as Python values
+            kind = _exact_kind(values)
+            if not self.counts.any():
+                self.values = self.values.astype(kind)
+            elif kind != self.values.dtype:
+                kind = object
+        if kind != object and self.values.dtype != object:
+            try:
+                array = numpy.array(values, dtype=kind)
+            except OverflowError:
+                # integers too big for an int64
+                kind = object
+            else:
+                if (
+                    self.function == "SUM"
+                    and kind == numpy.int64
+                    and self.values.dtype == numpy.int64
+                    and int(numpy.abs(self.values).max(initial=0))
+                    + int(numpy.abs(array).max(initial=0)) * len(array)
+                    > MAXIMUM_INTEGER
+                ):
+                    kind = object
+
+        if kind != object and self.values.dtype != object:
+            self._promote(kind)
+            array = array.astype(self.values.dtype, copy=False)
+            if self.function == "SUM" and self.values.dtype == numpy.int64:
+                # bincount sums as float64, which loses precision for large
+                # integers, so integers are added at their group
+                numpy.add.at(self.values, codes, array)
+            elif self.function == "SUM":
+                self.values += numpy.bincount(codes, weights=array, minlength=len(self.counts))
+            else:
+                self._min_max(codes, array, counts)
+            self.counts += counts
+            return
+
+        # values numpy can't aggregate are aggregated one at a time
+        self._promote(object)
+        results = self.values
+        if self.function == "SUM":
+            for code, value in zip(codes.tolist(), values):
+                results[code] = _to_decimal(results[code]) + _to_decimal(value)
+        else:
+            compare = min if self.function == "MIN" else max
+            seen = self.counts.copy()
+            for code, value in zip(codes.tolist(), values):
+                if seen[code]:
+                    results[code] = compare(results[code], value)
+                else:
+                    results[code] = value
+                    seen[code] = 1
+        self.counts += counts
+
+    def _min_max(self, codes, array, counts):
+        if self.function == "MIN":
+            ufunc = numpy.minimum
+            fill = numpy.inf if array.dtype == numpy.float64 else numpy.iinfo(numpy.int64).max
+        else:
+            ufunc = numpy.maximum
+            fill = -numpy.inf if array.dtype == numpy.float64 else numpy.iinfo(numpy.int64).min
+        batch = numpy.full(len(self.counts), fill, dtype=array.dtype)
+        ufunc.at(batch, codes, array)
+        present = counts > 0
+        first = present & (self.counts == 0)
+        both = present & ~first
+        self.values[first] = batch[first]
+        self.values[both] = ufunc(self.values[both], batch[both])
+
+    def results(self, groups: int):
+        """
+        The results for each group, None for groups without any values.
+        """
+        if self.function == "COUNT":
+            values = self.counts[:groups].tolist()
+        else:
+            values = self.values[:groups].tolist()
+        return [
+            value if count else None for value, count in zip(values, self.counts[:groups].tolist())
+        ]
+
+
+class ColumnarGroupBy:
+    """
+    A GroupBy which aggregates batches of records with numpy, it has the same
+    methods as GroupBy.
+
+    Parameters:
+        dictset: iterable
+            The records to group.
+        columns: string or iterable
+            The column, or columns, to group by.
+        decimals: boolean (optional)
+            Sum the values as Decimals, like GroupBy does, rather than as integers
+            or floats, defaults to False.
+        batch_size: integer (optional)
+            The number of records to aggregate at a time.
+    """
+
+    def __init__(self, dictset, columns, decimals: bool = False, batch_size: int = BATCH_SIZE):
+        if numpy is None:  # pragma: no cover
+            raise MissingDependencyError(
+                "`numpy` is missing, please install or include in requirements.txt"
+            )
+        self._dictset = dictset
+        if isinstance(columns, (list, set, tuple)):
+            self._columns = tuple(columns)
+        else:
+            self._columns = (columns,)
+        self._decimals = decimals
+        self._batch_size = batch_size
+        # the code for each group key, and the values of each group
+        self._codes: dict = {}
+        self._groups: list = []
+
+    def _batches(self):
+        batch = []
+        for record in self._dictset:
+            batch.append(record if isinstance(record, dict) else record.as_dict())
+            if len(batch) >= self._batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _factorise(self, batch):
+        """
+        Convert the values in the group columns to the code for the group.
+        """
+        columns = self._columns
+        # the same key as GroupBy, the strings of the values, missing values are
+        # empty strings
+        if len(columns) == 1:
+            column = columns[0]
+            keys = [str(record[column]) if column in record else "" for record in batch]
+        else:
+            keys = [
+                "".join([str(record[column]) if column in record else "" for column in columns])
+                for record in batch
+            ]
+        codes = self._codes
+        groups = self._groups
+        result = []
+        for key, record in zip(keys, batch):
+            code = codes.get(key)
+            if code is None:
+                # the values of the group are the values of the first record in it
+                code = codes[key] = len(groups)
+                groups.append({column: record.get(column) for column in columns})
+            result.append(code)
+        return numpy.array(result, dtype=numpy.int64)
+
+    def aggregate(self, aggregations):
+        """
+        Aggregate the records in each group.
+
+        Parameters:
+            aggregations: tuple or list of tuples
+                The aggregations to perform, as (FUNCTION, column) tuples, e.g.
+                ("MAX", "value"), the functions are COUNT, SUM, MIN, MAX and AVG.
+
+        Yields:
+            Dictionary
+        """
+        requested_aggs, aggregations = _expand_aggregations(aggregations)
+        accumulators = {
+            f"{func}({col})": (col, _Aggregation(func, self._decimals))
+            for func, col in aggregations
+            if func != "AVG"
+        }
+
+        for batch in self._batches():
+            codes = self._factorise(batch)
+            groups = len(self._codes)
+            columns: dict = {}
+            for column, accumulator in accumulators.values():
+                accumulator.resize(groups)
+                if column == "*":
+                    accumulator.add(codes, None)
+                    continue
+                if column not in columns:
+                    # the values, and their groups, excluding nulls
+                    values = [record.get(column) for record in batch]
+                    valid = [i for i, value in enumerate(values) if value is not None]
+                    if len(valid) < len(values):
+                        columns[column] = (codes[valid], [values[i] for i in valid])
+                    else:
+                        columns[column] = (codes, values)
+                accumulator.add(*columns[column])
+
+        groups = len(self._codes)
+        results = {
+            key: accumulator.results(groups) for key, (column, accumulator) in accumulators.items()
+        }
+        for func, col in requested_aggs:
+            if func == "AVG":
+                results[f"AVG({col})"] = [
+                    None if count is None else total / count
+                    for total, count in zip(results[f"SUM({col})"], results[f"COUNT({col})"])
+                ]
+
+        # groups are only returned if they have values for any of the aggregations
+        present = numpy.zeros(groups, dtype=numpy.bool_)
+        for column, accumulator in accumulators.values():
+            present |= accumulator.counts[:groups] > 0
+
+        # the groups are in the order of the hashes of the groups, the same order as
+        # GroupBy
+        keys = list(self._codes)
+        order = sorted(
+            (code for code in range(groups) if present[code]),
+            key=lambda code: siphash(HASH_SEED, keys[code]),
+        )
+        for code in order:
+            record = {
+                f"{func}({col})": results[f"{func}({col})"][code] for func, col in requested_aggs
+            }
+            record.update(self._groups[code])
+            yield record
+
+    def max(self, columns):
+        """
+        Get the maximum value of a column, or set of columns, in each group.
+        """
+        if not isinstance(columns, (tuple, list, set)):
+            columns = [columns]
+        return self.aggregate([("MAX", column) for column in columns])
+
+    def min(self, columns):
+        """
+        Get the minimum value of a column, or set of columns, in each group.
+        """
+        if not isinstance(columns, (tuple, list, set)):
+            columns = [columns]
+        return self.aggregate([("MIN", column) for column in columns])
+
+    def sum(self, columns):
+        """
+        Get the sum of values in a column, or set of columns, in each group.
+        """
+        if not isinstance(columns, (tuple, list, set)):
+            columns = [columns]
+        return self.aggregate([("SUM", column) for column in columns])
+
+    def count(self):
+        """
+        Count the number of items in each group.
+        """
+        return self.aggregate(("COUNT", "*"))
+
+    def average(self, columns):
+        """
+        Calculate the average of the items in a group.
+        """
+        if not isinstance(columns, (tuple, list, set)):
+            columns = [columns]
+        return self.aggregate([("AVG", column) for column in columns])
+
+    def groups(self):
+        """
+        Return the set of groups - this is similar to a DISTINCT function
+        """
+        for batch in self._batches():
+            self._factorise(batch)
+        for group in self._groups:
+            yield dict(group)
@@ -41,9 +41,15 @@ from mabel.data.internals.dnf_filters import DnfFilters
 from mabel.data.internals.dumb_iterator import DumbIterator
 from mabel.data.internals.expression import Expression
 from mabel.data.internals.group_by import GroupBy
+from mabel.data.internals.sorting import external_sort
+from mabel.data.internals.sorting import sort_key
+from mabel.data.internals.sorting import top_k
+from mabel.data.internals.storage_classes import StorageClassColumnar
 from mabel.data.internals.storage_classes import StorageClassCompressedMemory
 from mabel.data.internals.storage_classes import StorageClassDisk
 from mabel.data.internals.storage_classes import StorageClassMemory
+from mabel.data.internals.storage_classes import get_row_codec
+from mabel.errors import InvalidArgument
 from mabel.errors import MissingDependencyError
 from mabel.utils.ipython import is_running_from_ipython
 
@@ -64,12 +70,17 @@ class STORAGE_CLASS(int, Enum):
       memory but still needs to perform compression on the data so isn't as fast
       as the MEMORY option. Bench marks show you can fit about 2x the data in
       memory but at a cost of 2.5x - your results will vary.
+    - COLUMNAR = load the entire dataset into memory as an Arrow table, this
+      usually uses less memory than MEMORY and aggregations (sum, min, max, mean,
+      distinct and sort_and_take) are vectorized, but iterating over the records
+      is slower as they are converted back to dictionaries.
     """
 
     NO_PERSISTANCE = 1
     MEMORY = 2
     DISK = 3
     COMPRESSED_MEMORY = 4
+    COLUMNAR = 5
 
 
 class DictSet(object):
@@ -78,6 +89,8 @@ class DictSet(object):
         iterator: Iterable[Dict[Any, Any]],
         *,
         storage_class=STORAGE_CLASS.NO_PERSISTANCE,
+        row_codec: str = "json",
+        compression: str = "lz4",
     ):
         """
         Create a DictSet.
@@ -90,9 +103,20 @@ class DictSet(object):
                 NO_PERSISTANCE which applies no specific persistance. MEMORY loads
                 into a Python `list`, DISK saves to disk - disk persistance is slower
                 but can handle much larger data sets. 'COMPRESSED_MEMORY' uses
-                compression to fit more in memory for a performance cost.
+                compression to fit more in memory for a performance cost. COLUMNAR
+                loads into an Arrow table.
+            row_codec: string (optional)
+                How DISK and COMPRESSED_MEMORY convert records to bytes, the default
+                is 'json'. 'msgpack' is faster and Decimals, datetimes, dates, times,
+                timedeltas and bytes keep their types.
+            compression: string (optional)
+                How COMPRESSED_MEMORY compresses records, the default is 'lz4'.
+                'zstd' is slower but compresses more and 'zstd_dictionary' trains a
+                dictionary on the first records to improve the compression.
         """
         self.storage_class = storage_class
+        self.row_codec = row_codec
+        self.compression = compression
         self._iterator = iterator
         self._temporary_folder = None
 
@@ -102,11 +126,17 @@ class DictSet(object):
 
         # if we're persisting to disk, save it
         if storage_class == STORAGE_CLASS.DISK:
-            self._iterator = StorageClassDisk(iterator)
+            self._iterator = StorageClassDisk(iterator, codec=get_row_codec(row_codec))
 
         # if we're persisiting to compressed memory, do it
         if storage_class == STORAGE_CLASS.COMPRESSED_MEMORY:
-            self._iterator = StorageClassCompressedMemory(iterator)
+            self._iterator = StorageClassCompressedMemory(
+                iterator, codec=get_row_codec(row_codec), compression=compression
+            )
+
+        # if we're persisting to columns, load into an Arrow table
+        if storage_class == STORAGE_CLASS.COLUMNAR:
+            self._iterator = StorageClassColumnar(iterator)
 
         if not hasattr(self._iterator, "__iter__"):  # pragma:no cover
             self._iterator = DumbIterator(self._iterator)
@@ -144,7 +174,12 @@ class DictSet(object):
                 if random_value % selector == 0:
                     yield row
 
-        return DictSet(inner_sampler(iter(self._iterator)), storage_class=self.storage_class)
+        return DictSet(
+            inner_sampler(iter(self._iterator)),
+            storage_class=self.storage_class,
+            row_codec=self.row_codec,
+            compression=self.compression,
+        )
 
     def collect_list(self, key: str = None) -> Union[list, map]:
         """
@@ -164,6 +199,8 @@ class DictSet(object):
 
         if not key:
             return list(asdic(iter(self._iterator)))
+        if self.storage_class == STORAGE_CLASS.COLUMNAR:
+            return self._iterator.collect_list(key)
         return [record[key] for record in iter(self._iterator) if key in record]
 
     def keys(self, number_of_rows: int = 0):
@@ -203,6 +240,8 @@ class DictSet(object):
             key: string
                 The column to perform the function on
         """
+        if self.storage_class == STORAGE_CLASS.COLUMNAR:
+            return self._iterator.min_max(key)[1]
         return reduce(max, self.collect_list(key))
 
     def sum(self, key: str):
@@ -213,6 +252,8 @@ class DictSet(object):
             key: string
                 The column to perform the function on
         """
+        if self.storage_class == STORAGE_CLASS.COLUMNAR:
+            return self._iterator.sum(key)
         return reduce(lambda x, y: x + y, self.collect_list(key), 0)
 
     def min(self, key: str):
@@ -223,6 +264,8 @@ class DictSet(object):
             key: string
                 The column to perform the function on
         """
+        if self.storage_class == STORAGE_CLASS.COLUMNAR:
+            return self._iterator.min_max(key)[0]
         return reduce(min, self.collect_list(key))
 
     def min_max(self, key: str):
@@ -236,6 +279,8 @@ class DictSet(object):
         Returns:
             tuple (minimum, maximum)
         """
+        if self.storage_class == STORAGE_CLASS.COLUMNAR:
+            return self._iterator.min_max(key)
 
         def minmax(a, b):
             return min(a[0], b[0]), max(a[1], b[1])
@@ -250,6 +295,8 @@ class DictSet(object):
             key: string
                 The column to perform the function on
         """
+        if self.storage_class == STORAGE_CLASS.COLUMNAR:
+            return self._iterator.mean(key)
         return statistics.mean(self.collect_list(key))
 
     def variance(self, key: str):
@@ -290,6 +337,11 @@ class DictSet(object):
         Optionally accepts a list of columns, which we extract out and just
         'distinct' on these, ignoring differences in any of the other columns.
         """
+        if self.storage_class == STORAGE_CLASS.COLUMNAR:
+            table = self._iterator.distinct(columns)
+            if table is not None:
+                return DictSet(table, storage_class=STORAGE_CLASS.COLUMNAR)
+
         hash_list = {}
 
         def do_dedupe(data):
@@ -306,12 +358,36 @@ class DictSet(object):
                     yield item
                     hash_list[hashed_item] = True
 
-        return DictSet(do_dedupe(iter(self._iterator)), storage_class=self.storage_class)
+        return DictSet(
+            do_dedupe(iter(self._iterator)),
+            storage_class=self.storage_class,
+            row_codec=self.row_codec,
+            compression=self.compression,
+        )
 
-    def group_by(self, group_by_columns):
+    def group_by(self, group_by_columns, engine: str = "rows", decimals: bool = False):
         """
         Group a dictset by a column or group of columns. Returns a GroupBy object.
-        """
+
+        Parameters:
+            group_by_columns: string or iterable
+                The column, or columns, to group by
+            engine: string (optional)
+                'rows' (the default) aggregates a record at a time and can hold more
+                groups than fit in memory, 'columnar' aggregates batches of records
+                with numpy, which is faster but the groups must fit in memory
+            decimals: boolean (optional)
+                For the 'columnar' engine, sum values as Decimals, as the 'rows'
+                engine does, rather than as integers or floats
+        """
+        if engine == "columnar":
+            from mabel.data.internals.columnar_group_by import ColumnarGroupBy
+
+            return ColumnarGroupBy(iter(self._iterator), group_by_columns, decimals=decimals)
+        if engine != "rows":
+            raise InvalidArgument(
+                f"Unknown GroupBy engine `{engine}`, expected 'rows' or 'columnar'"
+            )
         return GroupBy(iter(self._iterator), group_by_columns)
 
     def collect_set(self, column, dedupe: bool = False):
@@ -327,7 +403,11 @@ class DictSet(object):
 
         # if there's no direct access to items, cycle through them
         # yielding the items we want
-        if self.storage_class in (STORAGE_CLASS.DISK, STORAGE_CLASS.COMPRESSED_MEMORY):
+        if self.storage_class in (
+            STORAGE_CLASS.DISK,
+            STORAGE_CLASS.COMPRESSED_MEMORY,
+            STORAGE_CLASS.COLUMNAR,
+        ):
             for r in self._iterator._inner_reader(*locations):
                 yield r
             return
@@ -386,7 +466,12 @@ class DictSet(object):
         Return the first _items_ number of items from the _DictSet_. This loads
         these items into memory. If returning a large number of items, use itake.
         """
-        return DictSet(self.itake(items), storage_class=self.storage_class)
+        return DictSet(
+            self.itake(items),
+            storage_class=self.storage_class,
+            row_codec=self.row_codec,
+            compression=self.compression,
+        )
 
     def itake(self, items: int):
         """
@@ -424,6 +509,8 @@ class DictSet(object):
             return DictSet(
                 inner_filter_where(iter(self._iterator)),
                 storage_class=self.storage_class,
+                row_codec=self.row_codec,
+                compression=self.compression,
             )
 
         # DNF filtering
@@ -432,6 +519,8 @@ class DictSet(object):
             return DictSet(
                 DnfFilters.filter_dictset(filter_set, iter(self._iterator)),
                 storage_class=self.storage_class,
+                row_codec=self.row_codec,
+                compression=self.compression,
             )
 
         # function filtering
@@ -445,6 +534,8 @@ class DictSet(object):
             return DictSet(
                 inner_filter_callable(filters, iter(self._iterator)),
                 storage_class=self.storage_class,
+                row_codec=self.row_codec,
+                compression=self.compression,
             )
 
     @property
@@ -482,35 +573,49 @@ class DictSet(object):
                 for record in it:
                     yield {k: record.get(k, None) for k in columns}
 
-        return DictSet(inner_select(iter(self._iterator)), storage_class=self.storage_class)
+        return DictSet(
+            inner_select(iter(self._iterator)),
+            storage_class=self.storage_class,
+            row_codec=self.row_codec,
+            compression=self.compression,
+        )
 
     def sort_and_take(self, column, take: int = 5000, descending: bool = False):
-        def safety_key(column):
-            # this returns a tuple where the first element is a boolean, and the
-            # second item is the value
-            return lambda x: (
-                x.get(column) is not None,
-                x.get(column),
-            )
+        """
+        The first `take` records ordered by a column, records without a value for
+        the column are first when ascending and last when descending.
 
-        if self.storage_class == STORAGE_CLASS.MEMORY:
-            yield from sorted(self._iterator, key=safety_key(column), reverse=descending)[:take]
+        In a low-memory environment we probably can't store all of the records in
+        memory, but if we're only interested in, say the top 10, then we only need
+        to store that many in memory at any one time, the records are collected
+        with a heap.
+        """
+        if self.storage_class == STORAGE_CLASS.COLUMNAR:
+            yield from self._iterator.sort_and_take(column, take, descending).to_pylist()
+        else:
+            yield from top_k(iter(self._iterator), column, take, descending)
 
+    def sort(self, column, descending: bool = False):
+        """
+        Order all of the records by a column, records without a value for the
+        column are first when ascending and last when descending.
+
+        Unless the DictSet is persisted in memory, the records are sorted in runs
+        which are written to disk and merged, so the records don't need to fit in
+        memory.
+        """
+        if self.storage_class == STORAGE_CLASS.COLUMNAR:
+            records = self.sort_and_take(column, self.count(), descending)
+        elif self.storage_class == STORAGE_CLASS.MEMORY:
+            records = iter(sorted(self._iterator, key=sort_key(column), reverse=descending))
         else:
-            # In a low-memory environment we probably can't store all of the records
-            # into memory, but if we're only interested in, say the top 10, then we
-            # only need to store about that many in memory at any one time. This
-            # implementation stores double and one records in memory as it collects
-            # and sorts them.
-            double_cache = max(take * 2, 1) + 1
-            cache = []
-            for record in iter(self._iterator):
-                cache.append(record)
-                if len(cache) > double_cache:
-                    cache.sort(key=safety_key(column), reverse=descending)
-                    del cache[take:]
-            cache.sort(key=safety_key(column), reverse=descending)
-            yield from cache[:take]
+            records = external_sort(iter(self._iterator), column, descending)
+        return DictSet(
+            records,
+            storage_class=self.storage_class,
+            row_codec=self.row_codec,
+            compression=self.compression,
+        )
 
     def __getitem__(self, columns):
         """
@@ -3,6 +3,9 @@ This is a filtering mechanism to be applied when reading data.
 """
 
 import operator
+import re
+from functools import partial
+from typing import Callable
 from typing import Iterable
 from typing import List
 from typing import Optional
@@ -10,6 +13,7 @@ from typing import Tuple
 from typing import Union
 
 from mabel.errors import InvalidSyntaxError
+from mabel.utils.text import _sql_like_fragment_to_regex
 from mabel.utils.text import like
 from mabel.utils.text import matches
 
@@ -75,8 +79,89 @@ def evaluate(predicate: Union[tuple, list], record: dict) -> bool:
     raise InvalidSyntaxError("Unable to evaluate Filter")  # pragma: no cover
 
 
+def _compile_predicate(key, op, value) -> Callable:
+    op = op.lower()
+    function = OPERATORS[op]
+
+    # the operators with literals we can prepare once, rather than for each record
+    if op == "like" and isinstance(value, str):
+        pattern = _sql_like_fragment_to_regex(value.lower())
+
+        def _like(record):
+            record_value = record.get(key, None)
+            return record_value is not None and pattern.match(str(record_value).lower())
+
+        return _like
+
+    if op in ("matches", "~") and isinstance(value, str):
+        pattern = re.compile(value)
+
+        def _matches(record):
+            record_value = record.get(key, None)
+            return record_value is not None and pattern.search(record_value) != None
+
+        return _matches
+
+    if op in ("in", "!in", "not in") and isinstance(value, (list, tuple, set, frozenset)):
+        candidates = tuple(value)
+        try:
+            lookup = frozenset(candidates)
+        except TypeError:
+            lookup = candidates
+        expected = op == "in"
+
+        def _in(record):
+            record_value = record.get(key, None)
+            if record_value is None:
+                return False
+            try:
+                return (record_value in lookup) == expected
+            except TypeError:
+                # unhashable values can't be looked up in the set
+                return (record_value in candidates) == expected
+
+        return _in
+
+    def _predicate(record):
+        record_value = record.get(key, None)
+        return record_value is not None and function(record_value, value)
+
+    return _predicate
+
+
+def compile_filter(predicate: Union[tuple, list]) -> Callable:
+    """
+    Compile a DNF filter to a function which is called with each record, this
+    has the same result as `evaluate` but the structure of the filter is only
+    interpretted once, rather than for every record.
+    """
+    if isinstance(predicate, tuple):
+        key, op, value = predicate
+        return _compile_predicate(key, op, value)
+
+    if isinstance(predicate, list):
+        if all(isinstance(p, tuple) for p in predicate):
+            combine = all
+        elif all(isinstance(p, list) for p in predicate):
+            combine = any
+        else:
+            raise InvalidSyntaxError("Unable to evaluate Filter")
+
+        parts = tuple(compile_filter(p) for p in predicate)
+        if len(parts) == 1:
+            return parts[0]
+        if len(parts) == 2:
+            first, second = parts
+            if combine is all:
+                return lambda record: bool(first(record) and second(record))
+            return lambda record: bool(first(record) or second(record))
+        return lambda record: combine(part(record) for part in parts)
+
+    raise InvalidSyntaxError("Unable to evaluate Filter")
+
+
 class DnfFilters:
-    __slots__ = ("empty_filter", "predicates")
+    __slots__ = ("empty_filter", "predicates", "_evaluator")
 
     def __init__(self, filters: Optional[List[Tuple[str, str, object]]] = None):
         """
@@ -104,6 +189,15 @@ class DnfFilters:
         """
         self.empty_filter = filters is None
         self.predicates = filters if filters else []
+        try:
+            self._evaluator = compile_filter(self.predicates)
+        except (InvalidSyntaxError, KeyError, ValueError, TypeError, AttributeError):
+            # malformed filters raise errors when they're evaluated
+            self._evaluator = partial(evaluate, self.predicates)
+
+    def __reduce__(self):
+        # the compiled filter can't be pickled, so it's recompiled
+        return (DnfFilters, (None if self.empty_filter else self.predicates,))
 
     def filter_dictset(self, dictset: Iterable[dict]) -> Iterable:
         """
@@ -119,7 +213,7 @@ class DnfFilters:
         if self.empty_filter:
             yield from dictset
         else:
-            yield from (record for record in dictset if evaluate(self.predicates, record))
+            yield from filter(self._evaluator, dictset)
 
     def __call__(self, record) -> bool:
-        return evaluate(self.predicates, record)
+        return self._evaluator(record)
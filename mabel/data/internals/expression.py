@@ -15,11 +15,25 @@ expression tree as it's only doing boolean logic.
 
 Derived from: https://gist.github.com/leehsueh/1290686
 """
+from functools import partial
+
 from mabel.data.readers.internals.inline_evaluator import *
 from mabel.utils.dates import parse_iso
+from mabel.utils.text import _sql_like_fragment_to_regex
 from mabel.utils.token_labeler import OPERATORS
 from mabel.utils.token_labeler import TOKENS
 from mabel.utils.token_labeler import Tokenizer
+from mabel.utils.token_labeler import interpret_value as interpret_literal
+
+# the types of the nodes which are literal values
+CONSTANTS = (
+    TOKENS.INTEGER,
+    TOKENS.FLOAT,
+    TOKENS.LITERAL,
+    TOKENS.BOOLEAN,
+    TOKENS.NULL,
+    TOKENS.DATE,
+)
 
 
 class InvalidExpression(BaseException):
@@ -44,6 +58,7 @@ class Expression(object):
     def __init__(self, exp):
         self.tokenizer = Tokenizer(exp)
         self.parse()
+        self._evaluator = self.compile(self.root)
 
     def parse(self):
         self.root = self.parse_expression()
@@ -208,11 +223,122 @@ class Expression(object):
 
         return parse_iso(value) or value
 
+    def __getstate__(self):
+        # the compiled expression can't be pickled, so it's recompiled
+        state = self.__dict__.copy()
+        state.pop("_evaluator", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._evaluator = self.compile(self.root)
+
     def evaluate(self, variable_dict):
-        return self.evaluate_recursive(self.root, variable_dict)
+        return self._evaluator(variable_dict)
 
     def __call__(self, variable_dict):
-        return self.evaluate_recursive(self.root, variable_dict)
+        return self._evaluator(variable_dict)
+
+    def compile(self, treeNode):
+        """
+        Compile the expression tree to a function which is called with each record,
+        this has the same result as `evaluate_recursive` but the tree is only walked
+        once, rather than for every record.
+        """
+        if treeNode is None:
+            return partial(self.evaluate_recursive, treeNode)
+
+        if treeNode.token_type in CONSTANTS:
+            value = treeNode.value
+            return lambda variable_dict: value
+
+        if treeNode.token_type == TOKENS.VARIABLE:
+            name = treeNode.value
+            if name[0] == name[-1] == "`":
+                name = name[1:-1]
+            interpret_value = self.interpret_value
+
+            def _variable(variable_dict):
+                if name in variable_dict:
+                    return interpret_value(variable_dict[name])
+                return None
+
+            return _variable
+
+        if treeNode.token_type == TOKENS.NOT and treeNode.left is not None:
+            left = self.compile(treeNode.left)
+            return lambda variable_dict: not left(variable_dict)
+
+        if treeNode.token_type == TOKENS.AND:
+            left = self.compile(treeNode.left)
+            right = self.compile(treeNode.right)
+            return lambda variable_dict: left(variable_dict) and right(variable_dict)
+
+        if treeNode.token_type == TOKENS.OR:
+            left = self.compile(treeNode.left)
+            right = self.compile(treeNode.right)
+            return lambda variable_dict: left(variable_dict) or right(variable_dict)
+
+        if treeNode.token_type == TOKENS.OPERATOR and treeNode.value in OPERATORS:
+            return self._compile_operator(treeNode)
+
+        # anything else is interpretted, which raises the same errors as before
+        return partial(self.evaluate_recursive, treeNode)
+
+    def _compile_operator_dynamic(self, treeNode, left, function):
+        right = self.compile(treeNode.right)
+
+        def _operator(variable_dict):
+            left_value = left(variable_dict)
+            right_value = right(variable_dict)
+            try:
+                return function(left_value, right_value)
+            except (TypeError, ValueError):
+                return None
+
+        return _operator
+
+    def _compile_operator(self, treeNode):
+        left = self.compile(treeNode.left)
+        function = OPERATORS[treeNode.value]
+
+        if treeNode.right is None or treeNode.right.token_type not in CONSTANTS:
+            return self._compile_operator_dynamic(treeNode, left, function)
+
+        # the right side is a literal, so we can prepare it once, rather than for
+        # each record
+        value = treeNode.right.value
+        if treeNode.value in ("LIKE", "NOT LIKE") and isinstance(value, str):
+            pattern = _sql_like_fragment_to_regex(value.lower())
+            if treeNode.value == "LIKE":
+                function = lambda x, y: pattern.match(str(x).lower())
+            else:
+                function = lambda x, y: not pattern.match(str(x).lower())
+        elif treeNode.value == "IN" and isinstance(value, list):
+            try:
+                candidates = [interpret_literal(i) for i in value if str(i).strip() != ","]
+            except (TypeError, ValueError):
+                return self._compile_operator_dynamic(treeNode, left, function)
+            try:
+                lookup = frozenset(candidates)
+            except TypeError:
+                lookup = candidates
+
+            def function(x, y):
+                try:
+                    return x in lookup
+                except TypeError:
+                    # unhashable values can't be looked up in the set
+                    return x in candidates
+
+        def _literal_operator(variable_dict):
+            left_value = left(variable_dict)
+            try:
+                return function(left_value, value)
+            except (TypeError, ValueError):
+                return None
+
+        return _literal_operator
 
     def evaluate_recursive(self, treeNode, variable_dict):
         if treeNode.token_type in (
@@ -6,9 +6,13 @@ will be effective:
 python setup.py build_ext --inplace
 """
 from collections import defaultdict
+from itertools import chain
 
 from siphashc import siphash
 
+from mabel.data.internals.storage_classes import StorageClassDisk
+from mabel.data.internals.storage_classes import get_spill_codec
+
 
 def summer(x, y):
     import decimal
@@ -26,10 +30,82 @@ AGGREGATORS = {
 }
 
 HASH_SEED = b"Anakin Skywalker"
+# the column the partial results of aggregations are held in
+PARTIAL_RESULTS = "$partial"
+
+# the number of groups held in memory, when there are more groups than this the
+# groups are written to disk
+MAXIMUM_GROUPS_IN_MEMORY = 1000000
+# groups written to disk are partitioned on the high bits of their hash, so the
+# partitions are in the same order as the hashes
+SPILL_PARTITION_BITS = 6
+
+
+def _partition(group_key) -> int:
+    if not isinstance(group_key, int):
+        return 0
+    return group_key >> (64 - SPILL_PARTITION_BITS)
+
+
+def _merge(func, existing, value):
+    # combine two partial results for the same group, following the same rules as
+    # when the values are aggregated
+    if func == "COUNT":
+        return (existing or 0) + value
+    if existing is None:
+        return value
+    if value is None:
+        return existing
+    return AGGREGATORS[func](existing, value)
+
+
+def _expand_aggregations(aggregations):
+    if not isinstance(aggregations, list):
+        aggregations = [aggregations]
+    aggregations = list(aggregations)
+    if not all(isinstance(agg, tuple) for agg in aggregations):
+        raise ValueError("`aggregate` expects a list of Tuples")
+
+    requested_aggs = aggregations.copy()
+
+    # averages need the sum and the count
+    for func, col in requested_aggs:
+        if func == "AVG":
+            # only once, aggregating the same column twice would double count it
+            aggregations += [
+                agg for agg in (("SUM", col), ("COUNT", col)) if agg not in aggregations
+            ]
+
+    return requested_aggs, aggregations
+
+
+def partial_aggregator(columns, aggregations):
+    """
+    Create a reducer which aggregates a set of records (e.g. a blob in the Reader)
+    into a record for each group, with the partial results of the aggregations.
+
+    The partial results are combined with `GroupBy.aggregate_partials`, AVG is
+    collected as a SUM and a COUNT so the partial results can be combined.
+    """
+
+    def reducer(records):
+        grouper = GroupBy(records, columns)
+        requested_aggs, collected_aggs = _expand_aggregations(aggregations)
+        for collector in grouper._collect(collected_aggs):
+            for group, results in collector.items():
+                record = dict(grouper._group_keys[group])
+                record[PARTIAL_RESULTS] = results
+                yield record
+
+    return reducer
 
 
 class TooManyGroups(Exception):
-    pass
+    """
+    Deprecated - this is no longer raised, groups beyond `max_groups` are spilled
+    to disk instead. It's kept so code which handles it can still import it, and
+    will be removed in a future version.
+    """
 
 
 class GroupBy:
@@ -38,15 +114,24 @@ class GroupBy:
     calculating the aggregations. This was implemented like this so that generators
     can be aggregated - we have one opportunity to cycle of the records, and if the
     data is in a generator, there's a chance the dataset doesn't fit in memory.
+
+    If there are more than `max_groups` groups, the groups aggregated so far are
+    written to disk, partitioned by the hash of the group, and the aggregation
+    continues with an empty set of groups. When all of the records have been read,
+    each partition is read back and the results for each group are combined. Only
+    one partition of groups is held in memory at a time.
     """
 
-    def __init__(self, dictset, columns):
+    def __init__(self, dictset, columns, max_groups: int = MAXIMUM_GROUPS_IN_MEMORY):
         self._dictset = dictset
         if isinstance(columns, (list, set, tuple)):
             self._columns = tuple(columns)
         else:
             self._columns = [columns]
         self._group_keys = {}
+        self._max_groups = max_groups
+        # the groups written to disk, a list of runs for each partition
+        self._spilled = None
 
     def _map(self, collect_columns):
         """
@@ -85,10 +170,6 @@ class GroupBy:
                 self._group_keys[group_key] = [
                     (column, record.get(column)) for column in self._columns
                 ]
-                if len(self._group_keys) >= 4999999:
-                    raise TooManyGroups(
-                        f"Groups are not selective enough and too many Groups have been found (stopped at {len(self._group_keys)})."
-                    )
 
             for column in collect_columns:
                 if column == "*":
@@ -108,25 +189,51 @@ class GroupBy:
         This isn't intended for internal use only, but if you know how, you can
         call it.
         """
+        requested_aggs, aggregations = _expand_aggregations(aggregations)
+        for collector in self._collect(aggregations):
+            yield from self._expand(collector, requested_aggs)
 
-        if not isinstance(aggregations, list):
-            aggregations = [aggregations]
-        if not all(isinstance(agg, tuple) for agg in aggregations):
-            raise ValueError("`aggregate` expects a list of Tuples")
-
-        requested_aggs = aggregations.copy()
+    def aggregate_partials(self, aggregations):
+        """
+        Combine partial aggregations, created by `partial_aggregator` (e.g. for
+        each blob in the Reader), into the final aggregations.
 
-        # averages need the sum and the count
-        for func, col in aggregations:
-            if func == "AVG":
-                aggregations += [("SUM", col), ("COUNT", col)]
+        The records are the groups from each partial aggregation, the results
+        for each group are combined so the result is the same as aggregating all
+        of the records at once.
+        """
+        requested_aggs, aggregations = _expand_aggregations(aggregations)
+        for collector in self._collect(aggregations, partials=True):
+            yield from self._expand(collector, requested_aggs)
 
-        columns_to_collect = {col for func, col in aggregations}
+    def _collect(self, aggregations, partials: bool = False):
+        """
+        Aggregate the records, yielding the results for the groups in the order of
+        the hashes of the groups - if the groups were written to disk, this is
+        each partition in turn, otherwise all of the groups at once.
+        """
+        functions = {f"{func}({col})": func for func, col in aggregations}
+        if partials:
+            columns_to_collect = {PARTIAL_RESULTS}
+        else:
+            columns_to_collect = {col for func, col in aggregations}
 
         collector = defaultdict(dict)
         # Iterate through the data in the groups formatted by the mapper. This data
         # is a list of Tuples of (GroupID, Column Name, Value)
         for record in self._map(columns_to_collect):
+            # If we have too many groups, write them to disk and start again
+            if record[0] not in collector and len(collector) >= self._max_groups:
+                self._spill(collector, keep=record[0])
+                collector = defaultdict(dict)
+
+            if partials:
+                # the value is the results of a partial aggregation of the group
+                existing = collector[record[0]]
+                for key, value in record[2].items():
+                    existing[key] = _merge(functions.get(key), existing.get(key), value)
+                continue
+
             # For each aggregation, we need to perform the function against the
             # values as they come in - the collector holds the result up to this
             # point in the set.
@@ -142,11 +249,9 @@ class GroupBy:
                 # the aggregation works by performing a simple calculation on
                 # the last known value and the value currently seen. This means
                 # we don't need a full copy of the data in memory.
-                if existing:
-                    if value or func == "COUNT":
-                        value = AGGREGATORS[func](existing, value)
-                    else:
-                        value = existing
+                # (nulls aren't collected, so zeros are aggregated like any value)
+                if existing is not None:
+                    value = AGGREGATORS[func](existing, value)
                 elif func == "COUNT":
                     # the COUNT needs seeding with 1, the next cycles are just
                     # adding 1 to the last value.
@@ -155,11 +260,60 @@ class GroupBy:
                 # update the collector with the latest value
                 collector[record[0]][key] = value
 
-        # the order of the resulting data set is the order of the hashes - this
-        # will appear random, but will ensure the order is consistent between
-        # reruns.
-        collector = dict(sorted(collector.items()))
+        if self._spilled is None:
+            # the order of the resulting data set is the order of the hashes - this
+            # will appear random, but will ensure the order is consistent between
+            # reruns.
+            yield dict(sorted(collector.items()))
+            return
+
+        self._spill(collector)
+        yield from self._read_spilled(functions)
 
+    def _spill(self, collector, keep=None):
+        """
+        Write the groups to disk, ordered by partition, recording where each
+        partition starts so the partitions can be read back separately.
+        """
+        if self._spilled is None:
+            self._spilled = []
+        partitions = [[] for i in range(1 << SPILL_PARTITION_BITS)]
+        for group, results in collector.items():
+            partitions[_partition(group)].append((group, self._group_keys[group], results))
+        bounds = [0]
+        for entries in partitions:
+            bounds.append(bounds[-1] + len(entries))
+        run = StorageClassDisk(chain(*partitions), codec=get_spill_codec())
+        self._spilled.append((run, bounds))
+
+        # forget the groups, except for the one we're in the middle of
+        keys = self._group_keys.get(keep)
+        self._group_keys.clear()
+        if keys is not None:
+            self._group_keys[keep] = keys
+
+    def _read_spilled(self, functions):
+        """
+        Read each partition of groups from disk, combining the results for each
+        group, in the order of the hashes.
+        """
+        for partition in range(1 << SPILL_PARTITION_BITS):
+            collector: dict = {}
+            self._group_keys = {}
+            for run, bounds in self._spilled:
+                for group, keys, results in run[bounds[partition] : bounds[partition + 1]]:
+                    existing = collector.get(group)
+                    if existing is None:
+                        collector[group] = results
+                        self._group_keys[group] = keys
+                        continue
+                    for key, value in results.items():
+                        existing[key] = _merge(functions.get(key), existing.get(key), value)
+            yield dict(sorted(collector.items()))
+        # release the runs, this removes the files
+        self._spilled = []
+
+    def _expand(self, collector, requested_aggs):
         # We now need to expand out the hashed column names
         for group, results in collector.items():
             for func, col in requested_aggs:
@@ -247,8 +401,18 @@ class GroupBy:
         """
         Return the set of groups - this is similar to a DISTINCT function
         """
-        collector = defaultdict(dict)
         for record in self._map("*"):
-            collector[record[0]] = 1
-        for group in self._group_keys:
-            yield dict(self._group_keys[group])
+            if len(self._group_keys) > self._max_groups:
+                self._spill(
+                    {group: {} for group in self._group_keys if group != record[0]},
+                    keep=record[0],
+                )
+        if self._spilled is None:
+            for group in self._group_keys:
+                yield dict(self._group_keys[group])
+            return
+
+        self._spill({group: {} for group in self._group_keys})
+        for partition in self._read_spilled({}):
+            for group in partition:
+                yield dict(self._group_keys[group])
@@ -0,0 +1,59 @@
+"""
+Row Offsets
+
+The byte offset of the start of each line in a blob of JSON lines. These are
+written by the BlobWriter to an index file alongside the blob (the name of the
+blob with `.idx` appended) and used by the Reader to resume reading from a cursor
+part way through a blob, by seeking to the row rather than reading and discarding
+all of the rows before it.
+
+The offsets are stored as unsigned 64-bit little-endian integers.
+"""
+
+import sys
+from array import array
+from typing import Optional
+
+ROW_OFFSETS_EXTENSION: str = ".idx"
+
+
+def index_name(blob_name: str) -> str:
+    """
+    The name of the row offsets index for a blob.
+    """
+    return blob_name + ROW_OFFSETS_EXTENSION
+
+
+def serialize(offsets: array) -> bytes:
+    """
+    Convert the offsets to bytes to be written to an index file.
+    """
+    if sys.byteorder != "little":  # pragma: no cover
+        offsets = array("Q", offsets)
+        offsets.byteswap()
+    return offsets.tobytes()
+
+
+def deserialize(data: bytes) -> Optional[array]:
+    """
+    Convert the contents of an index file to offsets, None if the file isn't a
+    row offsets index.
+    """
+    if len(data) % 8 != 0:
+        return None
+    offsets = array("Q")
+    offsets.frombytes(data)
+    if sys.byteorder != "little":  # pragma: no cover
+        offsets.byteswap()
+    return offsets
+
+
+def seek_to_row(stream, offsets: array, row: int):
+    """
+    Move a stream to the start of a row, if the row is after the last row the
+    stream is moved to the end.
+    """
+    if row < len(offsets):
+        stream.seek(offsets[row])
+    else:
+        stream.seek(0, 2)
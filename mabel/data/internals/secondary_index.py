@@ -0,0 +1,180 @@
+"""
+Secondary Indexes
+
+Indexes on nominated columns of each blob, mapping a hash of each value in the
+column to the rows the value is in. These are written by the BlobWriter to index
+files alongside the blob (e.g. `blob.jsonl.user_id.idx`) when the writer is
+created with `index_on`, and used by the Reader to only read the rows which can
+match equality (`=`, `==`) and `in` filters.
+
+The index is a list of (hash, row) pairs sorted by the hash, so the rows for a
+value are found with a binary search. Different values can have the same hash, so
+the rows found can include rows which don't match, the filters are always applied
+to the rows which are read.
+
+Only strings and numbers are indexed, if any of the values in a column of a blob
+are other types (e.g. lists) the column isn't indexed for that blob.
+"""
+
+import decimal
+import sys
+from array import array
+from bisect import bisect_left
+from bisect import bisect_right
+from typing import Callable
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Union
+
+from orso.cityhash import CityHash64
+
+SECONDARY_INDEX_EXTENSION: str = ".idx"
+INDEXED_OPERATORS = ("=", "==", "in")
+
+
+def index_name(blob_name: str, column: str) -> str:
+    """
+    The name of the index on a column of a blob.
+    """
+    return f"{blob_name}.{column}{SECONDARY_INDEX_EXTENSION}"
+
+
+def value_hash(value) -> int:
+    """
+    Hash a value for the index, values which are equal have the same hash (e.g. 1,
+    1.0 and True).
+
+    Raises:
+        TypeError if the value can't be indexed
+    """
+    if isinstance(value, decimal.Decimal):
+        value = int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if isinstance(value, (int, float)):
+        # bools are ints
+        return CityHash64(f"n:{int(value) if isinstance(value, bool) else value!r}")
+    if isinstance(value, str):
+        return CityHash64(f"s:{value}")
+    raise TypeError(f"Values of type `{type(value).__name__}` can't be indexed")
+
+
+class SecondaryIndex:
+    __slots__ = ("hashes", "rows")
+
+    def __init__(self, hashes: array, rows: array):
+        self.hashes = hashes
+        self.rows = rows
+
+    @classmethod
+    def build(cls, values: Iterable) -> "SecondaryIndex":
+        """
+        Build an index from the values of a column, in row order. Nulls aren't
+        indexed.
+
+        Raises:
+            TypeError if any of the values can't be indexed
+        """
+        entries = sorted(
+            (value_hash(value), row) for row, value in enumerate(values) if value is not None
+        )
+        return cls(array("Q", (h for h, r in entries)), array("Q", (r for h, r in entries)))
+
+    def lookup(self, value) -> List[int]:
+        """
+        The rows which may contain a value, in row order.
+        """
+        try:
+            hashed = value_hash(value)
+        except TypeError:
+            return []
+        start = bisect_left(self.hashes, hashed)
+        end = bisect_right(self.hashes, hashed, lo=start)
+        return sorted(self.rows[start:end])
+
+    def serialize(self) -> bytes:
+        """
+        Convert the index to bytes to be written to an index file, the number of
+        entries, the hashes then the rows, as unsigned 64-bit little-endian
+        integers.
+        """
+        header = array("Q", [len(self.hashes)])
+        data = [header, self.hashes, self.rows]
+        if sys.byteorder != "little":  # pragma: no cover
+            data = [array("Q", part) for part in data]
+            for part in data:
+                part.byteswap()
+        return b"".join(part.tobytes() for part in data)
+
+    @classmethod
+    def deserialize(cls, data: bytes) -> Optional["SecondaryIndex"]:
+        """
+        Read an index file, None if the file isn't a secondary index.
+        """
+        values = array("Q")
+        if len(data) < 8 or len(data) % 8 != 0:
+            return None
+        values.frombytes(data)
+        if sys.byteorder != "little":  # pragma: no cover
+            values.byteswap()
+        entries = values[0]
+        if len(values) != 1 + (2 * entries):
+            return None
+        return cls(values[1 : 1 + entries], values[1 + entries :])
+
+
+def _predicate_rows(predicate: tuple, get_index: Callable) -> Optional[Set[int]]:
+    key, op, value = predicate
+    op = op.lower()
+    if op not in INDEXED_OPERATORS or value is None:
+        return None
+    if op == "in" and not isinstance(value, (list, tuple, set, frozenset)):
+        return None
+    index = get_index(key)
+    if index is None:
+        return None
+    if op == "in":
+        return {row for item in value for row in index.lookup(item)}
+    return set(index.lookup(value))
+
+
+def rows_for_filter(predicates: Union[tuple, list], get_index: Callable) -> Optional[Set[int]]:
+    """
+    Use the indexes to find the rows which can match a DNF filter.
+
+    Parameters:
+        predicates: tuple or list
+            The DNF filter
+        get_index: callable
+            Called with the name of a column, returns the index on the column or
+            None if the column isn't indexed
+
+    Returns:
+        The set of rows which can match the filter, or None if the indexes can't
+        be used to find the rows (all of the rows need to be read)
+    """
+    if isinstance(predicates, tuple):
+        return _predicate_rows(predicates, get_index)
+
+    if isinstance(predicates, list) and len(predicates) > 0:
+        # ANDs - the rows in all of the indexed predicates
+        if all(isinstance(p, tuple) for p in predicates):
+            found = None
+            for predicate in predicates:
+                rows = _predicate_rows(predicate, get_index)
+                if rows is not None:
+                    found = rows if found is None else found & rows
+            return found
+        # ORs - the rows in any of the predicates, all of them must be indexed
+        if all(isinstance(p, list) for p in predicates):
+            found = set()
+            for predicate in predicates:
+                rows = rows_for_filter(predicate, get_index)
+                if rows is None:
+                    return None
+                found |= rows
+            return found
+
+    return None
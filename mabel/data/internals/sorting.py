@@ -0,0 +1,86 @@
+"""
+Sorting
+
+Sorting DictSets which may not fit in memory.
+
+The first `take` records are found with a heap, so only `take` records are held in
+memory. Sorting all of the records is done with an external merge sort, the records
+are read in runs which are sorted in memory and written to disk, the sorted runs
+are then merged. If there is only one run, it isn't written to disk.
+
+Records are ordered by the value in a column, records without a value (None or no
+column) are before the other records when sorting ascending and after them when
+sorting descending. Records with the same value keep the order they were read in.
+"""
+
+import heapq
+from itertools import islice
+from typing import Iterable
+from typing import Iterator
+
+from mabel.data.internals.storage_classes import StorageClassDisk
+from mabel.data.internals.storage_classes import get_spill_codec
+
+# the number of records sorted in memory and written to disk as a run
+RUN_SIZE = 100000
+# the number of runs merged at the same time, each run being merged has a file open
+MERGE_WIDTH = 64
+
+
+def sort_key(column: str):
+    # this returns a tuple where the first element is a boolean, and the second item
+    # is the value, so records without a value are sorted together
+    def key(record):
+        value = record.get(column)
+        return (value is not None, value)
+
+    return key
+
+
+def top_k(records: Iterable[dict], column: str, take: int, descending: bool = False) -> list:
+    """
+    The first `take` records ordered by a column.
+    """
+    if descending:
+        return heapq.nlargest(take, records, key=sort_key(column))
+    return heapq.nsmallest(take, records, key=sort_key(column))
+
+
+def external_sort(
+    records: Iterable[dict],
+    column: str,
+    descending: bool = False,
+    run_size: int = RUN_SIZE,
+) -> Iterator[dict]:
+    """
+    All of the records ordered by a column, using no more than `run_size` records
+    of memory to sort.
+    """
+    key = sort_key(column)
+    records = iter(records)
+
+    run = sorted(islice(records, run_size), key=key, reverse=descending)
+    if len(run) < run_size:
+        # everything fit in memory
+        yield from run
+        return
+
+    # the records in the runs need to sort the same way they did before they were
+    # written, so the values need to keep their types
+    codec = get_spill_codec()
+    runs = []
+    while run:
+        runs.append(StorageClassDisk(run, codec=codec))
+        run = sorted(islice(records, run_size), key=key, reverse=descending)
+
+    # merge the runs in groups so we don't have too many files open
+    while len(runs) > MERGE_WIDTH:
+        runs = [
+            StorageClassDisk(
+                heapq.merge(*runs[i : i + MERGE_WIDTH], key=key, reverse=descending),
+                codec=codec,
+            )
+            for i in range(0, len(runs), MERGE_WIDTH)
+        ]
+
+    yield from heapq.merge(*runs, key=key, reverse=descending)
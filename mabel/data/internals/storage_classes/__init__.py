@@ -1,4 +1,7 @@
 from .base_storage_class import BaseStorageClass
+from .row_codecs import get_row_codec
+from .row_codecs import get_spill_codec
+from .storage_class_columnar import StorageClassColumnar
 from .storage_class_compressed_memory import StorageClassCompressedMemory
 from .storage_class_disk import StorageClassDisk
 from .storage_class_memory import StorageClassMemory
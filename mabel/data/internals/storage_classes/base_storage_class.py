@@ -1,12 +1,13 @@
-import decimal
 from abc import ABC
 
-import orjson
+from .row_codecs import JsonCodec
 
 
 class BaseStorageClass(ABC):
     iterator = None
     length = -1
+    # how records are converted to bytes, for the storage classes which do
+    codec = JsonCodec()
 
     def __init__(self, iterator):
         raise NotImplementedError()
@@ -25,14 +26,3 @@ class BaseStorageClass(ABC):
 
     def __len__(self):
         return self.length
-
-    def parse_json(self, ds):
-        return orjson.loads(ds)
-
-    def dump_json(self, ds):
-        def handler(obj):
-            if isinstance(obj, decimal.Decimal):
-                return str(obj)
-            raise TypeError
-
-        return orjson.dumps(ds, default=handler)
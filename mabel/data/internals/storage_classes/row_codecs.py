@@ -0,0 +1,147 @@
+"""
+Row Codecs
+
+How the DISK and COMPRESSED_MEMORY storage classes convert records to bytes.
+
+- json = the default, records are converted to JSON. Values which JSON doesn't
+  have types for are converted to strings (e.g. Decimals) so don't survive being
+  persisted.
+- msgpack = records are converted to MessagePack, this is usually faster than JSON
+  and Decimal, datetime, date, time, timedelta and bytes values are returned as
+  the same types they were persisted as. This needs `ormsgpack` to be installed.
+"""
+
+import datetime
+import decimal
+
+import orjson
+
+from mabel.errors import InvalidArgument
+from mabel.errors import MissingDependencyError
+
+# the msgpack extension types for the values msgpack doesn't have types for
+EXT_DECIMAL = 1
+EXT_DATETIME = 2
+EXT_DATE = 3
+EXT_TIME = 4
+EXT_TIMEDELTA = 5
+
+_ENCODERS = {
+    decimal.Decimal: lambda value: (EXT_DECIMAL, str(value)),
+    datetime.datetime: lambda value: (EXT_DATETIME, value.isoformat()),
+    datetime.date: lambda value: (EXT_DATE, value.isoformat()),
+    datetime.time: lambda value: (EXT_TIME, value.isoformat()),
+    datetime.timedelta: lambda value: (
+        EXT_TIMEDELTA,
+        f"{value.days}:{value.seconds}:{value.microseconds}",
+    ),
+}
+
+
+def _timedelta(value: str) -> datetime.timedelta:
+    days, seconds, microseconds = (int(part) for part in value.split(":"))
+    return datetime.timedelta(days=days, seconds=seconds, microseconds=microseconds)
+
+
+_DECODERS = {
+    EXT_DECIMAL: decimal.Decimal,
+    EXT_DATETIME: datetime.datetime.fromisoformat,
+    EXT_DATE: datetime.date.fromisoformat,
+    EXT_TIME: datetime.time.fromisoformat,
+    EXT_TIMEDELTA: _timedelta,
+}
+
+
+class JsonCodec:
+    name = "json"
+    # written after each record by the DISK storage class, so the file is JSON lines
+    terminator = b"\n"
+
+    def encode(self, value) -> bytes:
+        def handler(obj):
+            if isinstance(obj, decimal.Decimal):
+                return str(obj)
+            raise TypeError
+
+        return orjson.dumps(value, default=handler)
+
+    def decode(self, data):
+        return orjson.loads(data)
+
+
+class MsgPackCodec:
+    name = "msgpack"
+    terminator = b""
+
+    def __init__(self):
+        try:
+            import ormsgpack  # type:ignore
+        except ImportError:  # pragma: no cover
+            raise MissingDependencyError(
+                "`ormsgpack` is missing, please install or include in requirements.txt"
+            )
+        self.ormsgpack = ormsgpack
+        self.options = ormsgpack.OPT_PASSTHROUGH_DATETIME | ormsgpack.OPT_NON_STR_KEYS
+
+    def _default(self, obj):
+        # look up the exact type first, it's faster than the isinstance checks
+        encoder = _ENCODERS.get(type(obj))
+        if encoder is None:
+            # datetimes are dates, so check for them first
+            for kind in (
+                decimal.Decimal,
+                datetime.datetime,
+                datetime.date,
+                datetime.time,
+                datetime.timedelta,
+            ):
+                if isinstance(obj, kind):
+                    encoder = _ENCODERS[kind]
+                    break
+            else:
+                raise TypeError(f"Type `{type(obj).__name__}` can't be persisted")
+        code, value = encoder(obj)
+        return self.ormsgpack.Ext(code, value.encode())
+
+    @staticmethod
+    def _ext_hook(code, data):
+        decoder = _DECODERS.get(code)
+        if decoder is None:
+            raise ValueError(f"Unknown MessagePack extension type `{code}`")
+        return decoder(data.decode())
+
+    def encode(self, value) -> bytes:
+        return self.ormsgpack.packb(value, default=self._default, option=self.options)
+
+    def decode(self, data):
+        return self.ormsgpack.unpackb(data, ext_hook=self._ext_hook)
+
+
+ROW_CODECS = {"json": JsonCodec, "msgpack": MsgPackCodec}
+
+
+def get_row_codec(name: str):
+    """
+    Get a codec by name.
+
+    Raises:
+        InvalidArgument if the codec isn't known
+    """
+    codec = ROW_CODECS.get(str(name).lower())
+    if codec is None:
+        raise InvalidArgument(
+            f"Unknown row codec `{name}`, expected one of {', '.join(ROW_CODECS)}"
+        )
+    return codec()
+
+
+def get_spill_codec():
+    """
+    Get the codec for records written to disk part way through an operation (e.g.
+    sorting), msgpack if it's installed as it keeps the types of the values (e.g.
+    Decimals) so the records are the same when they're read back.
+    """
+    try:
+        return MsgPackCodec()
+    except MissingDependencyError:  # pragma: no cover
+        return JsonCodec()
@@ -0,0 +1,192 @@
+"""
+StorageClassColumnar is a helper class for persisting DictSets locally, it is the
+backend for the COLUMNAR variation of the STORAGE CLASSES.
+
+The records are held in memory as an Arrow table, strings are dictionary encoded so
+repeated values (e.g. usernames) are only held once. This usually needs a fraction
+of the memory of a list of dictionaries and, because the data doesn't need to be
+parsed for each pass, aggregations (sum, min, max, mean, distinct and sorting) are
+performed by Arrow rather than by iterating over the records.
+
+Records are converted to dictionaries when they are iterated over, columns which
+are missing from some records are returned as None for those records.
+"""
+
+from typing import Iterable
+from typing import List
+from typing import Optional
+
+from mabel.errors import InvalidDataSetError
+from mabel.errors import MissingDependencyError
+
+from . import BaseStorageClass
+
+try:
+    import pyarrow  # type:ignore
+    import pyarrow.compute as pc  # type:ignore
+except ImportError:  # pragma: no cover
+    pyarrow = None  # type:ignore
+
+BATCH_SIZE = 10000
+
+
+def _is_string(column_type):
+    return pyarrow.types.is_string(column_type) or pyarrow.types.is_large_string(column_type)
+
+
+def _encode_strings(table):
+    # dictionary encode the string columns, each distinct string is held once
+    for index, field in enumerate(table.schema):
+        if _is_string(field.type):
+            table = table.set_column(index, field.name, pc.dictionary_encode(table.column(index)))
+    return table
+
+
+def _to_table(records: List[dict]):
+    if not records:
+        return pyarrow.table({})
+    # converting to a struct array collects the keys from all of the records, not
+    # just the first
+    try:
+        return _encode_strings(pyarrow.Table.from_struct_array(pyarrow.array(records)))
+    except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError) as err:
+        raise InvalidDataSetError(
+            f"Unable to store records in COLUMNAR storage, columns must have consistent types - {err}"
+        ) from err
+
+
+class StorageClassColumnar(BaseStorageClass):
+    """
+    This provides the reader for the COLUMNAR variation of STORAGE.
+    """
+
+    def __init__(self, iterable):
+        if pyarrow is None:  # pragma: no cover
+            raise MissingDependencyError(
+                "`pyarrow` is missing, please install or include in requirements.txt"
+            )
+
+        self.iterator = None
+
+        # we can be handed an Arrow table (e.g. the result of an operation on
+        # another columnar DictSet)
+        if isinstance(iterable, pyarrow.Table):
+            self.table = iterable
+            self.length = iterable.num_rows
+            return
+
+        tables = []
+        batch: list = []
+        for item in iterable:
+            batch.append(item if isinstance(item, dict) else item.as_dict())
+            if len(batch) >= BATCH_SIZE:
+                tables.append(_to_table(batch))
+                batch = []
+        if batch or not tables:
+            tables.append(_to_table(batch))
+
+        try:
+            table = pyarrow.concat_tables(tables, promote_options="permissive")
+        except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError) as err:
+            raise InvalidDataSetError(
+                f"Unable to store records in COLUMNAR storage, columns must have consistent types - {err}"
+            ) from err
+        # the batches are encoded separately, share a single dictionary per column
+        self.table = table.unify_dictionaries()
+        self.length = self.table.num_rows
+
+    def _inner_reader(self, *locations):
+        if locations:
+            yield from self.table.take(pyarrow.array(locations, type=pyarrow.int64())).to_pylist()
+        else:
+            for batch in self.table.to_batches(max_chunksize=BATCH_SIZE):
+                yield from batch.to_pylist()
+
+    def __iter__(self):
+        self.iterator = iter(self._inner_reader())
+        return self.iterator
+
+    def __next__(self):
+        if not self.iterator:
+            self.iterator = iter(self._inner_reader())
+        return next(self.iterator)
+
+    def __len__(self):
+        return self.length
+
+    def column(self, key: str):
+        """
+        Get a column, dictionary encoded columns are decoded. None if the column
+        doesn't exist.
+        """
+        if key not in self.table.column_names:
+            return None
+        column = self.table.column(key)
+        if pyarrow.types.is_dictionary(column.type):
+            column = column.cast(column.type.value_type)
+        return column
+
+    def collect_list(self, key: str) -> list:
+        column = self.table.column(key) if key in self.table.column_names else None
+        if column is None:
+            return []
+        return column.to_pylist()
+
+    def sum(self, key: str):
+        column = self.column(key)
+        if column is None:
+            return 0
+        result = pc.sum(column).as_py()
+        return 0 if result is None else result
+
+    def min_max(self, key: str):
+        column = self.column(key)
+        if column is None or column.null_count == len(column):
+            raise TypeError(f"No values in column `{key}` to compare")
+        result = pc.min_max(column).as_py()
+        return result["min"], result["max"]
+
+    def mean(self, key: str):
+        column = self.column(key)
+        if column is None or column.null_count == len(column):
+            raise ValueError(f"No values in column `{key}` to average")
+        return pc.mean(column).as_py()
+
+    def distinct(self, columns: Optional[Iterable[str]] = None):
+        """
+        The first record for each distinct set of values in the columns, in the
+        order they were added. None if the columns can't be compared (e.g. they
+        contain lists).
+        """
+        columns = list(columns or self.table.column_names)
+        missing = [c for c in columns if c not in self.table.column_names]
+        if missing:
+            # the columns which don't exist are the same for all records
+            columns = [c for c in columns if c not in missing]
+            if not columns:
+                return self.table.slice(0, min(1, self.length))
+        row_numbers = pyarrow.array(range(self.length), type=pyarrow.int64())
+        keyed = self.table.select(columns).append_column("$row", row_numbers)
+        try:
+            first = keyed.group_by(columns, use_threads=False).aggregate([("$row", "min")])
+        except (pyarrow.ArrowNotImplementedError, pyarrow.ArrowTypeError):
+            return None
+        rows = pc.sort_indices(first.column("$row_min"))
+        return self.table.take(pc.take(first.column("$row_min"), rows))
+
+    def sort_and_take(self, key: str, take: int, descending: bool = False):
+        """
+        The first `take` records ordered by a column, nulls are before other values
+        when ascending and after them when descending. Records with the same value
+        are kept in the order they were added.
+        """
+        if key not in self.table.column_names:
+            return self.table.slice(0, take)
+        # like the other storage classes, sort on (is not null, value)
+        column = self.column(key)
+        order = "descending" if descending else "ascending"
+        indices = pc.sort_indices(
+            pyarrow.table({"$valid": pc.is_valid(column), key: column}),
+            sort_keys=[("$valid", order), (key, order)],
+        )
+        return self.table.take(indices[:take])
@@ -7,63 +7,151 @@ memory, or you are doing a lot of operations on the data.
 
 If you're doing few operations on the the data and it is easily recreated or local
 storage is fast, this isn't a good option.
+
+Records are compressed in batches, the number of records in each batch is adjusted
+so the batches are about the same size (before compression) regardless of how wide
+the records are. The most recently used batches are kept decompressed so reading
+the same records again, or records near each other, doesn't need the batch to be
+decompressed again. The batches are decoded each time they're read, so changing
+the records which are read doesn't change the stored records.
+
+Batches can be compressed with:
+
+- lz4 = the default, fast with a reasonable compression ratio
+- zstd = slower than lz4 but with a better compression ratio
+- zstd_dictionary = zstd with a dictionary trained on the first records, this
+  improves the compression ratio, particularly when the batches are small
 """
 
 import gc
+from bisect import bisect_right
+from collections import OrderedDict
 from typing import List
 from typing import Set
 from typing import Tuple
 from typing import Union
 
 import lz4.frame
+import zstandard
 
 from mabel.data.internals.storage_classes import BaseStorageClass
+from mabel.errors import InvalidArgument
+
+# the target size of the batches before they're compressed
+BATCH_BYTES = 64 * 1024  # 64Kb
+# the number of records in the first batch, before we know how big records are
+INITIAL_BATCH_SIZE = 250
+# the number of decompressed batches to keep
+CACHED_BATCHES = 4
+# the number of records used to train the zstd dictionary, and its size
+TRAINING_RECORDS = 1000
+DICTIONARY_BYTES = 16 * 1024  # 16Kb
 
-BATCH_SIZE = 250
+COMPRESSIONS = ("lz4", "zstd", "zstd_dictionary")
 
 
 class StorageClassCompressedMemory(BaseStorageClass):
-    def __init__(self, iterable):
-        self.compressor = lz4.frame
-        self.batches: List[bytearray] = []
+    def __init__(
+        self,
+        iterable,
+        codec=None,
+        compression: str = "lz4",
+        batch_bytes: int = BATCH_BYTES,
+    ):
+        if codec is not None:
+            self.codec = codec
+        if compression not in COMPRESSIONS:
+            raise InvalidArgument(
+                f"Unknown compression `{compression}`, expected one of {', '.join(COMPRESSIONS)}"
+            )
+        self.compression = compression
+        self.batches: List[bytes] = []
+        # the number of the first record in each batch
+        self.batch_starts: List[int] = []
         self.length = 0
         self.iterator = None
-        self.decompressor = lz4.frame
+        self.dictionary = None
+        self._cache: OrderedDict = OrderedDict()
 
-        batch = []
-        for item in iterable:
+        iterator = iter(iterable)
+        if compression == "lz4":
+            self.compressor = lz4.frame
+            self.decompressor = lz4.frame
+        else:
+            first_records: list = []
+            if compression == "zstd_dictionary":
+                first_records = [record for _, record in zip(range(TRAINING_RECORDS), iterator)]
+                self.dictionary = self._train_dictionary(first_records)
+            self.compressor = zstandard.ZstdCompressor(dict_data=self.dictionary)
+            self.decompressor = zstandard.ZstdDecompressor(dict_data=self.dictionary)
+            iterator = self._chain(first_records, iterator)
+
+        batch: list = []
+        batch_size = INITIAL_BATCH_SIZE
+        for item in iterator:
             batch.append(item)
-            self.length += 1
-            if len(batch) >= BATCH_SIZE:
-                compressed_batch = self.compressor.compress(self.dump_json(batch))
-                self.batches.append(bytearray(compressed_batch))
-                batch.clear()
+            if len(batch) >= batch_size:
+                encoded_bytes = self._add_batch(batch)
+                # size the next batch from the size of the records in this one
+                batch_size = max(1, int(batch_bytes * len(batch) / max(encoded_bytes, 1)))
+                batch = []
 
         if batch:
-            compressed_batch = self.compressor.compress(self.dump_json(batch))
-            self.batches.append(bytearray(compressed_batch))
+            self._add_batch(batch)
 
         # Force garbage collection (though it may not provide significant benefits)
         del batch
         gc.collect()
 
+    @staticmethod
+    def _chain(first, rest):
+        yield from first
+        yield from rest
+
+    def _train_dictionary(self, records):
+        samples = [self.codec.encode(record) for record in records]
+        try:
+            return zstandard.train_dictionary(DICTIONARY_BYTES, samples)
+        except zstandard.ZstdError:
+            # too few, or too small, records to train a dictionary
+            return None
+
+    def _add_batch(self, batch: list) -> int:
+        encoded = self.codec.encode(batch)
+        self.batch_starts.append(self.length)
+        self.batches.append(self.compressor.compress(encoded))
+        self.length += len(batch)
+        return len(encoded)
+
+    def _get_batch(self, batch_number: int) -> list:
+        cache = self._cache
+        if batch_number in cache:
+            cache.move_to_end(batch_number)
+            decompressed = cache[batch_number]
+        else:
+            decompressed = self.decompressor.decompress(self.batches[batch_number])
+            cache[batch_number] = decompressed
+            if len(cache) > CACHED_BATCHES:
+                cache.popitem(last=False)
+        return self.codec.decode(decompressed)
+
     def _inner_reader(self, *locations: Union[int, Tuple[int], List[int], Set[int]]):
         if locations:
             ordered_location = sorted(locations)
-            batch_number = -1
-            batch = []
+            batch_number, batch = None, None
             for i in ordered_location:
-                requested_batch = i // BATCH_SIZE
-                if requested_batch != batch_number:
-                    batch = self.parse_json(
-                        self.decompressor.decompress(self.batches[requested_batch])
-                    )
-                yield batch[i % BATCH_SIZE]
+                if batch_number is None or not (
+                    self.batch_starts[batch_number]
+                    <= i
+                    < self.batch_starts[batch_number] + len(batch)
+                ):
+                    batch_number = bisect_right(self.batch_starts, i) - 1
+                    batch = self._get_batch(batch_number)
+                yield batch[i - self.batch_starts[batch_number]]
 
         else:
-            for batch in self.batches:
-                records = self.parse_json(self.decompressor.decompress(batch))
-                for record in records:
+            for batch_number in range(len(self.batches)):
+                for record in self._get_batch(batch_number):
                     if record:
                         yield record
 
@@ -78,3 +166,10 @@ class StorageClassCompressedMemory(BaseStorageClass):
 
     def __len__(self):
         return self.length
+
+    @property
+    def compressed_bytes(self) -> int:
+        """
+        The size of the compressed batches.
+        """
+        return sum(len(batch) for batch in self.batches)
@@ -0,0 +1,318 @@
+"""
+Zone Maps
+
+Summary statistics (minimum, maximum and number of nulls for each column and the
+number of records) for each blob. These are written by the BlobWriter to manifest
+files in the same folder as the blobs and used by the Reader to skip blobs which
+can't contain any records which match the filters, without reading the blobs.
+
+The manifests can also contain bloom filters for some columns (see `bloom_filter`)
+which are used with the zone maps.
+
+Pruning is conservative, if there's any doubt about whether a blob can be skipped
+(e.g. the filter compares values of different types, or the blob hasn't been
+profiled) the blob is read.
+"""
+
+import datetime
+import decimal
+from typing import Optional
+from typing import Union
+
+try:
+    import pyarrow  # type:ignore
+    import pyarrow.compute as pc  # type:ignore
+except ImportError:  # pragma: no cover
+    pyarrow = None  # type:ignore
+
+# long strings aren't useful for pruning and would make the manifests large
+MAXIMUM_STRING_LENGTH: int = 64
+MANIFEST_EXTENSION: str = ".manifest"
+
+
+def _is_profiled(data_type):
+    return (
+        pyarrow.types.is_integer(data_type)
+        or pyarrow.types.is_floating(data_type)
+        or pyarrow.types.is_boolean(data_type)
+        or pyarrow.types.is_string(data_type)
+        or pyarrow.types.is_large_string(data_type)
+        or pyarrow.types.is_timestamp(data_type)
+        or pyarrow.types.is_date(data_type)
+        or pyarrow.types.is_decimal(data_type)
+    )
+
+
+def _to_manifest(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    return value
+
+
+def _from_manifest(value, data_type: str):
+    if value is None:
+        return None
+    if data_type.startswith("timestamp"):
+        return datetime.datetime.fromisoformat(value)
+    if data_type.startswith("date"):
+        return datetime.date.fromisoformat(value)
+    if data_type.startswith("decimal"):
+        return decimal.Decimal(value)
+    return value
+
+
+class ZoneMapBuilder:
+    """
+    Create the zone map for a blob from the pyarrow Tables it's made from, e.g. the
+    row groups of a parquet file, without holding all of the tables in memory.
+    """
+
+    def __init__(self):
+        self.records = 0
+        self.columns: dict = {}
+
+    def add(self, table):
+        """
+        Add the minimums, maximums and null counts of a table to the zone map.
+        """
+        for name in table.column_names:
+            column = table.column(name)
+            profile = self.columns.get(name)
+            if profile is None:
+                # columns which weren't in the earlier tables were all null in them
+                profile = {
+                    "type": str(column.type),
+                    "nulls": self.records,
+                    "profiled": _is_profiled(column.type),
+                }
+                self.columns[name] = profile
+            profile["nulls"] += column.null_count
+            if not profile["profiled"] or column.null_count == len(column):
+                continue
+            if not _is_profiled(column.type) or (
+                # NaN doesn't compare like other values, so we can't prune on this column
+                pyarrow.types.is_floating(column.type)
+                and pc.any(pc.is_nan(column)).as_py()
+            ):
+                profile["profiled"] = False
+                continue
+            minmax = pc.min_max(column).as_py()
+            minimum, maximum = minmax["min"], minmax["max"]
+            if "min" in profile:
+                minimum = min(minimum, profile["min"])
+                maximum = max(maximum, profile["max"])
+            profile["min"], profile["max"] = minimum, maximum
+
+        for name, profile in self.columns.items():
+            if name not in table.column_names:
+                profile["nulls"] += table.num_rows
+        self.records += table.num_rows
+        return self
+
+    def zone_map(self) -> dict:
+        columns = {}
+        for name, profile in self.columns.items():
+            columns[name] = {"type": profile["type"], "nulls": profile["nulls"]}
+            if not profile["profiled"] or "min" not in profile:
+                continue
+            minimum, maximum = profile["min"], profile["max"]
+            # long strings aren't kept
+            if not isinstance(minimum, str) or (
+                len(minimum) <= MAXIMUM_STRING_LENGTH and len(maximum) <= MAXIMUM_STRING_LENGTH
+            ):
+                columns[name]["min"] = _to_manifest(minimum)
+                columns[name]["max"] = _to_manifest(maximum)
+        return {"records": self.records, "columns": columns}
+
+
+def profile_table(table) -> dict:
+    """
+    Create the zone map for a pyarrow Table.
+    """
+    return ZoneMapBuilder().add(table).zone_map()
+
+
+# the names of the types of the values in records, these are the names pyarrow uses
+# so the zone maps for all of the formats are read the same way
+_RECORD_TYPES = {
+    bool: "bool",
+    int: "int64",
+    float: "double",
+    str: "string",
+    datetime.datetime: "timestamp[us]",
+    datetime.date: "date32[day]",
+    decimal.Decimal: "decimal",
+}
+
+
+class _Unprofiled:
+    """the type of the columns which can't be used to prune, no values are this type"""
+
+
+class RecordZoneMapBuilder:
+    """
+    Create the zone map for a blob from the records as they're written to it, for
+    the formats which aren't written with pyarrow, so the blob doesn't need to be
+    read back to profile it.
+    """
+
+    def __init__(self):
+        self.records = 0
+        # the profile of each column is a list, so it can be updated in place:
+        # [type of the values, number of values, minimum, maximum, name of the type]
+        self.columns: dict = {}
+
+    def add(self, record: dict):
+        """
+        Add the values in a record to the zone map.
+        """
+        columns = self.columns
+        for name, value in record.items():
+            profile = columns.get(name)
+            if profile is None:
+                self._add_value(name, value, profile)
+            # most values are the same type as the values before them
+            elif type(value) is profile[0]:
+                profile[1] += 1
+                try:
+                    if value < profile[2]:
+                        profile[2] = value
+                    elif value > profile[3]:
+                        profile[3] = value
+                    elif value != value:
+                        # NaN doesn't compare like other values
+                        profile[0] = _Unprofiled
+                except TypeError:
+                    # e.g. datetimes with and without timezones
+                    profile[0] = _Unprofiled
+            elif profile[0] is _Unprofiled:
+                if value is not None:
+                    profile[1] += 1
+            else:
+                self._add_value(name, value, profile)
+        self.records += 1
+        return self
+
+    def _add_value(self, name, value, profile):
+        if profile is None:
+            profile = [None, 0, None, None, "null"]
+            self.columns[name] = profile
+        if value is None:
+            return
+        profile[1] += 1
+        value_type = type(value)
+        if profile[0] is None:
+            profile[4] = _RECORD_TYPES.get(value_type, value_type.__name__)
+            if value_type in _RECORD_TYPES and value == value:
+                profile[0] = value_type
+                profile[2] = profile[3] = value
+            else:
+                profile[0] = _Unprofiled
+        elif {profile[0], value_type} == {int, float} and value == value:
+            # ints and floats can be compared with each other
+            profile[0], profile[4] = float, "double"
+            profile[2] = min(profile[2], value)
+            profile[3] = max(profile[3], value)
+        else:
+            # the column has values of more than one type, or NaNs
+            profile[0] = _Unprofiled
+
+    def zone_map(self) -> dict:
+        columns = {}
+        for name, profile in self.columns.items():
+            value_type, values, minimum, maximum, type_name = profile
+            # records without the column are null
+            columns[name] = {"type": type_name, "nulls": self.records - values}
+            if value_type is _Unprofiled or value_type is None:
+                continue
+            # long strings aren't kept
+            if not isinstance(minimum, str) or (
+                len(minimum) <= MAXIMUM_STRING_LENGTH and len(maximum) <= MAXIMUM_STRING_LENGTH
+            ):
+                columns[name]["min"] = _to_manifest(minimum)
+                columns[name]["max"] = _to_manifest(maximum)
+        return {"records": self.records, "columns": columns}
+
+
+def _predicate_excludes(predicate: tuple, zone_map: dict, use_blooms: bool) -> bool:
+    key, op, value = predicate
+    op = op.lower()
+
+    # the bloom filters are read from the manifests with the zone maps
+    bloom_filter = zone_map.get("blooms", {}).get(key) if use_blooms else None
+    if bloom_filter is not None and bloom_filter.excludes(op, value):
+        return True
+
+    columns = zone_map.get("columns")
+    if columns is None or value is None:
+        return False
+
+    column = columns.get(key)
+    # the column isn't in any of the records, or is always null, null never matches,
+    # the Reader only uses the zone maps when the filters are on the blob's columns
+    if column is None or column.get("nulls", 0) >= zone_map.get("records", 0):
+        return True
+    if "min" not in column:
+        return False
+
+    minimum = _from_manifest(column["min"], column["type"])
+    maximum = _from_manifest(column["max"], column["type"])
+
+    if op in ("=", "==", "is"):
+        return value < minimum or value > maximum
+    if op in ("!=", "<>"):
+        return minimum == maximum == value
+    if op == "<":
+        return minimum >= value
+    if op == "<=":
+        return minimum > value
+    if op == ">":
+        return maximum <= value
+    if op == ">=":
+        return maximum < value
+    if op == "in" and isinstance(value, (list, tuple, set, frozenset)):
+        return all(v is None or v < minimum or v > maximum for v in value)
+    return False
+
+
+def excludes(
+    predicate: Union[tuple, list], zone_map: Optional[dict], use_blooms: bool = True
+) -> bool:
+    """
+    Determine if the zone map shows a blob has no records which match a DNF filter.
+
+    Parameters:
+        predicate: tuple or list
+            The DNF filter
+        zone_map: dictionary
+            The zone map for the blob
+        use_blooms: boolean (optional)
+            Use the bloom filters in the zone map, if there are any, default is True
+
+    Returns:
+        True if the blob can be skipped
+    """
+    if not zone_map or predicate is None:
+        return False
+
+    if isinstance(predicate, tuple):
+        try:
+            return bool(_predicate_excludes(predicate, zone_map, use_blooms))
+        except (TypeError, ValueError, AttributeError):
+            # the types can't be compared, so we can't tell
+            return False
+
+    if isinstance(predicate, list):
+        if len(predicate) == 0:
+            return False
+        # ANDs - if any of the predicates exclude the blob, the blob is excluded
+        if all(isinstance(p, tuple) for p in predicate):
+            return any(excludes(p, zone_map, use_blooms) for p in predicate)
+        # ORs - all of the predicates must exclude the blob
+        if all(isinstance(p, list) for p in predicate):
+            return all(excludes(p, zone_map, use_blooms) for p in predicate)
+
+    # we don't understand the filter, so we can't prune
+    return False
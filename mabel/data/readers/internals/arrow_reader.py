@@ -0,0 +1,149 @@
+"""
+Arrow Reader
+
+Decodes blobs to Arrow tables so filters and projections can be applied to whole
+columns at a time, records are only created, a batch at a time, after the filters
+and projections have been applied.
+
+Only some formats can be decoded to Arrow tables, other formats are read as
+records by the ParallelReader.
+
+There are some differences in the records created from JSON data compared to
+reading the records one at a time - every record has every field in the blob
+(missing values are None) and numeric fields with a mix of integers and floats
+are all floats. Strings which look like dates are left as strings.
+"""
+
+import io
+
+from mabel.errors import MissingDependencyError
+from mabel.utils.token_labeler import TOKENS
+
+from . import decompressors
+
+try:
+    import pyarrow  # type:ignore
+    import pyarrow.json  # type:ignore
+
+    ArrowException = pyarrow.ArrowException
+except ImportError:  # pragma: no cover
+    pyarrow = None  # type:ignore
+    # an empty tuple doesn't catch anything
+    ArrowException = ()  # type:ignore
+
+# the number of records to create at a time
+BATCH_SIZE: int = 10000
+
+
+def _strings_not_timestamps(data_type):
+    # Arrow interprets strings which look like dates as timestamps, the row reader
+    # leaves them as strings
+    if pyarrow.types.is_timestamp(data_type):
+        return pyarrow.string()
+    if pyarrow.types.is_struct(data_type):
+        return pyarrow.struct(
+            [field.with_type(_strings_not_timestamps(field.type)) for field in data_type]
+        )
+    if pyarrow.types.is_list(data_type):
+        return pyarrow.list_(
+            data_type.value_field.with_type(_strings_not_timestamps(data_type.value_type))
+        )
+    return data_type
+
+
+def read_json(data: bytes):
+    """
+    Read a buffer of JSON lines to a table, strings which look like dates are
+    left as strings.
+    """
+    table = pyarrow.json.read_json(io.BytesIO(data))
+    schema = pyarrow.schema(
+        [field.with_type(_strings_not_timestamps(field.type)) for field in table.schema]
+    )
+    if schema != table.schema:
+        parse_options = pyarrow.json.ParseOptions(explicit_schema=schema)
+        table = pyarrow.json.read_json(io.BytesIO(data), parse_options=parse_options)
+    return table
+
+
+def _take(table, start_row: int = 0, rows=None):
+    if rows is not None:
+        rows = [row for row in rows if row < table.num_rows]
+        return table.take(pyarrow.array(rows, type=pyarrow.int64()))
+    return table.slice(start_row)
+
+
+def parquet(stream, projection=None, selection=None, start_row: int = 0, rows=None):
+    return decompressors.parquet_table(stream, projection, selection, start_row, rows)
+
+
+def jsonl(stream, start_row: int = 0, rows=None, **kwargs):
+    return _take(read_json(stream.read()), start_row, rows)
+
+
+def zstd(stream, start_row: int = 0, rows=None, **kwargs):
+    import zstandard  # type:ignore
+
+    with zstandard.open(stream, "rb") as file:
+        return _take(read_json(file.read()), start_row, rows)
+
+
+ARROW_DECODERS = {
+    ".parquet": parquet,
+    ".jsonl": jsonl,
+    ".zstd": zstd,
+}
+
+
+def get_decoder(ext):
+    """
+    Get the decoder for a file extension, None if the format can't be decoded.
+    """
+    if pyarrow is None:  # pragma: no cover
+        raise MissingDependencyError(
+            "`pyarrow` is missing, please install or include in requirements.txt"
+        )
+    return ARROW_DECODERS.get(ext)
+
+
+def get_column_selection(columns):
+    """
+    If a select Evaluator only selects fields, get the fields as a dictionary of
+    the names in the result to the names in the data.
+
+    Returns:
+        A dictionary, or None if the Evaluator does more than select fields.
+    """
+    tokens = getattr(columns, "tokens", None)
+    if tokens is None:
+        return None
+    selection = {}
+    for token in tokens:
+        if token["type"] != TOKENS.VARIABLE:
+            return None
+        name = token["value"]
+        if name[0] == name[-1] == "`":
+            name = name[1:-1]
+        selection[token["value"]] = name
+    return selection
+
+
+def select_columns(table, selection: dict):
+    """
+    Select and rename columns, columns which aren't in the table are nulls.
+    """
+    columns = []
+    for source in selection.values():
+        if source in table.column_names:
+            columns.append(table.column(source))
+        else:
+            columns.append(pyarrow.nulls(table.num_rows))
+    return pyarrow.Table.from_arrays(columns, names=list(selection.keys()))
+
+
+def to_records(table):
+    """
+    Create the records from a table, a batch at a time.
+    """
+    for batch in table.to_batches(max_chunksize=BATCH_SIZE):
+        yield from batch.to_pylist()
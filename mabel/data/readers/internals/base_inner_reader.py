@@ -6,15 +6,20 @@ import abc
 import datetime
 import io
 import pathlib
+from concurrent.futures import ThreadPoolExecutor
 from io import IOBase
 from typing import Iterable
+from typing import Optional
 
 from orso.logging import get_logger
 
+from mabel.data.readers.internals.listing_cache import LISTING_CACHE
 from mabel.utils import dates
 from mabel.utils import paths
 
 BUFFER_SIZE: int = 64 * 1024 * 1024  # 64Mb
+# the maximum number of partitions to list at the same time
+LISTING_THREADS: int = 8
 
 
 class BaseInnerReader(abc.ABC):
@@ -53,6 +58,14 @@ class BaseInnerReader(abc.ABC):
 
         self.days_stepped_back = 0
 
+        # how long, in seconds, to cache the listings of partitions for, zero
+        # disables the cache
+        self.listing_cache_ttl = kwargs.get("listing_cache_ttl", 0) or 0
+        # what, other than the path, the listings depend on (e.g. the endpoint
+        # and credentials), readers of the same path with different scopes don't
+        # share listings
+        self.listing_cache_scope: tuple = ()
+
     def step_back_a_day(self):
         """
         Steps back a day so data can be read from a previous day
@@ -72,6 +85,20 @@ class BaseInnerReader(abc.ABC):
     def get_blobs_at_path(self, prefix=None) -> Iterable:
         pass
 
+    def list_blobs(self, path) -> list:
+        """
+        List the blobs at a path, using the listing cache if it's enabled.
+        """
+        if self.listing_cache_ttl <= 0:
+            return list(self.get_blobs_at_path(path=path))
+
+        key = (type(self).__qualname__, self.listing_cache_scope, str(path))
+        blobs = LISTING_CACHE.get(key)
+        if blobs is None:
+            blobs = list(self.get_blobs_at_path(path=path))
+            LISTING_CACHE.set(key, blobs, self.listing_cache_ttl)
+        return blobs
+
     @abc.abstractmethod
     def get_blob_bytes(self, blob: str) -> bytes:
         """
@@ -79,144 +106,170 @@ class BaseInnerReader(abc.ABC):
         """
         pass
 
+    def get_blob_stream(self, blob: str) -> IOBase:
+        """
+        Return a filelike object which can be read incrementally, readers which are
+        able to stream blobs should override this, by default the entire blob is
+        read into memory.
+        """
+        return io.BytesIO(self.get_blob_bytes(blob))
+
+    def get_blob_range(self, blob: str, start: int, end: Optional[int] = None) -> bytes:
+        """
+        Return part of a blob, from the `start` byte up to but not including the
+        `end` byte (or the end of the blob if `end` is None). Readers which are able
+        to read part of a blob should override this, by default the entire blob is
+        read.
+        """
+        return self.get_blob_bytes(blob)[start:end]
+
     def read_blob(self, blob: str) -> IOBase:
         """
         Read-thru cache
         """
-        result = self.get_blob_bytes(blob)
-        return io.BytesIO(result)
+        return self.get_blob_stream(blob)
 
     def get_list_of_blobs(self):
-        visited = {}
-        blobs = []
-        # For each day in the range, get the blobs for us to read
+        # Build the path names for each day in the range, more than one day can map
+        # to the same path (e.g. if the path doesn't have the day in it)
+        cycle_paths = {}
         for cycle_date in dates.date_range(self.start_date, self.end_date):
-            # Build the path name
             cycle_path = pathlib.Path(paths.build_path(path=self.dataset, date=cycle_date))
-            if not cycle_path in visited:
-                visited[cycle_path] = True
-
-                cycle_blobs = list(self.get_blobs_at_path(path=cycle_path))
-
-                # Remove any BACKOUT data - this is essentially a DEAD LETTER queue
-                # so we don't want to include in when reading
-                cycle_blobs = [blob for blob in cycle_blobs if "BACKOUT" not in blob]
-
-                # The partitions are stored in folders with the prefix 'by_', as in,
-                # partitioned **by** field name
-                list_of_partitions = {
-                    self._extract_by(blob) for blob in cycle_blobs if "/by_" in blob
-                }
-
-                # If we've been provided a partition_filter search hint, try to use this
-                # first to prune data
-                chosen_partition = ""
-
-                if self.partition_filter:
-                    from mabel.utils import text
-
-                    # break the filter into parts, and make sure they're safe and valid
-                    (
-                        partition_filter_field,
-                        partition_filter_op,
-                        partition_filter_value,
-                    ) = self.partition_filter
-                    if partition_filter_op not in ("=", "=="):
-                        raise NotImplementedError(
-                            "`partition_filter` operation can only be equals (`=`)"
-                        )
-                    partition_filter_field = text.sanitize(partition_filter_field)
-                    partition_filter_value = text.sanitize(partition_filter_value)
-                    partition_filter = f"/by_{partition_filter_field}/{partition_filter_field}={partition_filter_value}/"
-
-                    # If we can find the partition in the folder set, then prune to it
-                    if any([f"by_{partition_filter_field}" in by for by in list_of_partitions]):
-                        # Do the pruning
-                        cycle_blobs = [blob for blob in cycle_blobs if partition_filter in blob]
-                        #  We only have one partition now
-                        list_of_partitions = [f"by_{partition_filter_field}"]
-                        get_logger().debug(f"Applied partition filter by: `{partition_filter}`")
-                    else:
+            cycle_paths[cycle_path] = True
+        cycle_paths = list(cycle_paths)
+
+        # List the paths concurrently, the listings are usually round trips to a
+        # remote service so this is mostly waiting
+        if len(cycle_paths) > 1:
+            workers = min(LISTING_THREADS, len(cycle_paths))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mabel-list") as pool:
+                listings = list(pool.map(self._get_blobs_in_partition, cycle_paths))
+        else:
+            listings = [self._get_blobs_in_partition(cycle_path) for cycle_path in cycle_paths]
+
+        blobs = []
+        for listing in listings:
+            blobs += listing
+        return sorted(blobs)
+
+    def _get_blobs_in_partition(self, cycle_path):
+        """
+        Get the blobs to read from a single date partition.
+        """
+        cycle_blobs = self.list_blobs(cycle_path)
+
+        # Remove any BACKOUT data - this is essentially a DEAD LETTER queue
+        # so we don't want to include in when reading
+        cycle_blobs = [blob for blob in cycle_blobs if "BACKOUT" not in blob]
+
+        # The partitions are stored in folders with the prefix 'by_', as in,
+        # partitioned **by** field name
+        list_of_partitions = {self._extract_by(blob) for blob in cycle_blobs if "/by_" in blob}
+
+        # If we've been provided a partition_filter search hint, try to use this
+        # first to prune data
+        chosen_partition = ""
+
+        if self.partition_filter:
+            from mabel.utils import text
+
+            # break the filter into parts, and make sure they're safe and valid
+            (
+                partition_filter_field,
+                partition_filter_op,
+                partition_filter_value,
+            ) = self.partition_filter
+            if partition_filter_op not in ("=", "=="):
+                raise NotImplementedError("`partition_filter` operation can only be equals (`=`)")
+            partition_filter_field = text.sanitize(partition_filter_field)
+            partition_filter_value = text.sanitize(partition_filter_value)
+            partition_filter = (
+                f"/by_{partition_filter_field}/{partition_filter_field}={partition_filter_value}/"
+            )
+
+            # If we can find the partition in the folder set, then prune to it
+            if any([f"by_{partition_filter_field}" in by for by in list_of_partitions]):
+                # Do the pruning
+                cycle_blobs = [blob for blob in cycle_blobs if partition_filter in blob]
+                #  We only have one partition now
+                list_of_partitions = [f"by_{partition_filter_field}"]
+                get_logger().debug(f"Applied partition filter by: `{partition_filter}`")
+            else:
+                get_logger().debug(
+                    f"Wasn't able to find partition to filter by: `{partition_filter}`"
+                )
+
+        # If we have multiple 'by_' partitions, pick one (pick the first one)
+        if list_of_partitions:
+            list_of_partitions = sorted(list_of_partitions)
+            chosen_partition = list_of_partitions.pop()
+            if list_of_partitions:
+                get_logger().info(
+                    f"Ignoring {len(list_of_partitions)} 'by' partitionings, reading from '{chosen_partition}'"
+                )
+            # Do the pruning
+            cycle_blobs = [blob for blob in cycle_blobs if f"/{chosen_partition}/" in blob]
+
+        def safe_get_next(lst, item):
+            try:
+                index = lst.index(item)
+                return lst[index + 1]
+            except:
+                return None
+
+        # Cycle over the list of partitions (e.g. the hour=02 bits) we can't use
+        # the frame id of one on the rest
+        if chosen_partition == "":
+            partitioned_folders = {""}
+        else:
+            partitioned_folders = {
+                safe_get_next(blob.split("/"), chosen_partition) for blob in cycle_blobs
+            }
+
+        blobs = []
+        for partitioned_folder in partitioned_folders:
+            partitioned_blobs = [
+                blob for blob in cycle_blobs if f"{chosen_partition}/{partitioned_folder}" in blob
+            ]
+
+            # Work out if there's an as_at part
+            as_ats = {self._extract_as_at(blob) for blob in partitioned_blobs if "as_at_" in blob}
+            if as_ats:
+                as_ats = sorted(as_ats)
+                as_at = as_ats.pop()
+
+                is_complete = lambda blobs: any(
+                    [blob for blob in blobs if as_at + "/frame.complete" in blob]
+                )
+                is_invalid = lambda blobs: any(
+                    [blob for blob in blobs if (as_at + "/frame.ignore" in blob)]
+                )
+
+                while not is_complete(partitioned_blobs) or is_invalid(partitioned_blobs):
+                    if not is_complete(partitioned_blobs):
                         get_logger().debug(
-                            f"Wasn't able to find partition to filter by: `{partition_filter}`"
+                            f"Frame `{partitioned_folder}/{as_at}` is not complete - `frame.complete` file is not present - skipping this frame."
                         )
-
-                # If we have multiple 'by_' partitions, pick one (pick the first one)
-                if list_of_partitions:
-                    list_of_partitions = sorted(list_of_partitions)
-                    chosen_partition = list_of_partitions.pop()
-                    if list_of_partitions:
-                        get_logger().info(
-                            f"Ignoring {len(list_of_partitions)} 'by' partitionings, reading from '{chosen_partition}'"
+                    if is_invalid(partitioned_blobs):
+                        get_logger().debug(
+                            f"Frame `{partitioned_folder}/{as_at}` is invalid - `frame.ignore` file is present - skipping this frame."
                         )
-                    # Do the pruning
-                    cycle_blobs = [blob for blob in cycle_blobs if f"/{chosen_partition}/" in blob]
-
-                def safe_get_next(lst, item):
-                    try:
-                        index = lst.index(item)
-                        return lst[index + 1]
-                    except:
-                        return None
-
-                # Cycle over the list of partitions (e.g. the hour=02 bits) we can't use
-                # the frame id of one on the rest
-                if chosen_partition == "":
-                    partitioned_folders = {""}
+                    if len(as_ats) > 0:
+                        as_at = as_ats.pop()
+                    else:
+                        as_at = None
+                        break
+                if as_at is None:
+                    get_logger().error(f"There are no valid frames at `{partitioned_folder}`")
+                    partitioned_blobs = []
                 else:
-                    partitioned_folders = {
-                        safe_get_next(blob.split("/"), chosen_partition) for blob in cycle_blobs
-                    }
-
-                for partitioned_folder in partitioned_folders:
+                    get_logger().debug(f"Reading from DataSet frame `{as_at}`")
                     partitioned_blobs = [
                         blob
-                        for blob in cycle_blobs
-                        if f"{chosen_partition}/{partitioned_folder}" in blob
+                        for blob in partitioned_blobs
+                        if (as_at in blob) and ("/frame.complete" not in blob)
                     ]
 
-                    # Work out if there's an as_at part
-                    as_ats = {
-                        self._extract_as_at(blob) for blob in partitioned_blobs if "as_at_" in blob
-                    }
-                    if as_ats:
-                        as_ats = sorted(as_ats)
-                        as_at = as_ats.pop()
-
-                        is_complete = lambda blobs: any(
-                            [blob for blob in blobs if as_at + "/frame.complete" in blob]
-                        )
-                        is_invalid = lambda blobs: any(
-                            [blob for blob in blobs if (as_at + "/frame.ignore" in blob)]
-                        )
+            blobs += partitioned_blobs
 
-                        while not is_complete(partitioned_blobs) or is_invalid(partitioned_blobs):
-                            if not is_complete(partitioned_blobs):
-                                get_logger().debug(
-                                    f"Frame `{partitioned_folder}/{as_at}` is not complete - `frame.complete` file is not present - skipping this frame."
-                                )
-                            if is_invalid(partitioned_blobs):
-                                get_logger().debug(
-                                    f"Frame `{partitioned_folder}/{as_at}` is invalid - `frame.ignore` file is present - skipping this frame."
-                                )
-                            if len(as_ats) > 0:
-                                as_at = as_ats.pop()
-                            else:
-                                as_at = None
-                                break
-                        if as_at is None:
-                            get_logger().error(
-                                f"There are no valid frames at `{partitioned_folder}`"
-                            )
-                            partitioned_blobs = []
-                        else:
-                            get_logger().debug(f"Reading from DataSet frame `{as_at}`")
-                            partitioned_blobs = [
-                                blob
-                                for blob in partitioned_blobs
-                                if (as_at in blob) and ("/frame.complete" not in blob)
-                            ]
-
-                    blobs += partitioned_blobs
-
-        return sorted(blobs)
+        return blobs
@@ -0,0 +1,100 @@
+"""
+Blob Prefetcher
+
+Downloads the bytes for the next blobs to be read on background threads while the
+current blob is being decompressed and parsed, overlapping the network latency of
+reading blobs with the CPU time of processing them.
+
+The prefetcher only changes when bytes are downloaded, the order blobs are read in,
+and the cursor, are unchanged - blobs which have been prefetched but aren't read
+(e.g. the read was abandoned) are discarded.
+
+Both the number of blobs being prefetched and the number of prefetched bytes held
+in memory are limited; the byte budget is checked before each download is started
+so it can be exceeded by, at most, the blobs currently being downloaded.
+"""
+
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable
+
+from orso.logging import get_logger
+
+from mabel.data.readers.internals.base_inner_reader import BUFFER_SIZE
+
+DEFAULT_PREFETCH_BYTES: int = 2 * BUFFER_SIZE
+
+
+class BlobPrefetcher:
+    def __init__(self, reader, blobs: int = 2, byte_budget: int = DEFAULT_PREFETCH_BYTES):
+        """
+        Parameters:
+            reader: BaseInnerReader
+                The reader used to download the blobs
+            blobs: integer (optional)
+                The maximum number of blobs to prefetch, zero disables prefetching
+            byte_budget: integer (optional)
+                The maximum number of prefetched bytes to hold in memory
+        """
+        self.reader = reader
+        self.blobs = max(blobs or 0, 0)
+        self.byte_budget = byte_budget
+        self._futures: dict = {}
+        self._held_bytes = 0
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def __getattr__(self, name):
+        # anything we don't handle is passed to the reader
+        if name == "reader":
+            raise AttributeError(name)
+        return getattr(self.reader, name)
+
+    def _fetch(self, blob: str) -> bytes:
+        data = self.reader.get_blob_bytes(blob)
+        with self._lock:
+            self._held_bytes += len(data)
+        return data
+
+    def prefetch(self, blobs: Iterable[str]):
+        """
+        Start downloading the blobs we expect to read next, in the order we expect
+        to read them.
+        """
+        for blob in blobs:
+            if len(self._futures) >= self.blobs:
+                return
+            if blob in self._futures:
+                continue
+            with self._lock:
+                if self._held_bytes >= self.byte_budget:
+                    return
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.blobs, thread_name_prefix="mabel-prefetch"
+                )
+            self._futures[blob] = self._executor.submit(self._fetch, blob)
+
+    def read_blob(self, blob: str) -> io.IOBase:
+        future = self._futures.pop(blob, None)
+        if future is None:
+            return self.reader.read_blob(blob)
+        try:
+            data = future.result()
+        except Exception as err:
+            # try again on the calling thread so errors surface as they would
+            # without the prefetcher
+            get_logger().debug(f"Prefetching `{blob}` failed - {type(err).__name__} - {err}")
+            return self.reader.read_blob(blob)
+        with self._lock:
+            self._held_bytes -= len(data)
+        return io.BytesIO(data)
+
+    def close(self):
+        for future in self._futures.values():
+            future.cancel()
+        self._futures = {}
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -8,6 +8,11 @@ Cursor is made of three parts:
 - partition: the active parition (blob) that is being read
 - location : the record in the active partition (blob), so we can resume reading
              midway through the blob if required.
+- offset   : the row in the active partition (blob) of the record at the location,
+             this differs from the location when records are filtered. This allows
+             reading to resume at the row, without reading the rows before it.
+             Cursors created before the offset was recorded resume by reading
+             and discarding records up to the location.
 """
 
 import orjson
@@ -22,9 +27,12 @@ class Cursor:
     def __init__(self, readable_blobs, cursor=None):
         # sort the readable blobs so they are in a consistent order
         self.readable_blobs = sorted(readable_blobs)
-        self.read_blobs = []
+        self.read_blobs = set()
+        # the blobs before this index in readable_blobs have all been read
+        self._next_unread = 0
         self.partition = ""
         self.location = -1
+        self.offset = -1
 
         if cursor:
             self.load_cursor(cursor)
@@ -46,6 +54,7 @@ class Cursor:
             raise InvalidCursor(f"Cursor is malformed or corrupted {cursor}")
 
         self.location = cursor["location"]
+        self.offset = cursor.get("offset", -1)
         find_partition = [
             blob for blob in self.readable_blobs if CityHash64(blob) == cursor["partition"]
         ]
@@ -54,15 +63,17 @@ class Cursor:
         map_bytes = bytes.fromhex(cursor["map"])
         blob_map = bitarray()
         blob_map.frombytes(map_bytes)
-        self.read_blobs = [
+        self.read_blobs = {
             self.readable_blobs[i] for i in range(len(self.readable_blobs)) if blob_map[i]
-        ]
+        }
+        self._next_unread = 0
 
     def next_blob(self, previous_blob=None):
         if previous_blob:
-            self.read_blobs.append(previous_blob)
+            self.read_blobs.add(previous_blob)
             self.partition = ""
             self.location = -1
+            self.offset = -1
         if self.partition and self.location >= 0:
             if self.partition in self.readable_blobs:
                 return self.partition
@@ -72,17 +83,52 @@ class Cursor:
             if len(partition_finder) != 1:
                 raise ValueError(f"Unable to determine current partition ({self.partition})")
             return partition_finder[0]
-        unread = [blob for blob in self.readable_blobs if blob not in self.read_blobs]
-        if len(unread) > 0:
-            self.partition = unread[0]
+        unread = self._advance()
+        if unread < len(self.readable_blobs):
+            self.partition = self.readable_blobs[unread]
             self.location = -1
+            self.offset = -1
             return self.partition
         return None
 
+    def upcoming_blobs(self, count: int):
+        """
+        The blobs expected to be read after the active partition, in the order they
+        will be read.
+        """
+        upcoming = []
+        for index in range(self._advance(), len(self.readable_blobs)):
+            if len(upcoming) >= count:
+                break
+            blob = self.readable_blobs[index]
+            if blob != self.partition and blob not in self.read_blobs:
+                upcoming.append(blob)
+        return upcoming
+
+    def _advance(self):
+        # move past the blobs which have been read, each blob is only passed once
+        while (
+            self._next_unread < len(self.readable_blobs)
+            and self.readable_blobs[self._next_unread] in self.read_blobs
+        ):
+            self._next_unread += 1
+        return self._next_unread
+
+    def start_row(self):
+        """
+        The row in the active partition to start reading from.
+        """
+        if self.location < 0 or self.offset < 0:
+            return 0
+        return self.offset + 1
+
     def skip_to_cursor(self, iterator):
-        # cycle through the iterator to the cursor location
         if self.location < 0:
             return 0
+        # the reader started from the row after the offset
+        if self.offset >= 0:
+            return self.location + 1
+        # cycle through the iterator to the cursor location
         for index in range(self.location + 1):
             next(iterator, None)
         return self.location + 1
@@ -92,6 +138,7 @@ class Cursor:
             "map": self["map"],
             "partition": self["partition"],
             "location": self["location"],
+            "offset": self["offset"],
         }
 
     def __getitem__(self, item):
@@ -106,6 +153,8 @@ class Cursor:
             return CityHash64(self.partition)
         if item == "location":
             return self.location
+        if item == "offset":
+            return self.offset
         return None
 
     def __repr__(self):
@@ -1,5 +1,38 @@
+import io
+from bisect import bisect_right
+
 from ....errors import MissingDependencyError
 
+CHUNK_SIZE: int = 8 * 1024 * 1024  # 8Mb
+
+
+def split_lines(stream, chunk_size: int = CHUNK_SIZE):
+    """
+    Split a stream into lines, reading the stream in chunks so the entire stream
+    isn't held in memory. The partial line at the end of each chunk is carried
+    into the next chunk.
+    """
+    partial = b""
+    chunk = stream.read(chunk_size)
+    while chunk:
+        lines = chunk.split(b"\n")
+        lines[0] = partial + lines[0]
+        partial = lines.pop()
+        yield from lines
+        chunk = stream.read(chunk_size)
+    if partial:
+        yield partial
+
+
+def seekable(stream):
+    """
+    Some formats need random access to the stream, if the stream doesn't support
+    it, read it into memory.
+    """
+    if hasattr(stream, "seekable") and stream.seekable():
+        return stream
+    return io.BytesIO(stream.read())
+
 
 def zstd(stream):
     """
@@ -8,7 +41,7 @@ def zstd(stream):
     import zstandard  # type:ignore
 
     with zstandard.open(stream, "rb") as file:  # type:ignore
-        yield from file.read().split(b"\n")[:-1]
+        yield from split_lines(file)
 
 
 def lzma(stream):
@@ -27,12 +60,11 @@ def unzip(stream):
     Read ZIP compressed files
     """
     # zipfile should always be present
-    import io
     import zipfile
 
     from .parallel_reader import KNOWN_EXTENSIONS
 
-    with zipfile.ZipFile(stream, "r") as zip:
+    with zipfile.ZipFile(seekable(stream), "r") as zip:
         for file_name in zipfile.ZipFile.namelist(zip):
             file = zip.read(file_name)
             # get the extention of the file(s) in the ZIP and put them
@@ -44,27 +76,106 @@ def unzip(stream):
                     yield parser(line)
 
 
-def parquet(stream):
+def parquet_table(stream, projection=None, selection=None, start_row: int = 0, rows=None):
     """
-    Read parquet formatted files
+    Read a parquet formatted file to an Arrow table
+
+    Parameters:
+        stream: filelike
+            The parquet file
+        projection: list (optional)
+            Only read these columns, default is to read all columns
+        selection: list (optional)
+            DNF filters to apply to the data as it is read, row groups which the
+            statistics show can't match the filters aren't read
+        start_row: integer (optional)
+            Skip the rows before this row, row groups which are entirely before
+            this row aren't read
+        rows: list of integers (optional)
+            Only read these rows, in order, the selection isn't applied and only
+            the row groups containing these rows are read
     """
     try:
+        import pyarrow  # type:ignore
         import pyarrow.parquet as pq  # type:ignore
     except ImportError:  # pragma: no cover
         raise MissingDependencyError(
             "`pyarrow` is missing, please install or include in requirements.txt"
         )
 
-    table = pq.read_table(stream)
-    yield from table.to_pylist()
+    stream = seekable(stream)
+
+    if projection is None and selection is None and start_row == 0 and rows is None:
+        return pq.read_table(stream)
+
+    from .pushdown import restrict_selection
+
+    parquet_file = pq.ParquetFile(stream)
+    available_columns = set(parquet_file.schema_arrow.names)
+    if projection is not None:
+        projection = [column for column in projection if column in available_columns]
+    selection = restrict_selection(selection, available_columns)
+
+    if rows is not None:
+        # find the row groups the rows are in, and the position of the rows in
+        # the row groups we read
+        row_group_starts = []
+        total_rows = 0
+        for row_group in range(parquet_file.num_row_groups):
+            row_group_starts.append(total_rows)
+            total_rows += parquet_file.metadata.row_group(row_group).num_rows
+        row_groups: dict = {}
+        for row in rows:
+            if row < total_rows:
+                row_group = bisect_right(row_group_starts, row) - 1
+                row_groups.setdefault(row_group, []).append(row - row_group_starts[row_group])
+        table = parquet_file.read_row_groups(list(row_groups.keys()), columns=projection)
+        positions = []
+        read_rows = 0
+        for row_group, group_rows in row_groups.items():
+            positions.extend(read_rows + row for row in group_rows)
+            read_rows += parquet_file.metadata.row_group(row_group).num_rows
+        return table.take(pyarrow.array(positions, type=pyarrow.int64()))
+
+    if selection is None and start_row > 0:
+        # the rows in each row group are known, so we can skip straight to the
+        # row group the start row is in
+        skipped_rows = 0
+        row_group = 0
+        while (
+            row_group < parquet_file.num_row_groups
+            and skipped_rows + parquet_file.metadata.row_group(row_group).num_rows <= start_row
+        ):
+            skipped_rows += parquet_file.metadata.row_group(row_group).num_rows
+            row_group += 1
+        table = parquet_file.read_row_groups(
+            range(row_group, parquet_file.num_row_groups), columns=projection
+        )
+        return table.slice(start_row - skipped_rows)
+
+    try:
+        stream.seek(0)
+        table = pq.read_table(stream, columns=projection, filters=selection)
+    except (pyarrow.ArrowException, TypeError, ValueError):
+        # the filters couldn't be applied (usually type mismatches), the filters
+        # are reapplied after the read so we can just read without them
+        stream.seek(0)
+        table = pq.read_table(stream, columns=projection)
+    return table.slice(start_row)
+
+
+def parquet(stream, projection=None, selection=None, start_row: int = 0, rows=None):
+    """
+    Read parquet formatted files, see `parquet_table` for the parameters
+    """
+    yield from parquet_table(stream, projection, selection, start_row, rows).to_pylist()
 
 
 def lines(stream):
     """
     Default reader, assumes text format
     """
-    text = stream.read()  # type:ignore
-    yield from text.splitlines()
+    yield from split_lines(stream)
 
 
 def block(stream):
@@ -74,4 +185,4 @@ def block(stream):
 def csv(stream):
     import csv
 
-    yield from csv.DictReader(stream.read().decode("utf8").splitlines())
+    yield from csv.DictReader(io.TextIOWrapper(stream, encoding="utf8", newline=""))
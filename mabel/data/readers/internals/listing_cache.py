@@ -0,0 +1,63 @@
+"""
+Listing Cache
+
+Listing the blobs in each partition is a round trip to the storage service, which
+for long date ranges can dominate the time to start reading. This caches the
+listings, in memory, so they are shared by all of the Readers in the process.
+
+Listings expire after a time-to-live, so new blobs and frames written to a
+partition are seen once the listing has expired. Only the most recently used
+listings are kept, so long running processes which read many partitions don't
+hold every listing.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable
+from typing import List
+from typing import Optional
+
+# the number of listings kept in the cache
+MAXIMUM_ENTRIES = 1024
+
+
+class ListingCache:
+    def __init__(self, maximum_entries: int = MAXIMUM_ENTRIES):
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.maximum_entries = maximum_entries
+
+    def get(self, key: Hashable) -> Optional[List[str]]:
+        """
+        Get a listing from the cache, None if it's not in the cache or has expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, blobs = entry
+            if expires < time.monotonic():
+                self._entries.pop(key, None)
+                return None
+            self._entries.move_to_end(key)
+            return list(blobs)
+
+    def set(self, key: Hashable, blobs: List[str], ttl: float):
+        """
+        Add a listing to the cache, discarding the least recently used listings if
+        the cache is full.
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, tuple(blobs))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maximum_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries = OrderedDict()
+
+
+# the cache is shared by all Readers in the process
+LISTING_CACHE = ListingCache()
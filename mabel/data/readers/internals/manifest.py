@@ -0,0 +1,114 @@
+"""
+Manifests
+
+The BlobWriter writes manifests containing zone maps (column statistics) and bloom
+filters for the blobs it writes, these are used to skip blobs which have no records
+which can match the filters, before any of the blobs are read.
+"""
+
+from typing import Dict
+from typing import List
+
+import orjson
+from orso.logging import get_logger
+
+from mabel.data.internals import zone_maps
+from mabel.data.internals.bloom_filter import BloomFilter
+
+
+def _folder(blob_name: str) -> str:
+    return blob_name.rsplit("/", 1)[0] if "/" in blob_name else ""
+
+
+def _filter_columns(predicates) -> set:
+    if isinstance(predicates, tuple):
+        return {predicates[0]}
+    if isinstance(predicates, list):
+        return set().union(*(_filter_columns(p) for p in predicates))
+    return set()
+
+
+def read_zone_maps(reader, blobs: List[str]) -> Dict[str, dict]:
+    """
+    Read the manifests in a list of blobs.
+
+    Returns:
+        A dictionary of the zone maps, keyed by the name of the blob they describe.
+    """
+    found: Dict[str, dict] = {}
+    for blob_name in blobs:
+        if not blob_name.endswith(zone_maps.MANIFEST_EXTENSION):
+            continue
+        try:
+            manifest = orjson.loads(reader.get_blob_bytes(blob_name))
+        except Exception as err:
+            get_logger().debug(f"Unable to read manifest `{blob_name}` - {err}")
+            continue
+        folder = _folder(blob_name)
+        for name, zone_map in manifest.items():
+            if "blooms" in zone_map:
+                bloom_filters = {
+                    column: BloomFilter.from_dict(data)
+                    for column, data in zone_map["blooms"].items()
+                }
+                zone_map["blooms"] = {
+                    column: bloom_filter
+                    for column, bloom_filter in bloom_filters.items()
+                    if bloom_filter is not None
+                }
+            found[f"{folder}/{name}" if folder else name] = zone_map
+    return found
+
+
+def prune_blobs(reader, readable_blobs: List[str], supported_blobs: List[str], dnf_filter):
+    """
+    Remove blobs which the zone maps show have no records which match the filter.
+    """
+    if dnf_filter.empty_filter:
+        return readable_blobs
+
+    found_zone_maps = read_zone_maps(reader, supported_blobs)
+    if not found_zone_maps:
+        return readable_blobs
+
+    pruned_blobs = []
+    zone_map_pruned = 0
+    bloom_pruned = 0
+    bytes_skipped = 0
+    for blob in readable_blobs:
+        zone_map = found_zone_maps.get(blob)
+        if zone_maps.excludes(dnf_filter.predicates, zone_map, use_blooms=False):
+            zone_map_pruned += 1
+        elif zone_maps.excludes(dnf_filter.predicates, zone_map):
+            bloom_pruned += 1
+        else:
+            pruned_blobs.append(blob)
+            continue
+        bytes_skipped += zone_map.get("bytes", 0)
+
+    if len(pruned_blobs) != len(readable_blobs):
+        get_logger().debug(
+            f"Zone maps removed {zone_map_pruned} and bloom filters removed {bloom_pruned} of {len(readable_blobs)} blobs from the read"
+        )
+
+    # report how effective the bloom filters on the filtered columns are
+    columns = _filter_columns(dnf_filter.predicates)
+    bloom_filters = [
+        bloom_filter
+        for blob in readable_blobs
+        for column, bloom_filter in found_zone_maps.get(blob, {}).get("blooms", {}).items()
+        if column in columns
+    ]
+    if bloom_filters:
+        get_logger().debug(
+            {
+                "bloom_filters": len(bloom_filters),
+                "bloom_filter_pruned_blobs": bloom_pruned,
+                "zone_map_pruned_blobs": zone_map_pruned,
+                "bytes_skipped": bytes_skipped,
+                "estimated_false_positive_rate": round(
+                    sum(b.false_positive_rate() for b in bloom_filters) / len(bloom_filters), 6
+                ),
+            }
+        )
+    return pruned_blobs
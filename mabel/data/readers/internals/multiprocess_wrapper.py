@@ -1,141 +1,189 @@
 """
-Multiprocessing is not faster in benchmarks, this is being retained but will need
-to be manually enabled.
-
-When a reliable use case for multiprocessing is identified it may be included into the
-automatic running of the data accesses.
+Multiprocess Reader
+
+Each blob is read by a worker process which runs the full reading pipeline for that
+blob (read, decompress, parse, project, filter and reduce). The surviving records
+are returned to the parent process in pages, each page is serialized with a single
+`orjson.dumps` call and deserialized with a single `orjson.loads` call - the
+records aren't re-serialized or re-parsed line-by-line.
+
+The parent only dispatches a limited number of blobs at a time (the in-flight
+budget) and the reply queue is bounded, so memory usage is bounded when the
+consumer is slower than the workers.
+
+┌────────┐  blob names  ┌──────────┐
+│        │ ───────────► │ worker 1 │──┐
+│ parent │              ├──────────┤  │ pages of
+│        │ ───────────► │ worker n │──┤ records
+│        │ ◄────────────┴──────────┴──┘
+└────────┘
 """
 
-import datetime
-import logging
+import decimal
 import multiprocessing
 import os
 import time
-from multiprocessing import Queue
 from queue import Empty
+from typing import Optional
 
-import lz4.frame
+import orjson
+from orso.logging import get_logger
 
-from .parsers import json
+from .parallel_reader import get_index_files
 
 TERMINATE_SIGNAL = -1
-MAXIMUM_SECONDS_PROCESSES_CAN_RUN = 600
-
+PAGE_SIZE = 1000
+MAXIMUM_SECONDS_WITHOUT_PROGRESS = 600
 
-def fix_dict(obj: dict) -> dict:
-    def fix_fields(dt):
-        dt_type = type(dt)
-        if dt_type in (int, float, bool, str):
-            return dt
-        if hasattr(dt, "mini"):
-            return dt.mini.decode("UTF8")
-        if dt_type == dict:
-            return str(fix_dict(dt))
-        if dt_type in (list, tuple, set):
-            return str([fix_fields(i) for i in dt])
-        if dt_type in (datetime.date, datetime.datetime):
-            return dt.isoformat()
-        if dt_type == bytes:
-            return dt.decode("UTF8")
-        return str(dt)
 
-    if not isinstance(obj, dict):
-        return obj  # type:ignore
+def _default(obj):
+    """
+    Types orjson doesn't serialize natively are converted to strings
+    """
+    if isinstance(obj, bytes):
+        return obj.decode("UTF8")
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    if hasattr(obj, "as_dict"):
+        return obj.as_dict()
+    return str(obj)
 
-    for key in obj.keys():
-        obj[key] = fix_fields(obj[key])
-    return obj
 
+def serialize(page):
+    return orjson.dumps(page, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
 
-def serialize(ob):
-    import orjson
 
-    return orjson.dumps(fix_dict(ob))
+def _get_context():
+    # workers inherit the reader by forking, this avoids the pipeline (including
+    # any storage clients) needing to be pickleable
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()  # pragma: no cover
 
 
-def _inner_process(func, source_queue, reply_queue):  # pragma: no cover
-    try:
-        source = source_queue.get(timeout=1)
-    except Empty:  # pragma: no cover
-        source = TERMINATE_SIGNAL
+def _inner_process(func, source_queue, reply_queue, page_size):  # pragma: no cover
+    source = source_queue.get()
 
     while source != TERMINATE_SIGNAL:
-        # non blocking wait - this isn't thread aware in that it can trivially
-        # have race conditions, but it will apply a simple back-off so we're
-        # not exhausting memory when we know we should wait
-        while reply_queue.full():
-            time.sleep(1)
-        # the empty list here is where the list of indicies should go
-        reply_queue.put(
-            lz4.frame.compress(b"\n".join(map(serialize, func(source, [])))),
-            timeout=30,
-        )
-        source = None
-        while source is None:
-            try:
-                source = source_queue.get(timeout=1)
-            except Empty:  # pragma: no cover
-                source = None
-
-
-def processed_reader(func, items_to_read, support_files):  # pragma: no cover
+        blob_name, index_files = source
+        try:
+            page = []
+            for record in func(blob_name, index_files):
+                page.append(record)
+                if len(page) >= page_size:
+                    reply_queue.put((blob_name, serialize(page)))
+                    page = []
+            if page:
+                reply_queue.put((blob_name, serialize(page)))
+        except Exception as err:
+            get_logger().error(
+                f"{blob_name} failed in reader process - {type(err).__name__} - {err}"
+            )
+        # None marks the end of the blob, even if the blob failed, so the parent
+        # can release the in-flight slot
+        reply_queue.put((blob_name, None))
+        source = source_queue.get()
+
+
+def processed_reader(
+    func,
+    items_to_read,
+    support_files,
+    *,
+    processes: Optional[int] = None,
+    blobs_in_flight: Optional[int] = None,
+    page_size: int = PAGE_SIZE,
+):  # pragma: no cover
+    """
+    Read a set of blobs using a pool of processes.
+
+    Parameters:
+        func: callable
+            The blob reading pipeline, usually a ParallelReader
+        items_to_read: list
+            The blobs to read
+        support_files: list
+            The supporting files (e.g. indexes) for the blobs
+        processes: integer (optional)
+            The number of worker processes, the default is one less than the number
+            of CPUs
+        blobs_in_flight: integer (optional)
+            The maximum number of blobs dispatched to the workers but not yet fully
+            returned to the parent, the default is twice the number of processes
+        page_size: integer (optional)
+            The number of records returned from the workers in each message
+
+    Yields:
+        dictionary
+    """
     if os.name == "nt":  # pragma: no cover
         raise NotImplementedError("Reader Multi Processing not available on Windows platforms")
 
-    process_pool = []
+    if len(items_to_read) == 0:
+        return
 
-    # determine the number of slots we're going to make available:
-    # - less than or equal to the number of files to read
-    # - one less than the CPUs we have
-    slots = max(min(len(items_to_read), multiprocessing.cpu_count() - 1), 2)
-    reply_queue = Queue(slots)
-
-    send_queue = multiprocessing.Queue()
-    for item_index in range(slots):
-        if item_index < len(items_to_read):
-            send_queue.put(items_to_read[item_index])
-
-    # We're going to use all but one CPU, unless there's 1 or 2 CPUs, then we're going
-    # to create two processes
-    for i in range(slots):
-        process = multiprocessing.Process(
+    processes = processes or (multiprocessing.cpu_count() - 1)
+    processes = max(min(processes, len(items_to_read)), 1)
+    blobs_in_flight = max(blobs_in_flight or (processes * 2), processes)
+
+    index_files = get_index_files(items_to_read, support_files)
+    pending = iter(items_to_read)
+
+    context = _get_context()
+    send_queue = context.Queue()
+    reply_queue = context.Queue(maxsize=processes * 4)
+
+    def dispatch():
+        blob = next(pending, None)
+        if blob is None:
+            return 0
+        send_queue.put((blob, index_files[blob]))
+        return 1
+
+    process_pool = []
+    for i in range(processes):
+        process = context.Process(
             target=_inner_process,
-            args=(func, send_queue, reply_queue),
+            args=(func, send_queue, reply_queue, page_size),
         )
         process.daemon = True
         process.start()
         process_pool.append(process)
 
-    process_start_time = time.time()
-    item_index = slots
+    in_flight = 0
+    for i in range(blobs_in_flight):
+        in_flight += dispatch()
 
-    while (
-        any({p.is_alive() for p in process_pool})
-        or not reply_queue.empty()
-        or not send_queue.empty()
-    ):
-        try:
-            records = reply_queue.get(timeout=1)
-            yield from map(json, [r for r in lz4.frame.decompress(records).split(b"\n") if r])
-            if item_index < len(items_to_read):
-                send_queue.put_nowait(items_to_read[item_index])
-                item_index += 1
+    last_progress = time.time()
+    try:
+        while in_flight > 0:
+            try:
+                blob_name, page = reply_queue.get(timeout=1)
+            except Empty:
+                if not any(p.is_alive() for p in process_pool):
+                    get_logger().error("All reader processes have terminated unexpectedly")
+                    break
+                if time.time() - last_progress > MAXIMUM_SECONDS_WITHOUT_PROGRESS:
+                    get_logger().error(
+                        f"Terminating reader processes after {MAXIMUM_SECONDS_WITHOUT_PROGRESS} seconds without progress"
+                    )
+                    break
+                continue
+
+            last_progress = time.time()
+            if page is None:
+                # the blob is complete, use the slot to start the next blob
+                in_flight -= 1
+                in_flight += dispatch()
             else:
-                send_queue.put_nowait(TERMINATE_SIGNAL)
-
-        except Empty:  # nosec
-            if time.time() - process_start_time > MAXIMUM_SECONDS_PROCESSES_CAN_RUN:
-                logging.error(
-                    f"Sending TERMINATE to long running multi-processed processes after {MAXIMUM_SECONDS_PROCESSES_CAN_RUN} seconds total run time"
-                )
-                break
-        except GeneratorExit:
-            logging.error("GENERATOR EXIT DETECTED")
-            break
-
-    reply_queue.close()
-    send_queue.close()
-    reply_queue.join_thread()
-    send_queue.join_thread()
-    for process in process_pool:
-        process.join()
+                yield from orjson.loads(page)
+    finally:
+        for process in process_pool:
+            send_queue.put(TERMINATE_SIGNAL)
+        for process in process_pool:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+        reply_queue.cancel_join_thread()
+        send_queue.close()
+        reply_queue.close()
@@ -21,20 +21,34 @@ dataset:
 │ Reduce     │ Aggregate                                                  │
 └────────────┴────────────────────────────────────────────────────────────┘
 """
+import io
 from enum import Enum
+from functools import partial
+from itertools import count
+from itertools import islice
 
 from orso import logging
 
+from mabel.data.internals import arrow_filters
+from mabel.data.internals import row_offsets
+from mabel.data.internals import secondary_index
 from mabel.data.internals.dnf_filters import DnfFilters
 from mabel.data.internals.expression import Expression
 from mabel.data.internals.records import flatten
 from mabel.utils import paths
 
+from . import arrow_reader
 from . import decompressors
 from . import parsers
+from . import pushdown
+from .arrow_reader import ArrowException
 
 logger = logging.get_logger()
 
+# reading rows from a blob by their offsets is one request for each set of
+# consecutive rows, if there are more sets than this the entire blob is read
+MAXIMUM_RANGED_READS: int = 16
+
 
 def empty_list(x):
     return []
@@ -68,10 +82,71 @@ KNOWN_EXTENSIONS = {
 pass_thru = lambda x: x
 
 
+def get_index_files(blobs, support_files):
+    """
+    Match the index files to the blobs they index, index files are named by
+    adding suffixes to the name of the blob they index (e.g. `blob.jsonl.idx`).
+
+    Returns:
+        A dictionary of the blobs to a list of their index files
+    """
+    index_files: dict = {blob: [] for blob in blobs}
+    for index_file in support_files:
+        ext = "." + index_file.split(".")[-1]
+        if ext not in KNOWN_EXTENSIONS or KNOWN_EXTENSIONS[ext][2] != EXTENSION_TYPE.INDEX:
+            continue
+        name = index_file.rsplit(".", 1)[0]
+        while name not in index_files and "." in name.split("/")[-1]:
+            name = name.rsplit(".", 1)[0]
+        if name in index_files:
+            index_files[name].append(index_file)
+    return index_files
+
+
 def no_filter(x):
     return True
 
 
+def keeps_columns(columns) -> bool:
+    """
+    The filters are applied to the records after they've been projected, so the
+    zone maps, bloom filters and secondary indexes, which describe the columns in
+    the blobs, can only be used with the filters if the projection keeps the
+    columns as they are in the blobs.
+    """
+    if columns is pass_thru:
+        return True
+    selection = arrow_reader.get_column_selection(columns)
+    return selection is not None and all(name == source for name, source in selection.items())
+
+
+def track_rows(iterator, position, first_row: int = 0, row_numbers=None):
+    """
+    Record the number of the row most recently read from the blob in the `offset`
+    attribute of `position` (usually a Cursor), so reading can be resumed from
+    that row. The rows are numbered from `first_row`, unless the `row_numbers` are
+    provided.
+    """
+    if row_numbers is None:
+        row_numbers = count(first_row)
+    for position.offset, row in zip(row_numbers, iterator):
+        yield row
+
+
+def take_rows(iterator, rows):
+    """
+    Only yield the rows with the given numbers, the rows must be in order.
+    """
+    wanted = iter(rows)
+    next_row = next(wanted, None)
+    for number, row in enumerate(iterator):
+        if next_row is None:
+            return
+        if number == next_row:
+            yield row
+            next_row = next(wanted, None)
+
+
 def expand_nested_json(row):
     # this is really slow - on a simple read it's roughly 60% of the execution
     if hasattr(row, "items"):
@@ -85,8 +160,6 @@ def expand_nested_json(row):
 
 
 class ParallelReader:
-    NOT_INDEXED = {-1}
-
     def __init__(
         self,
         reader,
@@ -94,6 +167,7 @@ class ParallelReader:
         columns="*",
         reducer=pass_thru,
         override_format=None,
+        engine="python",
         **kwargs,
     ):
         """
@@ -103,6 +177,9 @@ class ParallelReader:
             columns: callable
             filters: callable
             reducer: callable
+            engine: string
+                "python" to read blobs as records, "arrow" to read blobs which
+                can be decoded to Arrow tables as tables
             **kwargs: kwargs
         """
 
@@ -122,6 +199,14 @@ class ParallelReader:
 
         self.columns = columns
 
+        # formats which support it can be told which columns to read and which
+        # rows to skip, the filters from Expressions aren't lossless when converted
+        # to DNF so only DnfFilters are pushed
+        self.projection = pushdown.get_projection(columns)
+        self.selection = None
+        if isinstance(filters, DnfFilters):
+            self.selection = pushdown.get_selection(filters)
+
         # this is the filter of the collected data, this can be used
         # against more operators
         self.filters = filters
@@ -129,6 +214,8 @@ class ParallelReader:
         # this is aggregation and reducers for the data
         self.reducer = reducer
 
+        self.engine = engine
+
         # sometimes the user knows better
         self.override_format = override_format
 
@@ -137,7 +224,169 @@ class ParallelReader:
             if not self.override_format[0] == ".":
                 self.override_format = "." + self.override_format
 
-    def __call__(self, blob_name, index_files):
+    def _read_index_file(self, index_name, index_files):
+        if index_name not in index_files:
+            return None
+        try:
+            return self.reader.get_blob_bytes(index_name)
+        except Exception as err:
+            logger.debug(f"Unable to read index `{index_name}` - {err}")
+            return None
+
+    def _read_offsets(self, blob_name, index_files):
+        data = self._read_index_file(row_offsets.index_name(blob_name), index_files)
+        if data is None:
+            return None
+        return row_offsets.deserialize(data)
+
+    def _find_rows(self, blob_name, index_files):
+        """
+        Use the secondary indexes to find the rows which can match the filters,
+        None if all of the rows need to be read.
+        """
+        if not isinstance(self.filters, DnfFilters) or self.filters.empty_filter:
+            return None
+        if not keeps_columns(self.columns):
+            return None
+
+        indexes: dict = {}
+
+        def get_index(column):
+            if column not in indexes:
+                data = self._read_index_file(
+                    secondary_index.index_name(blob_name, column), index_files
+                )
+                indexes[column] = None
+                if data is not None:
+                    indexes[column] = secondary_index.SecondaryIndex.deserialize(data)
+            return indexes[column]
+
+        rows = secondary_index.rows_for_filter(self.filters.predicates, get_index)
+        if rows is not None:
+            logger.debug(f"Indexes found {len(rows)} rows which may match in `{blob_name}`")
+        return rows
+
+    def _read_ranges(self, blob_name, offsets, rows):
+        """
+        Read just the lines for the rows from the blob, None if there are too many
+        separate ranges to read.
+        """
+        ranges: list = []
+        for row in rows:
+            if ranges and ranges[-1][1] == row:
+                ranges[-1][1] = row + 1
+            else:
+                ranges.append([row, row + 1])
+        if len(ranges) > MAXIMUM_RANGED_READS:
+            return None
+
+        buffer = bytearray()
+        for first, last in ranges:
+            end = offsets[last] if last < len(offsets) else None
+            buffer.extend(self.reader.get_blob_range(blob_name, offsets[first], end))
+            if not buffer.endswith(b"\n"):
+                buffer.extend(b"\n")
+        return io.BytesIO(buffer)
+
+    def _read_records(
+        self, stream, ext, start_row=0, first_row=0, position=None, rows=None, row_numbers=None
+    ):
+        decompressor, parser, file_type = KNOWN_EXTENSIONS[ext]
+        if decompressor is decompressors.parquet:
+            decompressor = partial(
+                decompressor,
+                projection=self.projection,
+                selection=self.selection,
+                start_row=start_row,
+                rows=rows,
+            )
+            start_row = 0
+            rows = None
+
+        # Decompress
+        record_iterator = decompressor(stream)
+        # Skip the rows before the cursor and the rows the indexes say can't match,
+        # before we do any more work on them
+        if start_row > 0:
+            record_iterator = islice(record_iterator, start_row, None)
+        if rows is not None:
+            record_iterator = take_rows(record_iterator, rows)
+        if position is not None:
+            record_iterator = track_rows(record_iterator, position, first_row, row_numbers)
+        # Parse
+        record_iterator = map(parser, record_iterator)
+        # Expand Nested JSON
+        # record_iterator = map(expand_nested_json, record_iterator)
+        # Transform
+        record_iterator = map(self.columns, record_iterator)
+        # Filter
+        return filter(self.filters, record_iterator)
+
+    def _read_table(
+        self,
+        stream,
+        decoder,
+        start_row=0,
+        first_row=0,
+        position=None,
+        rows=None,
+        row_numbers=None,
+    ):
+        # Decode
+        table = decoder(
+            stream,
+            projection=self.projection,
+            selection=self.selection,
+            start_row=start_row,
+            rows=rows,
+        )
+
+        def records(table):
+            if position is None:
+                return arrow_reader.to_records(table)
+            return track_rows(arrow_reader.to_records(table), position, first_row, row_numbers)
+
+        # the filters are applied after the projection, so we can only filter the
+        # table if the projection is a selection of columns
+        column_selection = arrow_reader.get_column_selection(self.columns)
+        if column_selection is None and self.columns is not pass_thru:
+            record_iterator = map(self.columns, records(table))
+            return filter(self.filters, record_iterator)
+
+        # Transform
+        if column_selection is not None:
+            table = arrow_reader.select_columns(table, column_selection)
+        # Filter
+        if isinstance(self.filters, DnfFilters) and not self.filters.empty_filter:
+            try:
+                mask = arrow_filters.evaluate(self.filters.predicates, table)
+            except arrow_filters.CannotVectorize as err:
+                logger.debug(f"Unable to filter table, filtering records instead - {err}")
+                return filter(self.filters, records(table))
+            record_iterator = arrow_reader.to_records(table.filter(mask))
+            if position is not None:
+                # the rows which matched the filters, so the cursor can record
+                # the row in the blob for each record
+                matched_rows = arrow_filters.row_numbers(mask, first_row, row_numbers)
+                record_iterator = track_rows(record_iterator, position, 0, matched_rows)
+            return record_iterator
+        return filter(self.filters, records(table))
+
+    def __call__(self, blob_name, index_files, start_row: int = 0, position=None):
+        """
+        Read a blob.
+
+        Parameters:
+            blob_name: string
+                The blob to read
+            index_files: list of strings
+                The index files for the blob
+            start_row: integer (optional)
+                Skip the rows in the blob before this row
+            position: object (optional)
+                An object (usually a Cursor) to record the row in the blob of the
+                most recently read record in, as the `offset` attribute
+        """
         # print(blob_name, "in")
         try:
             if self.override_format:
@@ -147,24 +396,70 @@ class ParallelReader:
 
             if ext not in KNOWN_EXTENSIONS:
                 return []
-            decompressor, parser, file_type = KNOWN_EXTENSIONS[ext]
+
+            # the rows to read (None is all of them), and the numbers of the rows
+            # which are read when they aren't numbered from the start row
+            rows = None
+            row_numbers = None
+            first_row = start_row
+            offsets = None
+
+            # Use the indexes to find the rows which can match the filters
+            found_rows = self._find_rows(blob_name, index_files)
+            if found_rows is not None:
+                rows = [row for row in sorted(found_rows) if row >= start_row]
+                if len(rows) == 0:
+                    return []
+                row_numbers = rows
+                start_row = 0
+
+            is_lines = KNOWN_EXTENSIONS[ext][0] is decompressors.lines
+            if is_lines and (start_row > 0 or rows is not None):
+                offsets = self._read_offsets(blob_name, index_files)
 
             # Read
-            record_iterator = self.reader.read_blob(blob_name)
-            # Decompress
-            record_iterator = decompressor(record_iterator)
-            # Parse
-            record_iterator = map(parser, record_iterator)
-            # Expand Nested JSON
-            # record_iterator = map(expand_nested_json, record_iterator)
-            # Transform
-            record_iterator = map(self.columns, record_iterator)
-            # Filter
-            record_iterator = filter(self.filters, record_iterator)
-            # Reduce
-            record_iterator = self.reducer(record_iterator)
-            # Yield
-            yield from record_iterator
+            stream = None
+            if rows is not None and offsets is not None:
+                # if we know where the rows are we can just read those rows
+                stream = self._read_ranges(blob_name, offsets, rows)
+                if stream is not None:
+                    rows = None
+            if stream is None:
+                stream = self.reader.read_blob(blob_name)
+            try:
+                if start_row > 0 and offsets is not None:
+                    # if we know where the rows start we can go straight to the row
+                    stream = decompressors.seekable(stream)
+                    row_offsets.seek_to_row(stream, offsets, start_row)
+                    start_row = 0
+
+                decoder = None
+                if self.engine == "arrow":
+                    decoder = arrow_reader.get_decoder(ext)
+                if decoder is not None:
+                    stream = decompressors.seekable(stream)
+                    start_position = stream.tell()
+                    try:
+                        record_iterator = self._read_table(
+                            stream, decoder, start_row, first_row, position, rows, row_numbers
+                        )
+                    except (ArrowException, ValueError) as err:
+                        # usually JSON which Arrow can't infer a schema for
+                        logger.debug(f"Unable to decode `{blob_name}` to a table - {err}")
+                        stream.seek(start_position)
+                        record_iterator = self._read_records(
+                            stream, ext, start_row, first_row, position, rows, row_numbers
+                        )
+                else:
+                    record_iterator = self._read_records(
+                        stream, ext, start_row, first_row, position, rows, row_numbers
+                    )
+                # Reduce
+                record_iterator = self.reducer(record_iterator)
+                # Yield
+                yield from record_iterator
+            finally:
+                stream.close()
             # print(blob_name, "out")
         except Exception as e:
             import traceback
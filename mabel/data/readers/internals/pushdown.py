@@ -0,0 +1,137 @@
+"""
+Pushdown
+
+Some formats (currently parquet) can apply projections and filters as the data is
+read, which avoids decoding columns, and reading row groups, the query doesn't
+need. These functions work out which parts of the query can be pushed to the
+format reader.
+
+Pushdown is only an optimization, the full projection and filters are still applied
+to the records after they have been read, this means the pushed filters only need
+to be at least as permissive as the full filters - any predicate which can't be
+pushed is dropped from its conjunction.
+"""
+
+import datetime
+import decimal
+from typing import List
+from typing import Optional
+
+from mabel.utils.token_labeler import TOKENS
+
+# the DNF operators and their equivalents in the pyarrow DNF filter syntax
+PUSHABLE_OPERATORS = {
+    "=": "==",
+    "==": "==",
+    "!=": "!=",
+    "<>": "!=",
+    "<": "<",
+    ">": ">",
+    "<=": "<=",
+    ">=": ">=",
+    "in": "in",
+    "!in": "not in",
+    "not in": "not in",
+}
+PUSHABLE_TYPES = (bool, int, float, str, decimal.Decimal, datetime.date, datetime.datetime)
+
+
+def get_projection(columns) -> Optional[List[str]]:
+    """
+    Get the columns referenced by a select Evaluator.
+
+    Returns:
+        A list of column names, or None if all of the columns are needed.
+    """
+    tokens = getattr(columns, "tokens", None)
+    if tokens is None:
+        return None
+
+    referenced: List[str] = []
+
+    def _inner(tokens):
+        for token in tokens:
+            if token["type"] == TOKENS.EVERYTHING:
+                return False
+            if token["type"] == TOKENS.VARIABLE:
+                name = token["value"]
+                if name[0] == name[-1] == "`":
+                    name = name[1:-1]
+                if name not in referenced:
+                    referenced.append(name)
+            elif token["type"] in (TOKENS.FUNCTION, TOKENS.AGGREGATOR):
+                if not _inner(token["parameters"]):
+                    return False
+        return True
+
+    if not _inner(tokens):
+        return None
+    return referenced
+
+
+def _convert_predicate(predicate):
+    if not isinstance(predicate, tuple) or len(predicate) != 3:
+        return None
+    key, op, value = predicate
+    if not isinstance(key, str) or not isinstance(op, str):
+        return None
+    op = PUSHABLE_OPERATORS.get(op.lower())
+    if op is None:
+        return None
+    if op in ("in", "not in"):
+        if not isinstance(value, (list, tuple, set, frozenset)):
+            return None
+        if not all(isinstance(v, PUSHABLE_TYPES) for v in value):
+            return None
+        return (key, op, list(value))
+    if not isinstance(value, PUSHABLE_TYPES):
+        return None
+    return (key, op, value)
+
+
+def get_selection(dnf_filter) -> Optional[List[List[tuple]]]:
+    """
+    Convert the parts of a DnfFilters which can be pushed to the format reader into
+    the pyarrow DNF syntax (a list of lists of tuples).
+
+    Returns:
+        A list of conjunctions, or None if nothing can be pushed.
+    """
+    predicates = getattr(dnf_filter, "predicates", None)
+    if not predicates:
+        return None
+    if isinstance(predicates, tuple):
+        predicates = [predicates]
+
+    if all(isinstance(p, tuple) for p in predicates):
+        conjunctions = [predicates]
+    elif all(isinstance(p, list) for p in predicates):
+        conjunctions = predicates
+    else:
+        return None
+
+    selection = []
+    for conjunction in conjunctions:
+        if not all(isinstance(p, tuple) for p in conjunction):
+            return None
+        pushable = [p for p in map(_convert_predicate, conjunction) if p is not None]
+        # if any part of a disjunction can't be restricted, the disjunction can't be
+        if len(pushable) == 0:
+            return None
+        selection.append(pushable)
+    return selection
+
+
+def restrict_selection(selection, columns) -> Optional[List[List[tuple]]]:
+    """
+    Remove predicates on columns which aren't in the data being read.
+    """
+    if selection is None:
+        return None
+    restricted = []
+    for conjunction in selection:
+        conjunction = [p for p in conjunction if p[0] in columns]
+        if len(conjunction) == 0:
+            return None
+        restricted.append(conjunction)
+    return restricted
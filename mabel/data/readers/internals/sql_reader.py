@@ -258,41 +258,17 @@ def SqlReader(sql_statement: str, **kwargs):
     elif sql.select_expression != "*":
         actual_select = sql.select_expression + ", *"
 
-    reducer = None
-    if sql.select_expression == "COUNT(*)":
-        reducer = lambda x: {"*": "*"}
-
-    # FROM clause
-    # WHERE clause
-    if isinstance(sql.dataset, list):
-        # it's a list if it's been parsed into a SQL statement,
-        # this is how subqueries are interpretted - the parser
-        # doesn't extract a dataset name - it collects parts of
-        # a SQL statement which it can then pass to a SqlReader
-        # to get back a dataset - which we then use as the
-        # dataset for the outer query.
-        reader = SqlReader("".join(sql.dataset), **kwargs)
-    else:
-        reader = Reader(
-            select=actual_select,
-            dataset=sql.dataset,
-            filters=sql.where_expression,
-            **kwargs,
-        )
-
-    # GROUP BY clause
+    groups = None
+    aggregations = []
     if sql.group_by or any(
         [t["type"] == TOKENS.AGGREGATOR for t in sql.select_evaluator.tokens]  # type:ignore
     ):
-        from ...internals.group_by import GroupBy
-
         # convert the clause into something we can pass to GroupBy
         if sql.group_by:
             groups = [group.strip() for group in sql.group_by.split(",") if group.strip() != ""]
         else:
             groups = ["*"]  # we're not really grouping
 
-        aggregations = []
         renames = []
         for t in sql.select_evaluator.tokens:  # type:ignore
             if t["type"] == TOKENS.AGGREGATOR:
@@ -305,7 +281,41 @@ def SqlReader(sql_statement: str, **kwargs):
                     "Invalid SQL - SELECT clause in a statement with a GROUP BY clause must be made of aggregations or items from the GROUP BY clause."
                 )
 
+    # FROM clause
+    # WHERE clause
+    partials = False
+    if isinstance(sql.dataset, list):
+        # it's a list if it's been parsed into a SQL statement,
+        # this is how subqueries are interpretted - the parser
+        # doesn't extract a dataset name - it collects parts of
+        # a SQL statement which it can then pass to a SqlReader
+        # to get back a dataset - which we then use as the
+        # dataset for the outer query.
+        reader = SqlReader("".join(sql.dataset), **kwargs)
+    else:
+        reducer = None
         if aggregations:
+            # aggregate each blob as it's read (in the worker processes if the
+            # read is multiprocessed), the partial aggregations are combined below
+            from ...internals.group_by import partial_aggregator
+
+            reducer = partial_aggregator(groups, aggregations)
+            partials = True
+        reader = Reader(
+            select=actual_select,
+            dataset=sql.dataset,
+            filters=sql.where_expression,
+            reducer=reducer,
+            **kwargs,
+        )
+
+    # GROUP BY clause
+    if groups is not None:
+        from ...internals.group_by import GroupBy
+
+        if partials:
+            grouped = GroupBy(reader, groups).aggregate_partials(aggregations)
+        elif aggregations:
             grouped = GroupBy(reader, groups).aggregate(aggregations)
         else:
             grouped = GroupBy(reader, groups).groups()
@@ -340,12 +350,15 @@ def SqlReader(sql_statement: str, **kwargs):
 
     # ORDER BY clause
     if sql.order_by:
-        take = 10000  # the Query UI is currently set to 2000
         if sql.limit:
-            take = int(sql.limit)
-        reader = DictSet(
-            reader.sort_and_take(column=sql.order_by, take=take, descending=sql.order_descending)
-        )
+            reader = DictSet(
+                reader.sort_and_take(
+                    column=sql.order_by, take=int(sql.limit), descending=sql.order_descending
+                )
+            )
+        else:
+            # without a LIMIT, all of the records are sorted, spilling to disk
+            reader = reader.sort(column=sql.order_by, descending=sql.order_descending)
 
     # LIMIT clause
     if sql.limit:
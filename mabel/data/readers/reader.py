@@ -9,15 +9,21 @@ from mabel.data.internals.dictset import STORAGE_CLASS
 from mabel.data.internals.dictset import DictSet
 from mabel.data.internals.dnf_filters import DnfFilters
 from mabel.data.internals.expression import Expression
+from mabel.data.readers.internals.blob_prefetcher import DEFAULT_PREFETCH_BYTES
+from mabel.data.readers.internals.blob_prefetcher import BlobPrefetcher
 from mabel.data.readers.internals.cursor import Cursor
 from mabel.data.readers.internals.inline_evaluator import Evaluator
+from mabel.data.readers.internals.manifest import prune_blobs
 from mabel.data.readers.internals.multiprocess_wrapper import processed_reader
 from mabel.data.readers.internals.parallel_reader import EXTENSION_TYPE
 from mabel.data.readers.internals.parallel_reader import KNOWN_EXTENSIONS
 from mabel.data.readers.internals.parallel_reader import ParallelReader
+from mabel.data.readers.internals.parallel_reader import get_index_files
+from mabel.data.readers.internals.parallel_reader import keeps_columns
 from mabel.data.readers.internals.parallel_reader import pass_thru
 from mabel.errors import DataNotFoundError
 from mabel.errors import InvalidCombinationError
+from mabel.errors import InvalidReaderConfigError
 from mabel.utils.dates import parse_delta
 from mabel.utils.parameter_validator import validate
 
@@ -33,8 +39,16 @@ RULES = [
     {"name": "start_date", "required": False, "warning": None, "incompatible_with": []},
     {"name": "filters", "required": False, "warning": "", "incompatible_with": []},
     {"name": "persistence", "required": False, "warning": "", "incompatible_with": []},
+    {"name": "row_codec", "required": False, "warning": None, "incompatible_with": []},
+    {"name": "reducer", "required": False, "warning": None, "incompatible_with": ["cursor"]},
     {"name": "override_format", "required": False, "warning": "", "incompatible_with": []},
     {"name": "multiprocess", "required": False, "warning": "", "incompatible_with": ["cursor"]},
+    {"name": "processes", "required": False, "warning": None, "incompatible_with": []},
+    {"name": "blobs_in_flight", "required": False, "warning": None, "incompatible_with": []},
+    {"name": "prefetch", "required": False, "warning": None, "incompatible_with": []},
+    {"name": "prefetch_bytes", "required": False, "warning": None, "incompatible_with": []},
+    {"name": "engine", "required": False, "warning": None, "incompatible_with": []},
+    {"name": "listing_cache_ttl", "required": False, "warning": None, "incompatible_with": []},
     {"name": "valid_dataset_prefixes", "required": False},
     {"name": "partitions", "required": False, "warning": None, "incompatible_with": ["raw_path"]},
     {"name": "partition_filter", "required":False, "warning":"`partition_filter` is not expected to be a permanent addition to the API", "incompatible_with": ["freshness_limit"] },
@@ -56,12 +70,19 @@ def Reader(
     inner_reader=None,  # type:ignore
     raw_path: bool = None,
     persistence: STORAGE_CLASS = STORAGE_CLASS.NO_PERSISTANCE,
+    row_codec: str = "json",
     override_format: Optional[str] = None,
     multiprocess: bool = False,
+    processes: Optional[int] = None,
+    blobs_in_flight: Optional[int] = None,
+    prefetch: int = 0,
+    prefetch_bytes: int = DEFAULT_PREFETCH_BYTES,
+    engine: str = "python",
     cursor: Optional[Union[str, Dict]] = None,
     valid_dataset_prefixes: Optional[list] = None,
     partitions=["year_{yyyy}/month_{mm}/day_{dd}"],
     partition_filter=None,
+    reducer=None,
     **kwargs,
 ) -> DictSet:
     """
@@ -113,11 +134,22 @@ def Reader(
             incidates the maximum age of a dataset before it is no longer
             considered fresh. Where the 'time' of a dataset cannot be
             determined, it will be treated as midnight (00:00) for the date.
+        listing_cache_ttl: integer (optional)
+            The number of seconds to cache the listings of partitions for, the cache
+            is shared by all Readers in the process which read from the same
+            storage with the same credentials. Blobs written while a listing is
+            cached aren't seen until it expires. The default is 0, which doesn't
+            cache listings.
         persistence: STORAGE_CLASS (optional)
             How to cache the results, the default is NO_PERSISTANCE which will almost
             always return a generator. MEMORY should only be used where the dataset
             isn't huge and DISK is many times slower than MEMORY. COMPRESSED_MEMORY
             fits in between, usually faster than DISK but slower than MEMORY.
+        row_codec: string (optional)
+            How records are converted to bytes when `persistence` is DISK or
+            COMPRESSED_MEMORY, the default is "json". "msgpack" is faster and
+            Decimals, datetimes, dates, times, timedeltas and bytes keep their
+            types.
         cursor: dictionary (or string)
             Resume read from a given point (assumes other parameters are the same).
             If a JSON string is provided, it will converted to a dictionary.
@@ -127,6 +159,29 @@ def Reader(
             Split the task over multiple CPUs to improve throughput. Note that there
             are conditions that must be met for the multiprocessor to be safe which
             may mean even though this is set, data is accessed serially.
+        processes: integer (optional)
+            The number of processes to use when `multiprocess` is set, the default
+            is one less than the number of CPUs.
+        blobs_in_flight: integer (optional)
+            The maximum number of blobs being read by the processes at any time
+            when `multiprocess` is set, the default is twice the number of
+            processes.
+        prefetch: integer (optional)
+            The number of blobs to download in the background while the current
+            blob is being processed, the default is 0 which disables prefetching.
+            This only applies when data is read serially. Prefetched blobs are
+            held in memory in full, rather than being streamed as they're read,
+            so prefetching uses up to `prefetch_bytes` (plus the blobs being
+            downloaded) more memory.
+        prefetch_bytes: integer (optional)
+            The maximum number of prefetched bytes to hold in memory, the default
+            is 128Mb.
+        engine: string (optional)
+            How to process the data, the default is "python" which reads each blob
+            as records. "arrow" reads parquet, jsonl and zstd blobs as Arrow tables
+            and applies DNF filters and projections (without functions) to the
+            tables, records are only created for the data which is returned. Other
+            formats, and other filters, are processed as records.
         valid_dataset_prefixes: list (optional)
             Raises an error if the start of the dataset isn't on the list. The
             intended use is for situations where an external agent can initiate
@@ -138,6 +193,11 @@ def Reader(
         partition_filter: tuple (optional)
             Provide a hint on how to filter the partitions, as a single tuple in DNF
             notiation, this may be ignored.
+        reducer: callable (optional)
+            A function applied to the records of each blob, after they have been
+            filtered and selected, which returns the records to return. This runs
+            in the worker processes when `multiprocess` is set, e.g. to partially
+            aggregate each blob with `partial_aggregator`.
 
     Returns:
         DictSet
@@ -150,6 +210,9 @@ def Reader(
         if not any([True for prefix in valid_dataset_prefixes if str(dataset).startswith(prefix)]):
             raise AccessDenied("Access has been denied to this Dataset (prefix).")
 
+    if engine not in ("python", "arrow"):
+        raise InvalidReaderConfigError(f"Unknown engine `{engine}`, expected `python` or `arrow`")
+
     # lazy loading of dependency - in this case the Google GCS Reader
     # eager loading will cause failures when we try to load the google-cloud
     # libraries and they aren't installed.
@@ -194,8 +257,15 @@ def Reader(
             override_format=override_format,
             cursor=cursor,
             multiprocess=multiprocess,
+            processes=processes,
+            blobs_in_flight=blobs_in_flight,
+            prefetch=prefetch,
+            prefetch_bytes=prefetch_bytes,
+            engine=engine,
+            reducer=reducer,
         ),
         storage_class=persistence,
+        row_codec=row_codec,
     )
 
 
@@ -209,6 +279,12 @@ class _LowLevelReader(object):
         override_format,
         cursor,
         multiprocess,
+        processes=None,
+        blobs_in_flight=None,
+        prefetch=0,
+        prefetch_bytes=DEFAULT_PREFETCH_BYTES,
+        engine="python",
+        reducer=None,
     ):
         self.reader_class = reader_class
         self.freshness_limit = freshness_limit
@@ -217,6 +293,12 @@ class _LowLevelReader(object):
         self.cursor = cursor
         self._inner_line_reader = None
         self.multiprocess = multiprocess
+        self.processes = processes
+        self.blobs_in_flight = blobs_in_flight
+        self.prefetch = prefetch
+        self.prefetch_bytes = prefetch_bytes
+        self.engine = engine
+        self.reducer = reducer or pass_thru
 
         if isinstance(filters, str):
             self.filters = Expression(filters)
@@ -266,12 +348,14 @@ class _LowLevelReader(object):
         else:
             get_logger().debug(message)
 
-        parallel = ParallelReader(
-            reader=self.reader_class,
-            columns=self.select,
-            filters=self.filters or pass_thru,
-            override_format=self.override_format,
-        )
+        # skip the blobs which the zone maps in the manifests say can't match the
+        # filters, the filters from Expressions aren't lossless when converted to
+        # DNF so only DnfFilters are used, and the filters are applied after the
+        # projection so they can only be used if it doesn't change the columns
+        if isinstance(self.filters, DnfFilters) and keeps_columns(self.select):
+            readable_blobs = prune_blobs(
+                self.reader_class, readable_blobs, supported_blobs, self.filters
+            )
 
         use_multiprocess = all(
             [
@@ -281,30 +365,56 @@ class _LowLevelReader(object):
             ]
         )
 
+        # when we're reading serially, download the next blobs in the background
+        # while we process the current one
+        prefetcher = None
+        if not use_multiprocess:
+            prefetcher = BlobPrefetcher(
+                self.reader_class, blobs=self.prefetch, byte_budget=self.prefetch_bytes
+            )
+
+        parallel = ParallelReader(
+            reader=prefetcher or self.reader_class,
+            columns=self.select,
+            filters=self.filters or pass_thru,
+            reducer=self.reducer,
+            override_format=self.override_format,
+            engine=self.engine,
+        )
+
         if not use_multiprocess:
             get_logger().debug(f"Serial Reader {self.cursor}")
             if not isinstance(self.cursor, Cursor):
                 cursor = Cursor(readable_blobs=readable_blobs, cursor=self.cursor)
                 self.cursor = cursor
-
-            blob_to_read = self.cursor.next_blob()
-            while blob_to_read:
-                blob_reader = parallel(
-                    blob_to_read,
-                    [
-                        idx
-                        for idx in supported_blobs
-                        if blob_to_read in idx and idx.endswith(".idx")
-                    ],
-                )
-                location = self.cursor.skip_to_cursor(blob_reader)
-                for self.cursor.location, record in enumerate(blob_reader, start=location):
-                    yield record
-                blob_to_read = self.cursor.next_blob(blob_to_read)
+            index_files = get_index_files(readable_blobs, supported_blobs)
+
+            try:
+                blob_to_read = self.cursor.next_blob()
+                while blob_to_read:
+                    prefetcher.prefetch(self.cursor.upcoming_blobs(self.prefetch))
+                    blob_reader = parallel(
+                        blob_to_read,
+                        index_files.get(blob_to_read, []),
+                        start_row=self.cursor.start_row(),
+                        position=self.cursor,
+                    )
+                    location = self.cursor.skip_to_cursor(blob_reader)
+                    for self.cursor.location, record in enumerate(blob_reader, start=location):
+                        yield record
+                    blob_to_read = self.cursor.next_blob(blob_to_read)
+            finally:
+                prefetcher.close()
 
         else:
             get_logger().debug("Parallel Reader")
-            yield from processed_reader(parallel, readable_blobs, supported_blobs)
+            yield from processed_reader(
+                parallel,
+                readable_blobs,
+                supported_blobs,
+                processes=self.processes,
+                blobs_in_flight=self.blobs_in_flight,
+            )
 
     def __iter__(self):
         return self
@@ -7,7 +7,10 @@ from typing import Union
 import orjson
 from orso.schema import RelationSchema
 
-__all__ = ["schema_loader"]
+from mabel.data.validator.block_validation import validate_block
+from mabel.data.validator.block_validation import validate_table
+
+__all__ = ["schema_loader", "validate_block", "validate_table"]
 
 
 def schema_loader(
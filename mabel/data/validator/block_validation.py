@@ -0,0 +1,143 @@
+"""
+Block Validation
+
+Validate a block of records against a schema a column at a time rather than a
+record at a time.
+
+For each column the types of the values in the block are collected into a set and
+checked against the type of the column, so the check is per distinct type rather
+than per value. Records which have different columns to the schema, or have values
+of the wrong type, are validated individually with `RelationSchema.validate` so
+the errors are the same as when validating one record at a time.
+"""
+
+from operator import itemgetter
+from typing import List
+from typing import Tuple
+
+from orso.schema import RelationSchema
+from orso.types import ORSO_TO_PYTHON_MAP
+from orso.types import OrsoTypes
+
+NoneType = type(None)
+
+
+def _invalid_types(types: set, expected, nullable: bool) -> set:
+    # the types which aren't instances of the expected type
+    return {
+        kind
+        for kind in types
+        if not issubclass(kind, expected) and not (nullable and kind is NoneType)
+    }
+
+
+def validate_block(schema: RelationSchema, records: List[dict]) -> List[Tuple[int, Exception]]:
+    """
+    Validate a block of records against a schema.
+
+    Parameters:
+        schema: RelationSchema
+            The schema to validate against
+        records: list of dictionaries
+            The records to validate
+
+    Returns:
+        list of tuples
+            The position and the validation error of each invalid record, in the
+            order of the records
+    """
+    column_names = {column.name for column in schema.columns}
+
+    # records with columns which aren't in the schema, or missing columns from the
+    # schema, are validated individually
+    suspects = {
+        position
+        for position, record in enumerate(records)
+        if not isinstance(record, dict) or record.keys() != column_names
+    }
+    if len(suspects) < len(records):
+        # the records with the same columns as the schema
+        positions = [position for position in range(len(records)) if position not in suspects]
+        candidates = [records[position] for position in positions]
+        for column in schema.columns:
+            expected = ORSO_TO_PYTHON_MAP.get(column.type)
+            if column.type == OrsoTypes._MISSING_TYPE or expected is None:
+                continue
+            values = list(map(itemgetter(column.name), candidates))
+            invalid = _invalid_types(set(map(type, values)), expected, column.nullable)
+            if invalid:
+                # only the records with these types need to be checked
+                suspects.update(
+                    position for position, value in zip(positions, values) if type(value) in invalid
+                )
+
+    failures = []
+    for position in sorted(suspects):
+        try:
+            schema.validate(records[position])
+        except Exception as err:
+            failures.append((position, err))
+    return failures
+
+
+def _arrow_type_checks():
+    import pyarrow.types as types
+
+    return {
+        OrsoTypes.VARCHAR: lambda t: types.is_string(t) or types.is_large_string(t),
+        OrsoTypes.INTEGER: types.is_integer,
+        OrsoTypes.DOUBLE: types.is_floating,
+        OrsoTypes.BOOLEAN: types.is_boolean,
+        OrsoTypes.TIMESTAMP: types.is_timestamp,
+        OrsoTypes.DATE: types.is_date,
+        OrsoTypes.TIME: types.is_time,
+        OrsoTypes.INTERVAL: types.is_duration,
+        OrsoTypes.DECIMAL: types.is_decimal,
+        OrsoTypes.BLOB: lambda t: types.is_binary(t) or types.is_large_binary(t),
+        OrsoTypes.ARRAY: lambda t: types.is_list(t) or types.is_large_list(t),
+        OrsoTypes.STRUCT: types.is_struct,
+    }
+
+
+def validate_table(schema: RelationSchema, table, block_size: int = 10000):
+    """
+    Validate an Arrow table against a schema.
+
+    The types of the columns in the table are checked against the schema, if they
+    all match no values need to be checked. Otherwise the records in the table are
+    validated in blocks with `validate_block`.
+
+    Returns:
+        list of tuples
+            The position and the validation error of each invalid record
+    """
+    checks = _arrow_type_checks()
+
+    def table_matches():
+        if set(table.column_names) != {column.name for column in schema.columns}:
+            return False
+        for column in schema.columns:
+            if column.type == OrsoTypes._MISSING_TYPE:
+                continue
+            check = checks.get(column.type)
+            values = table.column(column.name)
+            if values.null_count > 0 and not column.nullable:
+                return False
+            if values.null_count == len(values) and column.nullable:
+                # all nulls, the type of the column doesn't matter
+                continue
+            if check is None or not check(values.type):
+                return False
+        return True
+
+    if table_matches():
+        return []
+
+    failures = []
+    offset = 0
+    for batch in table.to_batches(max_chunksize=block_size):
+        failures.extend(
+            (offset + position, err) for position, err in validate_block(schema, batch.to_pylist())
+        )
+        offset += batch.num_rows
+    return failures
@@ -59,6 +59,13 @@ class BatchWriter(Writer):
                 Don't automatically add any date parts to dataset names
             index_on: collection (optional)
                 Index on these columns, the default is to not index
+            bloom_on: collection (optional)
+                Build bloom filters on these columns, the default is to not
+                build bloom filters
+            commit_workers: integer (optional)
+                The number of blobs to encode and commit in the background while
+                records are appended to the next blob, the default is 0 which
+                commits blobs on the appending thread
             metadata: dict (optional)
                 data to write into the frame.complete file
             always_complete: bool (optional)
@@ -36,9 +36,12 @@ class BaseInnerWriter(abc.ABC):
         self.filename = self.bucket + "/" + path + STEM + self.extension
         self.filename_without_bucket = path + STEM + self.extension
 
-    def _build_path(self):
+    def _build_path(self, extension=None):
         blob_id = f"{time.time_ns():x}-{self._get_node()}"
-        return self.filename.replace(STEM, f"{blob_id}")
+        filename = self.filename
+        if extension is not None:
+            filename = filename[: -len(self.extension)] + extension
+        return filename.replace(STEM, f"{blob_id}")
 
     @lru_cache(1)
     def _get_node(self):
@@ -1,6 +1,11 @@
 import io
 import json
 import threading
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from itertools import accumulate
+from typing import Iterable
 from typing import Optional
 
 import orjson
@@ -9,13 +14,136 @@ import zstandard
 from orso.logging import get_logger
 from orso.schema import RelationSchema
 
+from mabel.data.internals import row_offsets
+from mabel.data.internals import zone_maps
+from mabel.data.internals.bloom_filter import BloomFilter
 from mabel.data.internals.records import flatten
+from mabel.data.internals.secondary_index import SecondaryIndex
+from mabel.data.internals.secondary_index import index_name
 from mabel.data.validator import schema_loader
 from mabel.errors import MissingDependencyError
 
 # we use 62Mb to allow for headers/footers and errors in calcs
 BLOB_SIZE = 62 * 1024 * 1024  # 64Mb, 16 files per gigabyte
 SUPPORTED_FORMATS_ALGORITHMS = ("jsonl", "zstd", "parquet", "text", "flat")
+# the formats which are written with an index of the offsets of each row
+ROW_OFFSET_FORMATS = ("jsonl", "flat")
+# the number of rows converted to an Arrow table at a time when appending in bulk
+ARROW_BATCH_SIZE = 10000
+# parquet files are written a row group at a time, the rows appended are held until
+# there are this many rows, or this many bytes, and are then written as a row group
+ROW_GROUP_SIZE = 100000
+ROW_GROUP_BYTES = 16 * 1024 * 1024
+# the size of the rows held for a row group is estimated from one row in this many
+WAL_SAMPLE_ROWS = 64
+
+
+def _serialize_text(record) -> bytes:
+    if isinstance(record, bytes):
+        return record + b"\n"
+    if isinstance(record, str):
+        return record.encode() + b"\n"
+    return str(record).encode() + b"\n"
+
+
+def _serialize_json(record) -> bytes:
+    if hasattr(record, "mini"):
+        return record.mini + b"\n"  # type:ignore
+    try:
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)  # type:ignore
+    except TypeError:
+        return json.dumps(record).encode() + b"\n"
+
+
+def _estimate_size(record) -> int:
+    try:
+        return len(orjson.dumps(record, default=str))
+    except TypeError:
+        return len(str(record))
+
+
+# flat records are flattened before they're serialized, so they're written as JSON
+SERIALIZERS = {"text": _serialize_text}
+
+
+class _PendingBlob:
+    """
+    The records in a blob which is being committed, taken from the BlobWriter so
+    it can carry on appending to a new buffer.
+    """
+
+    __slots__ = ("buffer", "offsets", "column_values", "parquet", "zone_map", "records")
+
+
+class _ParquetBlob:
+    """
+    A parquet file which is written a row group at a time, with the zone map and
+    the values for the indexes and bloom filters of the rows written so far.
+    """
+
+    def __init__(self, columns: Iterable[str] = ()):
+        self.sink = io.BytesIO()
+        self.writer = None
+        self.zone_map = zone_maps.ZoneMapBuilder()
+        self.column_values: dict = {column: [] for column in columns}
+
+    def size(self) -> int:
+        """
+        The number of bytes written to the file so far.
+        """
+        return self.sink.tell()
+
+    def write(self, table) -> bool:
+        """
+        Write a table to the file as a row group.
+
+        Returns:
+            False if the table can't be converted to the schema of the file
+        """
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:  # pragma: no cover
+            raise MissingDependencyError(
+                "`pyarrow` is missing, please install or include in requirements.txt"
+            )
+
+        if self.writer is None:
+            self.writer = pyarrow.parquet.ParquetWriter(self.sink, table.schema, compression="zstd")
+        elif not table.schema.equals(self.writer.schema):
+            # only columns which are all null are converted to the type in the file,
+            # other conversions can lose values (e.g. fields in structs)
+            if table.schema.names != self.writer.schema.names or not all(
+                kind == expected or pyarrow.types.is_null(kind)
+                for kind, expected in zip(table.schema.types, self.writer.schema.types)
+            ):
+                return False
+            try:
+                table = table.cast(self.writer.schema)
+            except (pyarrow.ArrowException, TypeError, ValueError):
+                return False
+
+        self.writer.write_table(table)
+        if self.zone_map is not None:
+            try:
+                self.zone_map.add(table)
+            except Exception as e:
+                # the blob is written without a zone map
+                get_logger().debug(f"Unable to profile row group - {type(e).__name__} - {e}")
+                self.zone_map = None
+        for column, values in self.column_values.items():
+            if column in table.column_names:
+                values.extend(table.column(column).to_pylist())
+            else:
+                values.extend([None] * table.num_rows)
+        return True
+
+    def close(self) -> bytes:
+        """
+        Write the footer of the file and return the bytes of the file.
+        """
+        self.writer.close()
+        return self.sink.getvalue()
 
 
 class BlobWriter(object):
@@ -24,6 +152,11 @@ class BlobWriter(object):
     buffer = bytearray()
     byte_count = 0
     manifest = {}
+    index_on = ()
+    bloom_on = ()
+    commit_workers = 0
+    _committer = None
+    _commits: list = []
 
     def __init__(
         self,
@@ -32,10 +165,29 @@ class BlobWriter(object):
         blob_size: int = BLOB_SIZE,
         format: str = "parquet",
         schema: Optional[RelationSchema] = None,
+        index_on: Optional[Iterable[str]] = None,
+        bloom_on: Optional[Iterable[str]] = None,
+        commit_workers: int = 0,
         **kwargs,
     ):
         self.format = format
+        # the columns to build secondary indexes and bloom filters on, text isn't
+        # in columns
+        if isinstance(index_on, str):
+            index_on = [index_on]
+        if isinstance(bloom_on, str):
+            bloom_on = [bloom_on]
+        self.index_on = tuple(index_on or ()) if format != "text" else ()
+        self.bloom_on = tuple(bloom_on or ()) if format != "text" else ()
         self.maximum_blob_size = blob_size
+        # the number of blobs which can be committed in the background while
+        # records are appended to the next blob, zero commits on the appending thread
+        self.commit_workers = max(0, int(commit_workers or 0))
+        self._committer = None
+        self._commits = []
+        # the zone maps for the blobs which have been committed but not yet
+        # written to a manifest
+        self.manifest = {}
 
         if format not in SUPPORTED_FORMATS_ALGORITHMS:
             raise ValueError(
@@ -47,55 +199,199 @@ class BlobWriter(object):
         self.schema = schema_loader(schema)
         self.open_buffer()
 
+        self._serialize = SERIALIZERS.get(format, _serialize_json)
+        self._arrow_schema = None
         if self.format == "parquet":
             self.append = self.arrow_append
+            self.append_many = self.arrow_append_many
         else:
             self.append = self.text_append
+            self.append_many = self.text_append_many
 
     def arrow_append(self, record: dict = {}):
         self.records_in_buffer += 1
         self.wal.append(record)  # type:ignore
+        # the size of the rows in the WAL is estimated from a sample of the rows,
+        # measuring every row would serialize each of them again
+        wal_rows = self.wal.rowcount
+        if (wal_rows - 1) % WAL_SAMPLE_ROWS == 0:
+            self._wal_sampled_bytes += _estimate_size(record)
+            self._wal_samples += 1
+        wal_bytes = wal_rows * self._wal_sampled_bytes // self._wal_samples
+        if wal_rows >= ROW_GROUP_SIZE or wal_bytes >= ROW_GROUP_BYTES:
+            self._write_row_group()
+            wal_bytes = 0
         # if this write would exceed the blob size, close it
-        if self.wal.nbytes() > self.maximum_blob_size:
-            self.commit()
-            self.open_buffer()
+        if self.parquet.size() + wal_bytes > self.maximum_blob_size:
+            self.rollover()
 
         return self.records_in_buffer
 
     def text_append(self, record: dict = {}):
+        if self.format == "flat":
+            # the values for the indexes are read from the record as it's written
+            record = flatten(record)
         # serialize the record
-        if self.format == "text":
-            if isinstance(record, bytes):
-                serialized = record + b"\n"
-            elif isinstance(record, str):
-                serialized = record.encode() + b"\n"
-            else:
-                serialized = str(record).encode() + b"\n"
-        elif self.format == "flat":
-            serialized = orjson.dumps(flatten(record)) + b"\n"  # type:ignore
-        elif hasattr(record, "mini"):
-            serialized = record.mini + b"\n"  # type:ignore
-        else:
-            try:
-                serialized = orjson.dumps(record) + b"\n"  # type:ignore
-            except TypeError:
-                serialized = json.dumps(record).encode() + b"\n"
+        serialized = self._serialize(record)
 
         # the newline isn't counted so add 1 to get the actual length if this write
         # would exceed the blob size, close it so another blob will be created
         if len(self.buffer) > self.maximum_blob_size:
-            self.commit()
-            self.open_buffer()
+            self.rollover()
 
         if isinstance(self.buffer, bytes):
             self.buffer = bytearray(self.buffer)
             get_logger().warning("Write buffer corrected from invalid state.")
+        if self.zone_map is not None:
+            try:
+                self.zone_map.add(record)
+            except AttributeError:
+                # the record isn't a dictionary, so the blob can't be profiled
+                self.zone_map = None
+        # collect the values for the indexes and bloom filters
+        for column, values in self.column_values.items():
+            if values is not None:
+                try:
+                    values.append(record.get(column))
+                except AttributeError:
+                    # we can't get values from this record, so we can't index
+                    self.column_values[column] = None
+
         # write the record to the file
+        self.offsets.append(len(self.buffer))
         self.buffer.extend(serialized)
         self.records_in_buffer += 1
 
         return self.records_in_buffer
 
+    def text_append_many(self, records: list):
+        """
+        Append a list of records, the records are serialized together and written
+        to the buffer in as few writes as the blob size allows.
+        """
+        if self.format == "flat":
+            records = [flatten(record) for record in records]
+        serialized = [self._serialize(record) for record in records]
+        lengths = list(map(len, serialized))
+
+        start = 0
+        while start < len(records):
+            # where each record would start in the buffer, the records which start
+            # before the buffer is full are written to this blob
+            starts = list(accumulate(lengths[start:], initial=len(self.buffer)))
+            count = bisect_right(starts, self.maximum_blob_size, 0, len(records) - start)
+            if count == 0:
+                self.rollover()
+                continue
+
+            end = start + count
+            if self.zone_map is not None:
+                try:
+                    for record in records[start:end]:
+                        self.zone_map.add(record)
+                except AttributeError:
+                    # the records aren't dictionaries, so the blob can't be profiled
+                    self.zone_map = None
+            for column, values in self.column_values.items():
+                if values is not None:
+                    try:
+                        values.extend(record.get(column) for record in records[start:end])
+                    except AttributeError:
+                        # we can't get values from these records, so we can't index
+                        self.column_values[column] = None
+
+            self.offsets.extend(starts[:count])
+            self.buffer.extend(b"".join(serialized[start:end]))
+            self.records_in_buffer += count
+            start = end
+
+        return self.records_in_buffer
+
+    def _get_arrow_schema(self):
+        if self._arrow_schema is None:
+            from orso.schema import convert_orso_schema_to_arrow_schema
+
+            self._arrow_schema = convert_orso_schema_to_arrow_schema(self.schema)
+        return self._arrow_schema
+
+    def arrow_append_many(self, records: list):
+        """
+        Append a list of records, the records are converted to Arrow tables rather
+        than being added to the WAL a row at a time.
+        """
+        try:
+            import pyarrow
+        except ImportError:  # pragma: no cover
+            raise MissingDependencyError(
+                "`pyarrow` is missing, please install or include in requirements.txt"
+            )
+
+        for start in range(0, len(records), ARROW_BATCH_SIZE):
+            batch = records[start : start + ARROW_BATCH_SIZE]
+            try:
+                table = pyarrow.Table.from_pylist(batch, schema=self._get_arrow_schema())
+            except (pyarrow.ArrowException, TypeError, ValueError) as err:
+                # values Arrow can't convert to the schema's types (e.g. JSONB), the
+                # WAL knows how to convert these
+                get_logger().debug(f"Appending rows to the WAL - {type(err).__name__} - {err}")
+                for record in batch:
+                    self.arrow_append(record)
+                continue
+            self.append_table(table)
+
+        return self.records_in_buffer
+
+    def append_table(self, table):
+        """
+        Append an Arrow table, for parquet the table is written to the blob as row
+        groups without being converted to records.
+        """
+        if self.format != "parquet":
+            for batch in table.to_batches(max_chunksize=ARROW_BATCH_SIZE):
+                self.text_append_many(batch.to_pylist())
+            return self.records_in_buffer
+
+        import pyarrow
+
+        # keep the records in the order they were appended
+        self._write_row_group()
+        for batch in table.to_batches(max_chunksize=ARROW_BATCH_SIZE):
+            self.records_in_buffer += batch.num_rows
+            self._write_table(pyarrow.Table.from_batches([batch]))
+            # if this write would exceed the blob size, close it
+            if self.parquet.size() > self.maximum_blob_size:
+                self.rollover()
+
+        return self.records_in_buffer
+
+    def _write_row_group(self):
+        """
+        Write the records in the WAL to the parquet file as a row group.
+        """
+        if self.wal.rowcount == 0:
+            return
+        table = self.wal.arrow()
+        self._open_wal()
+        self._write_table(table)
+
+    def _open_wal(self):
+        # the records which haven't been written to a row group yet
+        self.wal = orso.DataFrame(rows=[], schema=self.schema)
+        self._wal_sampled_bytes = 0
+        self._wal_samples = 0
+
+    def _write_table(self, table):
+        # if we have a schema, make effort to align the parquet file to it
+        if self.schema:
+            table = self._normalize_arrow_schema(table, self.schema)
+        if not self.parquet.write(table):
+            # the types of the columns have changed (e.g. a column which was null
+            # has values), a parquet file has one schema so start a new blob
+            self.records_in_buffer -= table.num_rows
+            self.rollover()
+            self.records_in_buffer += table.num_rows
+            self.parquet.write(table)
+
     def _normalize_arrow_schema(self, table, mabel_schema: RelationSchema):
         """
         Because we partition the data, there are instances where nulls in one of the
@@ -135,76 +431,299 @@ class BlobWriter(object):
         table = table.cast(target_schema=schema)
         return table
 
+    def rollover(self):
+        """
+        Commit the current blob and start a new one. If there are commit workers the
+        blob is committed in the background, if all of the workers are busy this
+        waits for one to finish, so only `commit_workers` blobs are held in memory
+        waiting to be committed.
+        """
+        if not self.commit_workers:
+            self.commit()
+            return
+
+        # errors committing earlier blobs are raised as soon as we know about them
+        self._raise_commit_errors()
+        if self.format == "parquet":
+            self._write_row_group()
+
+        if self.records_in_buffer == 0:
+            return
+        pending = self._take_buffer()
+        # name the blob now, so the blobs are named in the order they were written
+        blob_name = self.inner_writer._build_path()
+
+        if self._committer is None:
+            self._committer = ThreadPoolExecutor(
+                max_workers=self.commit_workers, thread_name_prefix="mabel-blob-committer"
+            )
+            self._commit_slots = threading.BoundedSemaphore(self.commit_workers)
+        # wait for a worker to be free
+        self._commit_slots.acquire()
+        try:
+            commit = self._committer.submit(self._commit_blob, pending, blob_name)
+        except Exception:
+            self._commit_slots.release()
+            raise
+        commit.add_done_callback(lambda future: self._commit_slots.release())
+        self._commits.append(commit)
+
+    def _raise_commit_errors(self, wait: bool = False):
+        """
+        Raise the first error from the blobs committed in the background, if `wait`
+        is set, wait for all of the blobs to be committed first.
+        """
+        error = None
+        outstanding = []
+        for commit in self._commits:
+            if wait or commit.done():
+                if error is None and commit.exception() is not None:
+                    error = commit.exception()
+            else:
+                outstanding.append(commit)
+        self._commits = outstanding
+        if error is not None:
+            raise error
+
+    def _take_buffer(self) -> _PendingBlob:
+        pending = _PendingBlob()
+        pending.records = self.records_in_buffer
+        if self.format == "parquet":
+            pending.parquet = self.parquet
+            pending.column_values = self.parquet.column_values
+        else:
+            pending.buffer = self.buffer
+            pending.offsets = self.offsets
+            pending.column_values = self.column_values
+            pending.zone_map = self.zone_map
+        self.open_buffer()
+        return pending
+
     def commit(self):
+        """
+        Commit the current blob, and wait for any blobs being committed in the
+        background.
+
+        Returns:
+            string
+                The name of the committed blob, or an empty string if there were
+                no records to commit
+
+        Raises:
+            The first error from committing a blob in the background
+        """
         committed_blob_name = ""
 
-        if self.records_in_buffer > 0:
-            lock = threading.Lock()
+        # the records in the WAL are written to the blob before it's taken, this
+        # can start a new blob if their types don't match the blob
+        if self.format == "parquet":
+            self._write_row_group()
 
-            summary = None
+        # wait for the blobs being committed in the background first, so the blobs
+        # are written in order
+        if self._committer is not None:
+            committer = self._committer
+            self._committer = None
             try:
-                lock.acquire(blocking=True, timeout=10)
+                self._raise_commit_errors(wait=True)
+            finally:
+                committer.shutdown(wait=True)
 
-                if self.format == "parquet":
-                    try:
-                        import pyarrow
-                        import pyarrow.parquet
-                    except ImportError as err:  # pragma: no cover
-                        raise MissingDependencyError(
-                            "`pyarrow` is missing, please install or include in requirements.txt"
-                        )
-
-                    pytable = self.wal.arrow()
-                    try:
-                        summary = self.wal.profile.to_dicts()
-                    except Exception as e:
-                        print(f"[MABEL] Unable to profile morsel - {type(e).__name__} - {e}")
+        if self.records_in_buffer > 0:
+            committed_blob_name = self._commit_blob(self._take_buffer())
+        else:
+            self.open_buffer()
+
+        return committed_blob_name
 
-                    # if we have a schema, make effort to align the parquet file to it
-                    if self.schema:
-                        pytable = self._normalize_arrow_schema(pytable, self.schema)
+    def _commit_blob(self, pending: _PendingBlob, blob_name: Optional[str] = None) -> str:
+        """
+        Encode the records in a blob and write them with the inner writer, this can
+        be run on a background thread.
+        """
+        summary = None
+        column_values = pending.column_values
 
-                    tempfile = io.BytesIO()
-                    pyarrow.parquet.write_table(pytable, where=tempfile, compression="zstd")
+        if self.format == "parquet":
+            write_buffer = pending.parquet.close()
+            if pending.parquet.zone_map is not None:
+                summary = pending.parquet.zone_map.zone_map()
 
-                    tempfile.seek(0)
-                    write_buffer = tempfile.read()
+        elif self.format == "zstd":
+            # zstandard is an non-optional installed dependency
+            write_buffer = zstandard.compress(pending.buffer)
+        else:
+            write_buffer = bytes(pending.buffer)
+
+        # the zone maps for the text formats are built as the records are appended
+        if self.format != "parquet" and pending.zone_map is not None:
+            summary = pending.zone_map.zone_map()
+
+        if self.bloom_on:
+            bloom_filters = self.build_bloom_filters(column_values=column_values)
+            if bloom_filters:
+                summary = {} if summary is None else summary
+                summary["blooms"] = bloom_filters
+
+        committed_blob_name = self.inner_writer.commit(
+            byte_data=write_buffer, override_blob_name=blob_name
+        )
+        if summary is not None:
+            summary["bytes"] = len(write_buffer)
+            self.manifest[committed_blob_name] = summary
+        if self.format in ROW_OFFSET_FORMATS:
+            self.write_row_offsets(committed_blob_name, pending.offsets)
+        if self.index_on:
+            self.write_indexes(committed_blob_name, column_values=column_values)
+
+        if "BACKOUT" in committed_blob_name:
+            get_logger().warning(
+                f"{pending.records:n} failed records written to BACKOUT partition `{committed_blob_name}`"
+            )
 
-                elif self.format == "zstd":
-                    # zstandard is an non-optional installed dependency
-                    write_buffer = zstandard.compress(self.buffer)
-                else:
-                    write_buffer = bytes(self.buffer)
+        get_logger().debug(
+            {
+                "format": self.format,
+                "committed_blob": committed_blob_name,
+                "records": pending.records,
+                "bytes": len(write_buffer),
+            }
+        )
+        return committed_blob_name
 
-                committed_blob_name = self.inner_writer.commit(
-                    byte_data=write_buffer, override_blob_name=None
+    def write_row_offsets(self, blob_name: str, offsets=None):
+        """
+        Write the offsets of each row in a committed blob to an index, the Reader
+        uses these to resume reading part way through the blob.
+        """
+        if offsets is None:
+            offsets = self.offsets
+        try:
+            return self.inner_writer.commit(
+                byte_data=row_offsets.serialize(offsets),
+                override_blob_name=row_offsets.index_name(blob_name),
+            )
+        except Exception as err:
+            # the index is an optimization, the data has been written so we
+            # don't fail the write
+            get_logger().warning(f"Unable to write row offsets - {type(err).__name__} - {err}")
+            return None
+
+    def _get_column_values(self, column: str, table=None, column_values=None) -> list:
+        if table is None:
+            if column_values is None:
+                column_values = self.column_values
+            values = column_values.get(column)
+            if values is None:
+                raise TypeError("Values couldn't be read from the records")
+            return values
+        if column in table.column_names:
+            return table.column(column).to_pylist()
+        return [None] * table.num_rows
+
+    def build_bloom_filters(self, table=None, column_values=None) -> dict:
+        """
+        Build the bloom filters for the blob being committed, these are written to
+        the manifest with the zone maps.
+
+        Parameters:
+            table: pyarrow.Table (optional)
+                The data in the blob, if not provided the values collected as
+                the records were appended are used
+            column_values: dictionary (optional)
+                The values collected as the records were appended, if not
+                provided the values for the current blob are used
+        """
+        bloom_filters = {}
+        for column in self.bloom_on:
+            try:
+                values = self._get_column_values(column, table, column_values)
+                if all(value is None for value in values):
+                    # a filter without any values would skip the blob for every value,
+                    # but the column may not be in the records
+                    get_logger().debug(f"No values to build bloom filter on `{column}`")
+                    continue
+                bloom_filter = BloomFilter.build(values)
+                bloom_filters[column] = bloom_filter.to_dict()
+            except TypeError as err:
+                get_logger().debug(f"Unable to build bloom filter on `{column}` - {err}")
+        return bloom_filters
+
+    def write_indexes(self, blob_name: str, table=None, column_values=None):
+        """
+        Write the secondary indexes for a committed blob, the Reader uses these to
+        only read the rows which can match equality filters on the indexed columns.
+
+        Parameters:
+            blob_name: string
+                The name of the committed blob
+            table: pyarrow.Table (optional)
+                The data in the blob, if not provided the values collected as
+                the records were appended are used
+            column_values: dictionary (optional)
+                The values collected as the records were appended, if not
+                provided the values for the current blob are used
+        """
+        for column in self.index_on:
+            try:
+                index = SecondaryIndex.build(self._get_column_values(column, table, column_values))
+            except TypeError as err:
+                get_logger().debug(f"Unable to index `{column}` of `{blob_name}` - {err}")
+                continue
+            if len(index.hashes) == 0:
+                # an empty index means no rows match, but the column may not be in
+                # the records, so the blob isn't indexed on this column
+                get_logger().debug(f"No values to index `{column}` of `{blob_name}`")
+                continue
+
+            try:
+                self.inner_writer.commit(
+                    byte_data=index.serialize(),
+                    override_blob_name=index_name(blob_name, column),
                 )
-                self.manifest[committed_blob_name] = summary
-
-                if "BACKOUT" in committed_blob_name:
-                    get_logger().warning(
-                        f"{self.records_in_buffer:n} failed records written to BACKOUT partition `{committed_blob_name}`"
-                    )
-
-                get_logger().debug(
-                    {
-                        "format": self.format,
-                        "committed_blob": committed_blob_name,
-                        "records": self.records_in_buffer,
-                        "bytes": len(write_buffer),
-                    }
+            except Exception as err:
+                # the index is an optimization, the data has been written so we
+                # don't fail the write
+                get_logger().warning(
+                    f"Unable to write index on `{column}` - {type(err).__name__} - {err}"
                 )
-            finally:
-                lock.release()
 
-        self.open_buffer()
-        return committed_blob_name
+    def write_manifest(self):
+        """
+        Write the zone maps for the committed blobs to a manifest in the same folder
+        as the blobs, the Reader uses these to skip blobs which can't match filters.
+        """
+        if not self.manifest:
+            return None
+
+        manifest = {}
+        for blob_name, summary in self.manifest.items():
+            manifest[blob_name.split("/")[-1]] = summary
+        self.manifest = {}
+
+        try:
+            manifest_name = self.inner_writer._build_path(zone_maps.MANIFEST_EXTENSION)
+            manifest_name = self.inner_writer.commit(
+                byte_data=orjson.dumps(manifest), override_blob_name=manifest_name
+            )
+            get_logger().debug(f"Manifest `{manifest_name}` written for {len(manifest)} blobs")
+            return manifest_name
+        except Exception as err:
+            # the manifest is an optimization, the data has been written so we
+            # don't fail the write
+            get_logger().warning(f"Unable to write manifest - {type(err).__name__} - {err}")
+            return None
 
     def open_buffer(self):
         if self.format == "parquet":
-            self.wal = orso.DataFrame(rows=[], schema=self.schema)
+            self._open_wal()
+            self.parquet = _ParquetBlob(self.index_on + self.bloom_on)
         else:
             self.buffer = bytearray()
+            self.offsets = array("Q")
+            self.column_values = {column: [] for column in self.index_on + self.bloom_on}
+            # text isn't in columns, so it isn't profiled
+            self.zone_map = zone_maps.RecordZoneMapBuilder() if self.format != "text" else None
             self.byte_count = 0
         self.records_in_buffer = 0
 
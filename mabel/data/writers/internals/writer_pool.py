@@ -65,6 +65,7 @@ class WriterPool:
                 writer = writers[0]
                 self.writers = [w for w in self.writers if w.get("identity") != identity]
                 writer.get("writer").commit()
+                writer.get("writer").write_manifest()
         finally:
             lock.release()
 
@@ -3,11 +3,17 @@ import itertools
 import re
 import threading
 import time
+from collections import defaultdict
+from typing import Iterable
 
 from orso.logging import get_logger
 
+from mabel.data.validator import validate_block
 from mabel.data.writers.internals.writer_pool import WriterPool
+from mabel.data.writers.writer import BLOCK_SIZE
 from mabel.data.writers.writer import Writer
+from mabel.data.writers.writer import _as_dict
+from mabel.data.writers.writer import _blocks
 from mabel.utils import dates
 from mabel.utils import paths
 from mabel.utils import text
@@ -55,6 +61,15 @@ class StreamWriter(Writer):
             inner_writer: BaseWriter (optional)
                 The component used to commit data, the default writer is the
                 NullWriter
+            index_on: collection (optional)
+                Index on these columns, the default is to not index
+            bloom_on: collection (optional)
+                Build bloom filters on these columns, the default is to not
+                build bloom filters
+            commit_workers: integer (optional)
+                The number of blobs to encode and commit in the background while
+                records are appended to the next blob, the default is 0 which
+                commits blobs on the appending thread
 
         Note:
             Different inner_writers may take or require additional parameters.
@@ -131,24 +146,8 @@ class StreamWriter(Writer):
                 blob_writer = self.writer_pool.get_writer(identity)
                 return blob_writer.append(record)
 
-            # get the values from the record, there can be multiple of these
-            values = []
-            for placeholder in placeholders:
-                value = record.get(placeholder)
-                if not isinstance(value, list):
-                    value = [value]
-                values.append(value)
-            # get the cartesian product of these lists
-            # save the result to a set otherwise it's not a cartesian product
-            value_combinations = {i for i in itertools.product(*values)}
-
             # for every variation in the cartesian product
-            for values in value_combinations:  # type:ignore
-                this_identity = identity
-                # do the actual replacing of the placeholders
-                for k, v in zip(placeholders, values):
-                    this_identity = this_identity.replace("{" + k + "}", text.sanitize(str(v)))
-
+            for this_identity in self._substitute(identity, placeholders, record):
                 # get the writer and save the record
                 blob_writer = self.writer_pool.get_writer(this_identity)
                 blob_writer.append(record)
@@ -156,6 +155,97 @@ class StreamWriter(Writer):
 
         return writes
 
+    def append_many(self, records: Iterable) -> int:
+        """
+        Append a set of records to the Writer, the records are validated in blocks
+        and the records in each block for the same partition are written together.
+
+        Parameters:
+            records: iterable of dictionaries
+                The records to append to the Writer
+
+        Returns:
+            integer
+                The number of writes, a record can be written to more than one
+                partition
+        """
+        writes = 0
+        for block in _blocks(records):
+            identity = paths.date_format(
+                self.dataset_template, (self.date or datetime.datetime.utcnow())
+            )
+            placeholders = set(re.findall(r"\{(.*?)\}", identity))
+
+            block = [record if type(record) is dict else _as_dict(record) for record in block]
+            failures = {}
+            if self.schema:
+                failures = dict(validate_block(self.schema, block))
+
+            partitions = defaultdict(list)
+            for position, record in enumerate(block):
+                this_identity = identity
+                if position in failures:
+                    this_identity += "/BACKOUT/"
+                    get_logger().warning(
+                        f"Schema Validation Failed ({failures[position]}) - message being written to {this_identity}"
+                    )
+                if placeholders:
+                    for substituted in self._substitute(this_identity, placeholders, record):
+                        partitions[substituted].append(record)
+                else:
+                    partitions[this_identity].append(record)
+
+            with lock:
+                for this_identity, partition in partitions.items():
+                    self.writer_pool.get_writer(this_identity).append_many(partition)
+                    writes += len(partition)
+
+        return writes
+
+    def append_table(self, table) -> int:
+        """
+        Append an Arrow table to the Writer, the table is converted to records so
+        the records can be validated and partitioned.
+
+        Parameters:
+            table: pyarrow.Table
+                The records to append to the Writer
+
+        Returns:
+            integer
+                The number of writes
+        """
+        return sum(
+            self.append_many(batch.to_pylist())
+            for batch in table.to_batches(max_chunksize=BLOCK_SIZE)
+        )
+
+    @staticmethod
+    def _substitute(identity, placeholders, record):
+        """
+        The identities of the partitions a record is written to, the placeholders in
+        the identity are replaced with the values in the record.
+        """
+        # get the values from the record, there can be multiple of these
+        values = []
+        for placeholder in placeholders:
+            value = record.get(placeholder)
+            if not isinstance(value, list):
+                value = [value]
+            values.append(value)
+        # get the cartesian product of these lists
+        # save the result to a set otherwise it's not a cartesian product
+        value_combinations = {i for i in itertools.product(*values)}
+
+        identities = []
+        for values in value_combinations:  # type:ignore
+            this_identity = identity
+            # do the actual replacing of the placeholders
+            for k, v in zip(placeholders, values):
+                this_identity = this_identity.replace("{" + k + "}", text.sanitize(str(v)))
+            identities.append(this_identity)
+        return identities
+
     def finalize(self, **kwargs):
         self.run_pool_attendant = False
         with lock:
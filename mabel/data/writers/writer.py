@@ -1,5 +1,7 @@
 import datetime
+from itertools import islice
 from typing import Any
+from typing import Iterable
 from typing import Optional
 from typing import Union
 
@@ -8,6 +10,8 @@ from orso.logging import get_logger
 from orso.schema import RelationSchema
 
 from mabel.data.validator import schema_loader
+from mabel.data.validator import validate_block
+from mabel.data.validator import validate_table
 from mabel.data.writers.internals.blob_writer import BlobWriter
 from mabel.errors import InvalidDataSetError
 from mabel.errors import MissingDependencyError
@@ -16,6 +20,26 @@ from mabel.utils import paths
 
 logger = get_logger()
 
+# the number of records validated and written together by `append_many`
+BLOCK_SIZE = 10000
+
+
+def _as_dict(record):
+    if "BaseModel" in str(type(record)):
+        if hasattr(record, "dict"):
+            record = record.dict()  # type.ignore
+        if hasattr(record, "model_dump"):
+            record = record.model_dump()  # type:ignore
+    return record
+
+
+def _blocks(records: Iterable, size: int = BLOCK_SIZE):
+    records = iter(records)
+    block = list(islice(records, size))
+    while block:
+        yield block
+        block = list(islice(records, size))
+
 
 class Writer:
     records = 0
@@ -128,11 +152,7 @@ class Writer:
             integer
                 The number of records in the current blob
         """
-        if "BaseModel" in str(type(record)):
-            if hasattr(record, "dict"):
-                record = record.dict()  # type.ignore
-            if hasattr(record, "model_dump"):
-                record = record.model_dump()  # type:ignore
+        record = _as_dict(record)
 
         if self.expectations:
             import data_expectations as de  # type: ignore
@@ -145,6 +165,101 @@ class Writer:
         self.blob_writer.append(record)
         self.records += 1
 
+    def append_many(self, records: Iterable) -> int:
+        """
+        Append a set of records to the Writer, the records are validated and
+        written in blocks rather than one at a time.
+
+        Parameters:
+            records: iterable of dictionaries or pydantic.BaseModels
+                The records to append to the Writer
+
+        Returns:
+            integer
+                The number of records appended
+        """
+        appended = 0
+        for block in _blocks(records):
+            block = [record if type(record) is dict else _as_dict(record) for record in block]
+
+            failure = self._validate_block(block)
+            if failure is not None:
+                # the records before the invalid record are written, as they
+                # would be if they were appended one at a time
+                position, error = failure
+                if position > 0:
+                    self.blob_writer.append_many(block[:position])
+                    self.records += position
+                raise error
+
+            self.blob_writer.append_many(block)
+            self.records += len(block)
+            appended += len(block)
+        return appended
+
+    def append_table(self, table) -> int:
+        """
+        Append an Arrow table to the Writer, when writing parquet the table is
+        written without being converted to records.
+
+        Parameters:
+            table: pyarrow.Table
+                The records to append to the Writer
+
+        Returns:
+            integer
+                The number of records appended
+        """
+        failure = None
+        if self.expectations:
+            # expectations are evaluated against records
+            offset = 0
+            for batch in table.to_batches(max_chunksize=BLOCK_SIZE):
+                failure = self._validate_block(batch.to_pylist())
+                if failure is not None:
+                    failure = (offset + failure[0], failure[1])
+                    break
+                offset += batch.num_rows
+        elif self.schema:
+            failures = validate_table(self.schema, table, block_size=BLOCK_SIZE)
+            if failures:
+                failure = failures[0]
+
+        if failure is not None:
+            position, error = failure
+            if position > 0:
+                self.blob_writer.append_table(table.slice(0, position))
+                self.records += position
+            raise error
+
+        self.blob_writer.append_table(table)
+        self.records += table.num_rows
+        return table.num_rows
+
+    def _validate_block(self, block: list):
+        """
+        Validate a block of records, returning the position and the error of the
+        first invalid record, or None if all of the records are valid.
+        """
+        failures = []
+        if self.expectations:
+            import data_expectations as de  # type: ignore
+
+            for position, record in enumerate(block):
+                try:
+                    de.evaluate_record(self.expectations, record)
+                except Exception as err:
+                    failures.append((position, err))
+                    break
+
+        if self.schema:
+            schema_failures = validate_block(self.schema, block)
+            if schema_failures:
+                failures.append(schema_failures[0])
+
+        # if a record fails both, the expectation is reported, as it is by `append`
+        return min(failures, key=lambda failure: failure[0], default=None)
+
     def __del__(self):
         if hasattr(self, "finalized") and not self.finalized and self.records > 0:
             logger.error(
@@ -154,7 +269,9 @@ class Writer:
     def finalize(self, **kwargs):
         self.finalized = True
         try:
-            return self.blob_writer.commit()
+            committed_blob_name = self.blob_writer.commit()
+            self.blob_writer.write_manifest()
+            return committed_blob_name
         except Exception as e:
             logger.error(f"{type(self).__name__} failed to close pool: {type(e).__name__} - {e}")
             raise e
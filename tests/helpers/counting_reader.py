@@ -0,0 +1,99 @@
+"""
+Helpers for testing what the Reader reads - a DiskReader which records what it
+reads, and functions to write a dataset for a day and read it back with the
+recording reader.
+"""
+
+import datetime
+import shutil
+import threading
+
+from mabel.adapters.disk import DiskReader
+from mabel.adapters.disk import DiskWriter
+from mabel.data import BatchWriter
+from mabel.data import Reader
+from mabel.data.writers.internals.blob_writer import BLOB_SIZE
+
+DATE = datetime.date(2022, 1, 1)
+
+
+class CountingReader(DiskReader):
+    """
+    Records the blobs read, the parts of blobs read, the blobs read as bytes and
+    the number of listings made, by all of the readers. Call `reset` before the
+    reads being recorded.
+    """
+
+    blobs_read: list = []
+    ranges_read: list = []
+    bytes_read: list = []
+    listings: int = 0
+    _lock = threading.Lock()
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls.blobs_read = []
+            cls.ranges_read = []
+            cls.bytes_read = []
+            cls.listings = 0
+
+    @classmethod
+    def _record(cls, reads: list, blob_name: str):
+        # blobs can be read on the prefetch threads
+        with cls._lock:
+            reads.append(blob_name)
+
+    def read_blob(self, blob_name):
+        CountingReader._record(CountingReader.blobs_read, blob_name)
+        return super().read_blob(blob_name)
+
+    def get_blob_range(self, blob_name, start, end=None):
+        CountingReader._record(CountingReader.ranges_read, blob_name)
+        return super().get_blob_range(blob_name, start, end)
+
+    def get_blob_bytes(self, blob_name):
+        CountingReader._record(CountingReader.bytes_read, blob_name)
+        return super().get_blob_bytes(blob_name)
+
+    def get_blobs_at_path(self, path):
+        with CountingReader._lock:
+            CountingReader.listings += 1
+        return super().get_blobs_at_path(path)
+
+
+def write_dataset(
+    folder: str, records, *, format: str, schema, blob_size: int = BLOB_SIZE, **kwargs
+):
+    """
+    Write the records to a dataset for DATE, replacing the dataset if it exists.
+    """
+    shutil.rmtree(folder, ignore_errors=True)
+    writer = BatchWriter(
+        inner_writer=DiskWriter,
+        dataset=folder,
+        format=format,
+        schema=schema,
+        blob_size=blob_size,
+        date=DATE,
+        **kwargs,
+    )
+    for record in records:
+        writer.append(record)
+    writer.finalize()
+
+
+def read_dataset(folder: str, filters=None, **kwargs) -> Reader:
+    """
+    Read the dataset for DATE with the CountingReader.
+    """
+    CountingReader.reset()
+    return Reader(
+        inner_reader=CountingReader,
+        dataset=folder,
+        start_date=DATE,
+        # without an end date every day from DATE to today is listed
+        end_date=DATE,
+        filters=filters,
+        **kwargs,
+    )
@@ -1,57 +1,132 @@
-import time
+"""
+Bloom filters are written to the manifests for columns nominated with `bloom_on`
+and used to skip blobs which can't contain the values in equality filters.
+
+This writes a dataset of random request ids, then looks up ids which are, and
+aren't in the dataset, with and without the bloom filters, reporting the time to
+read, the number of blobs read and the bytes skipped. It also measures the false
+positive rate of the filters against the estimated rate.
+
+    estimated false positive rate : 0.0101
+    measured false positive rate  : 0.0095
+
+    200,000 records in 11 blobs (4.3Mb), 20 lookups:
+
+                    no bloom filters          bloom filters
+    present       : 4.90s, 11.0 blobs/lookup  0.59s, 1.1 blobs/lookup
+    missing       : 4.27s, 11.0 blobs/lookup  0.07s, 0.1 blobs/lookup
+"""
+
+import datetime
+import glob
 import os
+import shutil
 import sys
+import time
 
 sys.path.insert(1, os.path.join(sys.path[0], "../.."))
-from mabel.index.bloom_filter import BloomFilter
-from mabel.data.formats.dictset import drop_duplicates
+import orjson
+
+from mabel import Reader
+from mabel.adapters.disk import DiskReader
+from mabel.adapters.disk import DiskWriter
+from mabel.data import BatchWriter
+from mabel.data.internals.bloom_filter import BloomFilter
 from mabel.utils import entropy
 
 try:
     from rich import traceback
 
     traceback.install()
-except ImportError:
+except ImportError:  # pragma: no cover
     pass
 
-word_list = []
-with open("tests/data/word_list.txt") as words:
-    for word in words:
-        word_list.append(word.rstrip())
+FOLDER = "_temp/bloom_performance"
+RECORDS = 200000
+LOOKUPS = 20
+
+
+class CountingReader(DiskReader):
+    reads = 0
+
+    def read_blob(self, blob_name):
+        CountingReader.reads += 1
+        return super().read_blob(blob_name)
+
+
+def request_id():
+    return entropy.random_string(24)
+
+
+def write_dataset(bloom_on):
+    shutil.rmtree(FOLDER, ignore_errors=True)
+    writer = BatchWriter(
+        inner_writer=DiskWriter,
+        dataset=FOLDER,
+        format="zstd",
+        schema=[{"name": "request", "type": "VARCHAR"}, {"name": "value", "type": "INTEGER"}],
+        blob_size=1024 * 1024,
+        date=datetime.date(2022, 1, 1),
+        bloom_on=bloom_on,
+    )
+    ids = []
+    for i in range(RECORDS):
+        ids.append(request_id())
+        writer.append({"request": ids[-1], "value": i})
+    writer.finalize()
+    return ids
+
+
+def blob_bytes():
+    return sum(os.path.getsize(blob) for blob in glob.glob(FOLDER + "/**/*.zstd", recursive=True))
 
 
-def dedupe():
-    values = []
-    for i in range(100000):
-        values.append(entropy.random_choice(word_list))
-    start = time.time_ns()
-    for i in range(20):
-        [v for v in drop_duplicates(values, 2000)]
-    print((time.time_ns() - start) / 1e9)
+def lookup(ids):
+    CountingReader.reads = 0
+    start = time.perf_counter_ns()
+    for value in ids:
+        reader = Reader(
+            inner_reader=CountingReader,
+            dataset=FOLDER,
+            start_date=datetime.date(2022, 1, 1),
+            end_date=datetime.date(2022, 1, 1),
+            filters=("request", "=", value),
+            prefetch=0,
+        )
+        list(reader)
+    return (time.perf_counter_ns() - start) / 1e9, CountingReader.reads
 
 
-def drop(dictset):
-    bf = BloomFilter(10000)
-    for record in dictset:
-        if record in bf:
-            continue
-        bf.add(record)
-        yield record
+def false_positive_rate():
+    values = [request_id() for i in range(100000)]
+    bloom_filter = BloomFilter.build(values)
+    others = [request_id() for i in range(100000)]
+    measured = sum(value in bloom_filter for value in others) / len(others)
+    print(f"estimated false positive rate : {bloom_filter.false_positive_rate():.4f}")
+    print(f"measured false positive rate  : {measured:.4f}")
+    print(f"filter size                   : {len(orjson.dumps(bloom_filter.to_dict()))} bytes")
 
 
-def filt():
-    values = []
-    for i in range(100000):
-        values.append(entropy.random_choice(word_list))
-    start = time.time_ns()
-    for i in range(20):
-        a = [v for v in drop(values)]
-    print((time.time_ns() - start) / 1e9)
-    print(len(a))
+def pruning():
+    for bloom_on in ([], ["request"]):
+        ids = write_dataset(bloom_on)
+        blobs = len(glob.glob(FOLDER + "/**/*.zstd", recursive=True))
+        total_bytes = blob_bytes()
+        print(f"bloom filters on {bloom_on}, {blobs} blobs, {total_bytes} bytes")
+        for label, values in (
+            ("present", [entropy.random_choice(ids) for i in range(LOOKUPS)]),
+            ("missing", [request_id() for i in range(LOOKUPS)]),
+        ):
+            seconds, reads = lookup(values)
+            skipped = total_bytes * (1 - (reads / (blobs * LOOKUPS)))
+            print(
+                f"  {label}: {seconds:.2f}s for {LOOKUPS} lookups, {reads / LOOKUPS:.1f} blobs read per lookup, ~{skipped:.0f} bytes skipped per lookup"
+            )
+    shutil.rmtree(FOLDER, ignore_errors=True)
 
 
 if __name__ == "__main__":
-    dedupe()
-    filt()
+    false_positive_rate()
+    pruning()
 
     print("okay")
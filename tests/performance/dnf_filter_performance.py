@@ -0,0 +1,76 @@
+#
+#  for 100 thousand iterations of 50 records:
+#
+#                         interpretted  compiled
+#   equals and greater  : 13.6          2.3
+#   like                : 31.5          19.8
+#   in                  : 12.0          1.0
+#   expression          : 129.2         90.3
+import time
+import os
+import sys
+
+sys.path.insert(1, os.path.join(sys.path[0], "../.."))
+from mabel import Reader
+from mabel.adapters.disk import DiskReader
+from mabel.data.internals.dnf_filters import DnfFilters
+from mabel.data.internals.dnf_filters import evaluate
+from mabel.data.internals.expression import Expression
+
+
+try:
+    from rich import traceback
+
+    traceback.install()
+except ImportError:  # pragma: no cover
+    pass
+
+
+PREDICATES = [
+    [("username", "==", "BBCNews"), ("followers", ">", 1000)],
+    [("tweet", "like", "%trump%")],
+    [("username", "in", ("BBCNews", "CNN", "Reuters"))],
+]
+EXPRESSION = "username == 'BBCNews' and followers > 1000 or tweet like '%trump%'"
+
+
+def get_data():
+    """ensure we can read the test files"""
+    r = Reader(inner_reader=DiskReader, dataset="tests/data/tweets", raw_path=True)
+    return list(r) * 100000
+
+
+def time_it(test, *args):
+    start = time.perf_counter_ns()
+    test(*args)
+    return (time.perf_counter_ns() - start) / 1e9
+
+
+def interpretted_dnf(data, predicates):
+    [row for row in data if evaluate(predicates, row)]
+
+
+def compiled_dnf(data, predicates):
+    list(DnfFilters(predicates).filter_dictset(data))
+
+
+def interpretted_expression(data, expression):
+    exp = Expression(expression)
+    [row for row in data if exp.evaluate_recursive(exp.root, row)]
+
+
+def compiled_expression(data, expression):
+    exp = Expression(expression)
+    [row for row in data if exp(row)]
+
+
+data = get_data()
+
+for predicates in PREDICATES:
+    print(predicates)
+    print("  interpretted dnf        :", time_it(interpretted_dnf, data, predicates))
+    print("  compiled dnf            :", time_it(compiled_dnf, data, predicates))
+
+print(EXPRESSION)
+print("  interpretted expression :", time_it(interpretted_expression, data, EXPRESSION))
+print("  compiled expression     :", time_it(compiled_expression, data, EXPRESSION))
@@ -1,55 +1,37 @@
 """
-┌──────────┬────────────────────┐
-│ function │        time        │
-├──────────┼────────────────────┤
-│ typhaon  │     1.03489932     │
-│ pydantic │ 2.1748749800000002 │
-└──────────┴────────────────────┘
+Compare validating records one at a time, with `RelationSchema.validate`, to
+validating blocks of records, with `validate_block`, and validating an Arrow table
+with `validate_table`. Also includes pydantic for reference.
+
+100,000 records, 5 runs     narrow    wide
+per record           0.7808s 3.2072s
+block                0.1330s 0.8972s
+block (1% invalid)   0.1626s 0.9477s
+table                0.0001s 0.0003s
+pydantic             0.3555s 1.2679s
+
+narrow is 8 columns, wide is 48 columns
 """
 
-import time
-import pydantic
 import datetime
+import os
 import statistics
-from typing import Optional
-from pydantic import create_model
 import sys
-import os
+import time
 
 sys.path.insert(1, os.path.join(sys.path[0], "../.."))
-from mabel.data.validator import Schema
-from mabel.data.formats import dictset
-from mabel.data.formats.dictset import display
-
-import orjson as json
-
-
-py_tweet = {
-    "userid": (str, ""),
-    "username": (str, ""),
-    "user_verified": (bool, False),
-    "followers": (int, -1),
-    "tweet": (str, ""),
-    "location": (Optional[str], None),
-    "sentiment": (int, 0),
-    "timestamp": (Optional[datetime.datetime], None),
-}
+import pyarrow
+from pydantic import create_model
 
-schema_definition = {
-    "fields": [
-        {"name": "userid", "type": "numeric"},
-        {"name": "username", "type": "string"},
-        {"name": "user_verified", "type": "boolean"},
-        {"name": "followers", "type": "numeric"},
-        {"name": "tweet", "type": "string"},
-        {"name": "location", "type": ["string", "nullable"]},
-        {"name": "sentiment", "type": "numeric"},
-        {"name": "timestamp", "type": "date"},
-    ]
-}
+from mabel.data.validator import schema_loader
+from mabel.data.validator import validate_block
+from mabel.data.validator import validate_table
+
+CYCLES = 100000
+BLOCK_SIZE = 10000
 
 # random tweet with no sensitive or creative information
-data = {
+tweet = {
     "userid": 12681557490473,
     "username": "USAgovernmentu1",
     "user_verified": False,
@@ -57,23 +39,39 @@ data = {
     "tweet": 'The United States is currently a Democracy\nThe leader is known as "President"\nThe current President is Donald John Trump',
     "location": None,
     "sentiment": 0.05555555555555555,
-    "timestamp": "2020-12-01T00:00:02",
+    "timestamp": datetime.datetime(2020, 12, 1, 0, 0, 2),
+}
+tweet_types = {
+    "userid": ("INTEGER", int),
+    "username": ("VARCHAR", str),
+    "user_verified": ("BOOLEAN", bool),
+    "followers": ("INTEGER", int),
+    "tweet": ("VARCHAR", str),
+    "location": ("VARCHAR", str),
+    "sentiment": ("DOUBLE", float),
+    "timestamp": ("TIMESTAMP", datetime.datetime),
 }
 
 
-def dict_model(name: str, dict_def: dict):
-    fields = {}
-    for field_name, value in dict_def.items():
-        if isinstance(value, tuple):
-            fields[field_name] = value
-        elif isinstance(value, dict):
-            fields[field_name] = (dict_model(f"{name}_{field_name}", value), ...)
-        else:
-            raise ValueError(f"Field {field_name}:{value} has invalid syntax")
-    return create_model(name, **fields)
-
-
-TweetModel = dict_model("TweetModel", py_tweet)
+def make_data(width):
+    """
+    The tweet, repeated to make it `width` times as wide
+    """
+    record = {}
+    types = {}
+    for i in range(width):
+        for name, value in tweet.items():
+            record[f"{name}_{i}"] = value
+            types[f"{name}_{i}"] = tweet_types[name]
+    schema = schema_loader([{"name": name, "type": kind} for name, (kind, _) in types.items()])
+    model = create_model(
+        "TweetModel",
+        **{
+            name: ((python_type if name[:8] != "location" else python_type | None), ...)
+            for name, (_, python_type) in types.items()
+        },
+    )
+    return record, schema, model
 
 
 def execute_test(func, **kwargs):
@@ -87,23 +85,44 @@ def execute_test(func, **kwargs):
     return statistics.mean(runs)
 
 
-def jj_validate(cycles=0):
-    s = Schema(schema_definition)
-    for i in range(cycles):
-        s.validate(data)
+def per_record(schema, records, **kwargs):
+    for record in records:
+        schema.validate(record)
+
+
+def block(schema, records, **kwargs):
+    for start in range(0, len(records), BLOCK_SIZE):
+        validate_block(schema, records[start : start + BLOCK_SIZE])
+
+
+def table(schema, table, **kwargs):
+    validate_table(schema, table)
 
 
-def py_validate(cycles=0):
-    for i in range(cycles):
-        m = TweetModel(**data)
+def pydantic(model, records, **kwargs):
+    for record in records:
+        model(**record)
 
 
-cycles = 100000
-results = []
-result = {"function": "typhaon", "time": execute_test(jj_validate, cycles=cycles)}
-results.append(result)
-result = {"function": "pydantic", "time": execute_test(py_validate, cycles=cycles)}
-results.append(result)
+if __name__ == "__main__":
+    timings = {}
+    for label, width in (("narrow", 1), ("wide", 6)):
+        record, schema, model = make_data(width)
+        records = [dict(record) for i in range(CYCLES)]
+        invalid = [dict(record) for i in range(CYCLES)]
+        for i in range(0, CYCLES, 100):
+            invalid[i]["followers_0"] = "many"
+        arrow_table = pyarrow.Table.from_pylist(records)
 
+        args = {"schema": schema, "records": records, "model": model}
+        timings[("per record", label)] = execute_test(per_record, **args)
+        timings[("block", label)] = execute_test(block, **args)
+        timings[("block (1% invalid)", label)] = execute_test(block, **{**args, "records": invalid})
+        timings[("table", label)] = execute_test(table, schema=schema, table=arrow_table)
+        timings[("pydantic", label)] = execute_test(pydantic, **args)
 
-print(display.ascii_table(results, 100))
+    print(f"{CYCLES:,} records, 5 runs     narrow    wide")
+    for function in ("per record", "block", "block (1% invalid)", "table", "pydantic"):
+        print(
+            f"{function:<20} {timings[(function, 'narrow')]:.4f}s {timings[(function, 'wide')]:.4f}s"
+        )
@@ -0,0 +1,101 @@
+"""
+Test the storage clients are shared by readers and writers.
+
+Creating the clients doesn't make any requests to the storage services.
+"""
+
+import os
+import sys
+import threading
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+from rich import traceback
+
+from mabel.adapters import client_pool
+
+traceback.install()
+
+
+def test_gcs_clients_are_shared():
+    emulator = os.environ.get("STORAGE_EMULATOR_HOST")
+    os.environ["STORAGE_EMULATOR_HOST"] = "http://localhost:9090"
+    client_pool.clear()
+
+    client = client_pool.get_gcs_client()
+    assert client is client_pool.get_gcs_client()
+
+    bucket = client_pool.get_gcs_bucket("bucket")
+    assert bucket is client_pool.get_gcs_bucket("bucket")
+    assert bucket.client is client
+    assert bucket is not client_pool.get_gcs_bucket("other")
+
+    others = []
+    thread = threading.Thread(target=lambda: others.append(client_pool.get_gcs_client()))
+    thread.start()
+    thread.join()
+    assert others[0] is client
+
+    client_pool.clear()
+    assert client is not client_pool.get_gcs_client()
+
+    if emulator is None:
+        os.environ.pop("STORAGE_EMULATOR_HOST")
+    else:  # pragma: no cover
+        os.environ["STORAGE_EMULATOR_HOST"] = emulator
+
+
+def test_minio_clients_are_shared():
+    client_pool.clear()
+
+    client = client_pool.get_minio_client("localhost:9000", "access", "secret", secure=False)
+    assert client is client_pool.get_minio_client(
+        "localhost:9000", "access", "secret", secure=False
+    )
+    assert client is not client_pool.get_minio_client(
+        "localhost:9000", "other", "secret", secure=False
+    )
+
+    others = []
+    thread = threading.Thread(
+        target=lambda: others.append(
+            client_pool.get_minio_client("localhost:9000", "access", "secret", secure=False)
+        )
+    )
+    thread.start()
+    thread.join()
+    assert others[0] is client
+
+
+def test_clients_are_not_shared_with_forked_processes():
+    client_pool.clear()
+    client_pool.get_minio_client("localhost:9000", "access", "secret", secure=False)
+
+    pid = os.fork()
+    if pid == 0:  # pragma: no cover
+        # the child starts with an empty pool
+        os._exit(0 if not client_pool._minio_clients else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert client_pool._minio_clients
+
+
+def test_readers_and_writers_share_minio_clients():
+    from mabel.adapters.minio import MinIoReader
+    from mabel.adapters.minio import MinIoWriter
+
+    client_pool.clear()
+    credentials = {
+        "end_point": "localhost:9000",
+        "access_key": "access",
+        "secret_key": "secret",
+        "secure": False,
+    }
+    reader = MinIoReader(dataset="bucket/dataset", **credentials)
+    writer = MinIoWriter(dataset="bucket/dataset", **credentials)
+    assert reader.minio is writer.client
+
+
+if __name__ == "__main__":  # pragma: no cover
+    from tests.helpers.runner import run_tests
+
+    run_tests()
@@ -1,10 +1,14 @@
 import os
 import sys
 
+import pytest
+
 sys.path.insert(1, os.path.join(sys.path[0], ".."))
 from mabel import Reader, DictSet
 from mabel.data import STORAGE_CLASS
 from mabel.adapters.disk import DiskReader
+from mabel.errors import InvalidArgument
+from mabel.errors import InvalidDataSetError
 from orso.logging import get_logger
 
 get_logger().setLevel(5)
@@ -15,6 +19,7 @@ STORAGE_CLASSES = [
     STORAGE_CLASS.COMPRESSED_MEMORY,
     STORAGE_CLASS.MEMORY,
     STORAGE_CLASS.DISK,
+    STORAGE_CLASS.COLUMNAR,
 ]
 
 
@@ -91,7 +96,11 @@ def test_types():
             assert types["followers"] == "int"
             assert types["tweet"] == "str"
             assert types["location"] == "str"
-            assert types["sentiment"] == "numeric"
+            # columns have a single type, the ints are stored as floats
+            if storage_class == STORAGE_CLASS.COLUMNAR:
+                assert types["sentiment"] == "float"
+            else:
+                assert types["sentiment"] == "numeric"
             assert types["timestamp"] == "str"
 
 
@@ -163,6 +172,110 @@ def test_items():
     ], items
 
 
+def test_disk_random_access():
+    data = [{"key": i, "value": f"value {i}" * (i % 5)} for i in range(1000)]
+    ds = DictSet(data, storage_class=STORAGE_CLASS.DISK)
+    storage = ds._iterator
+
+    # records are returned in the order they are requested
+    assert list(ds.get_items(900, 3, 500)) == [data[900], data[3], data[500]]
+    assert list(ds.get_items(999)) == [data[999]]
+    assert storage[0] == data[0]
+    assert storage[-1] == data[-1]
+    assert storage[10:15] == data[10:15]
+    assert storage[-3:] == data[-3:]
+    assert storage[5:1] == []
+    assert storage[1:20:7] == data[1:20:7]
+    assert list(storage) == data
+
+    with pytest.raises(IndexError):
+        storage[1000]
+
+
+def test_row_codecs():
+    import datetime
+    import decimal
+
+    data = [
+        {
+            "key": i,
+            "amount": decimal.Decimal("10.10") * i,
+            "when": datetime.datetime(2022, 1, 1, 12, tzinfo=datetime.timezone.utc),
+            "day": datetime.date(2022, 1, i + 1),
+            "time": datetime.time(1, 2, i),
+            "duration": datetime.timedelta(days=-1, seconds=i),
+            "raw": b"\n\x00" * i,
+            "tags": ["a", None, 1.5],
+        }
+        for i in range(10)
+    ]
+    for storage_class in (STORAGE_CLASS.DISK, STORAGE_CLASS.COMPRESSED_MEMORY):
+        ds = DictSet(data, storage_class=storage_class, row_codec="msgpack")
+        assert ds.collect_list() == data, storage_class
+        assert list(ds.get_items(2, 7)) == [data[2], data[7]], storage_class
+        # derived DictSets use the same codec
+        filtered = ds.filter(lambda r: r["key"] > 5)
+        assert filtered.row_codec == "msgpack"
+        assert filtered.collect_list() == data[6:], storage_class
+
+    # json converts the types it doesn't have to strings
+    ds = DictSet(
+        [{k: v for k, v in row.items() if k not in ("raw", "duration")} for row in data[:2]],
+        storage_class=STORAGE_CLASS.DISK,
+    )
+    assert ds.first()["amount"] == "0.00"
+    assert ds.first()["day"] == "2022-01-01"
+
+    with pytest.raises(InvalidArgument):
+        DictSet(data, storage_class=STORAGE_CLASS.DISK, row_codec="xml")
+
+
+def test_compressed_memory_batches():
+    narrow = [{"key": i} for i in range(50000)]
+    wide = [{"key": i, "value": "x" * 2000} for i in range(500)]
+
+    for compression in ("lz4", "zstd", "zstd_dictionary"):
+        for data in (narrow, wide):
+            ds = DictSet(
+                data, storage_class=STORAGE_CLASS.COMPRESSED_MEMORY, compression=compression
+            )
+            assert ds.compression == compression
+            assert ds.count() == len(data)
+            assert ds.collect_list() == data, compression
+            assert list(ds.get_items(0, 251, len(data) - 1)) == [
+                data[0],
+                data[251],
+                data[-1],
+            ], compression
+            assert ds.filter(lambda r: r["key"] < 3).collect_list() == data[:3]
+
+    # batches are sized by bytes, not records
+    narrow_batches = DictSet(narrow, storage_class=STORAGE_CLASS.COMPRESSED_MEMORY)._iterator
+    wide_batches = DictSet(wide, storage_class=STORAGE_CLASS.COMPRESSED_MEMORY)._iterator
+    assert narrow_batches.batch_starts[2] - narrow_batches.batch_starts[1] > 250
+    assert wide_batches.batch_starts[2] - wide_batches.batch_starts[1] < 250
+
+    # recently used batches are kept decompressed
+    storage = DictSet(wide, storage_class=STORAGE_CLASS.COMPRESSED_MEMORY)._iterator
+    first = next(storage._inner_reader(1))
+    assert list(storage._cache) == [0]
+    assert next(storage._inner_reader(1)) == first
+
+    with pytest.raises(InvalidArgument):
+        DictSet(narrow, storage_class=STORAGE_CLASS.COMPRESSED_MEMORY, compression="gzip")
+
+
+def test_compressed_memory_records_are_copies():
+    data = [{"a": i, "b": {"c": i}} for i in range(1000)]
+    ds = DictSet(data, storage_class=STORAGE_CLASS.COMPRESSED_MEMORY)
+    for record in ds.collect_list():
+        record["a"] = -1
+        record["b"]["c"] = -1
+    for record in ds.get_items(0, 1, 999):
+        record["a"] = -1
+    assert ds.collect_list() == data
+
+
 def test_filters():
     data = [
         {"key": 1, "value": "one", "plus1": 2},
@@ -209,6 +322,105 @@ def test_sort():
     ], st
 
 
+def test_columnar_summary():
+    data = [
+        {"key": 1, "value": "one", "plus1": 2},
+        {"key": 2, "value": "two", "plus1": 3},
+        {"key": 3, "value": "three", "plus1": 4},
+        {"key": 4, "value": "four", "plus1": 5},
+    ]
+    ds = DictSet(data, storage_class=STORAGE_CLASS.COLUMNAR)
+
+    assert ds.count() == 4
+    assert ds.min("key") == 1
+    assert ds.max("key") == 4
+    assert ds.min("value") == "four"
+    assert ds.max("value") == "two"
+    assert ds.min_max("key") == (1, 4)
+    assert ds.sum("key") == 10
+    assert ds.sum("missing") == 0
+    assert ds.mean("key") == 2.5
+    assert ds.variance("key") == 1.6666666666666667
+    assert ds.collect_list("value") == ["one", "two", "three", "four"]
+    assert ds.collect_list() == data
+    assert list(ds.get_items(2, 0)) == [data[2], data[0]]
+
+
+def test_columnar_matches_memory():
+    data = [
+        {"key": 3, "value": "a"},
+        {"key": None, "value": "b"},
+        {"key": 1, "value": "a"},
+        {"key": 3, "value": "c"},
+        {"key": 2, "value": None},
+        {"key": 1, "value": "b"},
+    ]
+    memory = DictSet(data, storage_class=STORAGE_CLASS.MEMORY)
+    columnar = DictSet(data, storage_class=STORAGE_CLASS.COLUMNAR)
+
+    for descending in (False, True):
+        for take in (1, 3, 10):
+            expected = list(memory.sort_and_take("key", take, descending))
+            actual = list(columnar.sort_and_take("key", take, descending))
+            assert actual == expected, (descending, take, actual)
+
+    for columns in ((), ("key",), ("value",), ("key", "value")):
+        expected = memory.distinct(*columns).collect_list()
+        distinct = columnar.distinct(*columns)
+        assert distinct.storage_class == STORAGE_CLASS.COLUMNAR
+        assert distinct.collect_list() == expected, (columns, distinct.collect_list())
+
+
+def test_columnar_storage():
+    import pyarrow
+
+    # strings are dictionary encoded, batches share the dictionary
+    data = [{"name": f"name-{i % 3}", "value": i} for i in range(25000)]
+    ds = DictSet(data, storage_class=STORAGE_CLASS.COLUMNAR)
+    table = ds._iterator.table
+    assert pyarrow.types.is_dictionary(table.schema.field("name").type)
+    assert all(len(chunk.dictionary) == 3 for chunk in table.column("name").chunks)
+    assert ds.count() == 25000
+    assert ds.distinct("name").count() == 3
+    assert ds.sum("value") == sum(range(25000))
+    assert list(ds.sort_and_take("value", 2, descending=True)) == [data[-1], data[-2]]
+
+    # missing columns are None
+    ds = DictSet([{"a": 1}, {"b": 2}], storage_class=STORAGE_CLASS.COLUMNAR)
+    assert ds.collect_list() == [{"a": 1, "b": None}, {"a": None, "b": 2}]
+
+    # columns can't have different types
+    with pytest.raises(InvalidDataSetError):
+        DictSet([{"a": 1}, {"a": "one"}], storage_class=STORAGE_CLASS.COLUMNAR)
+
+
+def test_sort_all_records():
+    import decimal
+    import random
+
+    from mabel.data.internals.sorting import external_sort
+
+    data = [
+        {"key": random.choice([None, 1, 2, 3, 10]), "amount": decimal.Decimal(i % 13), "row": i}
+        for i in range(1000)
+    ]
+    for descending in (False, True):
+        expected = sorted(data, key=lambda r: (r["key"] is not None, r["key"]), reverse=descending)
+        for storage_class in STORAGE_CLASSES:
+            # json turns the Decimals into strings
+            ds = DictSet(data, storage_class=storage_class, row_codec="msgpack")
+            ordered = ds.sort("key", descending=descending)
+            assert ordered.storage_class == storage_class
+            assert list(ordered) == expected, (storage_class, descending)
+            assert list(ds.sort_and_take("key", 10, descending)) == expected[:10]
+
+        # small runs so the runs are written to disk and merged, in more than one pass
+        assert list(external_sort(data, "key", descending, run_size=7)) == expected
+        # the values keep their types when they're written to disk
+        by_amount = sorted(data, key=lambda r: r["amount"], reverse=descending)
+        assert list(external_sort(data, "amount", descending, run_size=50)) == by_amount
+
+
 if __name__ == "__main__":  # pragma: no cover
     from tests.helpers.runner import run_tests
 
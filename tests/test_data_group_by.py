@@ -3,6 +3,8 @@ import os
 
 sys.path.insert(1, os.path.join(sys.path[0], ".."))
 from mabel.data.internals.group_by import GroupBy
+from mabel.data.internals.columnar_group_by import ColumnarGroupBy
+from mabel.data.internals.group_by import partial_aggregator
 from mabel.data.internals.dictset import STORAGE_CLASS, DictSet
 from rich import traceback
 from decimal import Decimal
@@ -117,6 +119,173 @@ def test_gappy_set():
     ], g
 
 
+def test_group_by_spilling():
+    """
+    Test the groups are written to disk when there are more than max_groups
+    """
+    data = [
+        {"session": f"s{i % 997}", "user": i % 7, "value": i % 13, "cost": Decimal(i % 5)}
+        for i in range(20000)
+    ]
+    aggregations = [
+        ("COUNT", "*"),
+        ("SUM", "cost"),
+        ("MIN", "value"),
+        ("MAX", "value"),
+        ("AVG", "value"),
+    ]
+
+    for columns in ("session", ("session", "user")):
+        expected = list(GroupBy(data, columns).aggregate(aggregations.copy()))
+        grouper = GroupBy(data, columns, max_groups=400)
+        spilled = list(grouper.aggregate(aggregations.copy()))
+        assert grouper._spilled is not None
+        # the groups are in the same order as when they're all held in memory
+        assert spilled == expected
+
+        expected_groups = list(GroupBy(data, columns).groups())
+        spilled_groups = list(GroupBy(data, columns, max_groups=400).groups())
+        assert len(spilled_groups) == len(expected_groups)
+        assert sorted(map(str, spilled_groups)) == sorted(map(str, expected_groups))
+
+
+def test_group_by_partials():
+    """
+    Test combining partial aggregations of chunks of the data gives the same
+    result as aggregating all of the data at once
+    """
+    import orjson
+
+    data = [
+        {"session": f"s{i % 97}", "user": i % 7, "value": i % 13, "cost": Decimal(i % 5)}
+        for i in range(5000)
+    ]
+    aggregations = [
+        ("COUNT", "*"),
+        ("SUM", "cost"),
+        ("MIN", "value"),
+        ("MAX", "value"),
+        ("AVG", "value"),
+    ]
+
+    for columns in ("session", ("session", "user"), "*"):
+        expected = list(GroupBy(data, columns).aggregate(aggregations))
+
+        reducer = partial_aggregator(columns, aggregations)
+        partials = [record for i in range(0, 5000, 1200) for record in reducer(data[i : i + 1200])]
+        # the partials survive being serialized, e.g. between processes
+        partials = orjson.loads(orjson.dumps(partials, default=str))
+        combined = list(GroupBy(partials, columns).aggregate_partials(aggregations))
+        assert combined == expected, columns
+
+        # and when the groups are written to disk
+        spilled = list(GroupBy(partials, columns, max_groups=10).aggregate_partials(aggregations))
+        assert spilled == expected, columns
+
+
+def test_columnar_group_by():
+    """
+    Test the columnar engine gives the same results as the rows engine
+    """
+    data = [
+        {
+            "session": f"s{i % 97}",
+            "user": i % 7,
+            "value": i % 13,
+            "score": (i % 11) / 4,
+            "cost": Decimal(i % 5),
+            "name": f"n{i % 17}",
+            "gappy": None if i % 3 else i,
+        }
+        for i in range(25000)
+    ]
+    aggregations = [
+        ("COUNT", "*"),
+        ("COUNT", "gappy"),
+        ("SUM", "value"),
+        ("SUM", "score"),
+        ("SUM", "cost"),
+        ("MIN", "name"),
+        ("MAX", "name"),
+        ("MIN", "score"),
+        ("MAX", "gappy"),
+        ("AVG", "value"),
+    ]
+    key = lambda record: str(record)
+
+    for columns in ("session", ("session", "user"), "*"):
+        ds = DictSet(data, storage_class=STORAGE_CLASS.MEMORY)
+        expected = list(ds.group_by(columns).aggregate(aggregations))
+        columnar = list(ds.group_by(columns, engine="columnar").aggregate(aggregations))
+        assert len(columnar) == len(expected)
+        for row, col in zip(expected, columnar):
+            assert row.keys() == col.keys()
+            for name in row:
+                if name.startswith("SUM") or name.startswith("AVG"):
+                    # the columnar engine sums as integers and floats
+                    assert float(row[name]) == float(col[name]), (name, row, col)
+                else:
+                    assert row[name] == col[name], (name, row, col)
+        assert isinstance(columnar[0]["SUM(value)"], int)
+        assert isinstance(columnar[0]["SUM(cost)"], Decimal)
+
+        decimals = list(
+            ds.group_by(columns, engine="columnar", decimals=True).aggregate(aggregations)
+        )
+        assert [r["SUM(value)"] for r in decimals] == [r["SUM(value)"] for r in expected]
+        assert all(isinstance(r["SUM(value)"], Decimal) for r in decimals)
+
+        groups = list(ds.group_by(columns, engine="columnar").groups())
+        assert sorted(map(key, groups)) == sorted(map(key, ds.group_by(columns).groups()))
+
+    # the convenience methods
+    ds = DictSet(data, storage_class=STORAGE_CLASS.MEMORY)
+    assert len(list(ds.group_by("user", engine="columnar").count())) == 7
+    assert list(ds.group_by("user", engine="columnar").max("value"))[0]["MAX(value)"] == 12
+
+    # groups are the same as the rows engine's, even when their values are equal in
+    # Python (1, True, 1.0) or missing, and MIN and MAX keep the types of the values
+    keys = [1, True, 1.0, "1", 0, False, None, "", "missing"]
+    mixed = []
+    for i in range(3000):
+        record = {
+            "key": keys[i % len(keys)],
+            "number": i if i % 4 else i / 2,
+            "flag": i % 5 == 0,
+            "sparse": i if keys[i % len(keys)] != 0 else None,
+        }
+        if record["key"] == "missing":
+            del record["key"]
+        mixed.append(record)
+    aggregations = [
+        ("COUNT", "sparse"),
+        ("MIN", "number"),
+        ("MAX", "number"),
+        ("MIN", "flag"),
+        ("MAX", "flag"),
+        ("MAX", "sparse"),
+    ]
+    for batch_size in (10000, 100):
+        for columns in ("key", ("key", "flag")):
+            ds = DictSet(mixed, storage_class=STORAGE_CLASS.MEMORY)
+            expected = list(ds.group_by(columns).aggregate(aggregations))
+            columnar = list(
+                ColumnarGroupBy(mixed, columns, batch_size=batch_size).aggregate(aggregations)
+            )
+            assert [(r, list(map(type, r.values()))) for r in expected] == [
+                (r, list(map(type, r.values()))) for r in columnar
+            ], columns
+    # groups without any values aren't returned
+    expected = list(DictSet(mixed).group_by("key").aggregate(("MAX", "sparse")))
+    assert expected == list(ColumnarGroupBy(mixed, "key").aggregate(("MAX", "sparse")))
+    assert len(expected) == 5
+
+    # sums too large for an int64
+    large = [{"key": 1, "value": 2**62}, {"key": 1, "value": 2**62}]
+    result = list(DictSet(large).group_by("key", engine="columnar").sum("value"))
+    assert result[0]["SUM(value)"] == 2**63, result
+
+
 if __name__ == "__main__":  # pragma: no cover
     from tests.helpers.runner import run_tests
 
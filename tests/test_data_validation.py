@@ -10,6 +10,8 @@ import pytest
 
 sys.path.insert(1, os.path.join(sys.path[0], ".."))
 from mabel.data.validator import schema_loader
+from mabel.data.validator import validate_block
+from mabel.data.validator import validate_table
 from orso.exceptions import DataValidationError
 from rich import traceback
 import orjson
@@ -246,6 +248,44 @@ def test_validator_other():
 #    assert other_test(TEST_DATA)
 
 
+def test_validate_block():
+    schema = schema_loader(
+        [
+            {"name": "name", "type": "VARCHAR"},
+            {"name": "value", "type": "INTEGER"},
+            {"name": "score", "type": "DOUBLE"},
+            {"name": "when", "type": "TIMESTAMP"},
+        ]
+    )
+    records = [
+        {"name": f"n{i}", "value": i, "score": i / 2, "when": datetime.datetime(2022, 1, 1)}
+        for i in range(100)
+    ]
+    records[5]["value"] = "five"  # wrong type
+    records[17]["extra"] = True  # extra column
+    records[23].pop("score")  # missing column
+    records[42]["name"] = None  # nullable
+    records[64]["score"] = 64  # int isn't a float
+
+    failures = validate_block(schema, records)
+    assert [position for position, err in failures] == [5, 17, 23, 64], failures
+
+    # the errors are the same as validating each record
+    for position, err in failures:
+        with pytest.raises(type(err)) as row_err:
+            schema.validate(records[position])
+        assert str(row_err.value) == str(err)
+
+    import pyarrow
+
+    valid = [record for i, record in enumerate(records) if i not in (5, 17, 23, 64)]
+    assert validate_table(schema, pyarrow.Table.from_pylist(valid)) == []
+    # the values are only checked if the types of the columns don't match
+    table = pyarrow.Table.from_pylist(valid[:10])
+    table = table.set_column(1, "value", table.column("value").cast(pyarrow.string()))
+    assert [position for position, err in validate_table(schema, table)] == list(range(10))
+
+
 if __name__ == "__main__":  # pragma: no cover
     from tests.helpers.runner import run_tests
 
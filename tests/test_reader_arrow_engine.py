@@ -0,0 +1,99 @@
+import os
+import sys
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+import pyarrow
+from mabel.adapters.disk import DiskReader
+from mabel.data import Reader
+from mabel.data.internals import arrow_filters
+from mabel.data.internals.dnf_filters import DnfFilters
+from mabel.data.internals.dnf_filters import evaluate
+from mabel.errors import InvalidReaderConfigError
+from rich import traceback
+
+traceback.install()
+
+RECORDS = [
+    {"name": "Alice", "age": 30, "tags": ["a", "b"], "when": "2021-01-01"},
+    {"name": "bob", "age": None, "tags": ["b"], "when": "2021-02-01"},
+    {"name": None, "age": 12, "tags": None, "when": None},
+    {"name": "Carol", "age": 45, "tags": [], "when": "2021-03-01"},
+]
+
+FILTERS = [
+    ("name", "=", "bob"),
+    ("name", "!=", "bob"),
+    ("age", ">", 12),
+    ("age", "<=", 30),
+    ("age", "=", None),
+    ("name", "like", "a%"),
+    ("name", "like", "%O%"),
+    ("name", "~", "^[A-C]"),
+    ("name", "in", ("bob", "Carol")),
+    ("name", "not in", ("bob", "Carol")),
+    ("name", "contains", "o"),
+    ("name", "!contains", "o"),
+    ("tags", "contains", "b"),
+    ("tags", "!contains", "b"),
+    ("missing", "=", 1),
+    [("age", ">", 12), ("name", "like", "%l%")],
+    [[("age", ">", 40)], [("name", "=", "bob")]],
+]
+
+
+def test_arrow_filters_match_record_filters():
+    table = pyarrow.Table.from_pylist(RECORDS)
+    for predicate in FILTERS:
+        mask = arrow_filters.evaluate(predicate, table).to_pylist()
+        expected = [bool(evaluate(predicate, record)) for record in RECORDS]
+        assert mask == expected, f"{predicate} {mask} {expected}"
+
+
+def test_arrow_filters_not_vectorizable():
+    table = pyarrow.Table.from_pylist(RECORDS)
+    for predicate in [("age", "like", "1%"), ("name", "in", "bob"), ("age", "=", "old")]:
+        try:
+            arrow_filters.evaluate(predicate, table)
+            assert False, predicate
+        except arrow_filters.CannotVectorize:
+            pass
+
+
+def read(**kwargs):
+    return list(
+        Reader(inner_reader=DiskReader, dataset="tests/data/tweets", raw_path=True, **kwargs)
+    )
+
+
+def test_engines_return_the_same_records():
+    for filters in [
+        None,
+        [("username", "==", "BBCNews")],
+        [("username", "like", "nbc%"), ("followers", ">", 1000)],
+        [("tweet", "contains", "Trump")],
+        [[("sentiment", "<", 0)], [("user_verified", "=", False)]],
+        "username = 'BBCNews'",
+    ]:
+        for select in ["*", "username, followers", "UPPER(username) AS u, tweet"]:
+            python = read(select=select, filters=filters)
+            arrow = read(select=select, filters=filters, engine="arrow")
+            assert python == arrow, f"{select} {filters}"
+
+
+def test_engine_keeps_date_strings():
+    records = read(engine="arrow", select="timestamp")
+    assert all(isinstance(r["timestamp"], str) for r in records)
+
+
+def test_invalid_engine():
+    try:
+        read(engine="pandas")
+        assert False
+    except InvalidReaderConfigError:
+        pass
+
+
+if __name__ == "__main__":  # pragma: no cover
+    from tests.helpers.runner import run_tests
+
+    run_tests()
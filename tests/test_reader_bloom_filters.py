@@ -0,0 +1,135 @@
+"""
+Test the bloom filters written to the manifests are used to skip blobs which don't
+contain the values in equality filters.
+"""
+
+import glob
+import os
+import shutil
+import sys
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+import orjson
+from rich import traceback
+
+from mabel.data.internals import zone_maps
+from mabel.data.internals.bloom_filter import BloomFilter
+from tests.helpers.counting_reader import CountingReader
+from tests.helpers.counting_reader import read_dataset
+from tests.helpers.counting_reader import write_dataset
+
+traceback.install()
+
+FOLDER = "_temp/bloom_filters"
+SCHEMA = [{"name": "id", "type": "INTEGER"}, {"name": "request", "type": "VARCHAR"}]
+
+
+def request_id(i):
+    # the values aren't in order, so the zone maps can't be used to skip blobs
+    return f"{(i * 7919) % 10007:05}-request"
+
+
+def write_data(format, bloom_on=["request"]):
+    records = ({"id": i, "request": request_id(i)} for i in range(2000))
+    write_dataset(FOLDER, records, format=format, schema=SCHEMA, blob_size=10000, bloom_on=bloom_on)
+
+
+def read(filters):
+    return sorted(record["id"] for record in read_dataset(FOLDER, filters))
+
+
+def test_bloom_filter():
+    values = [f"value-{i}" for i in range(1000)]
+    bloom_filter = BloomFilter.build(values + [None])
+
+    # no false negatives
+    assert all(value in bloom_filter for value in values)
+    # some false positives, but not too many
+    false_positives = sum(f"other-{i}" in bloom_filter for i in range(10000))
+    assert false_positives < 500, false_positives
+    assert 0 < bloom_filter.false_positive_rate() < 0.05
+
+    assert bloom_filter.excludes("=", "other")
+    assert not bloom_filter.excludes("=", "value-1")
+    assert not bloom_filter.excludes(">", "other")
+    assert bloom_filter.excludes("in", ["other", "another"])
+    assert not bloom_filter.excludes("in", ["other", "value-1"])
+
+    restored = BloomFilter.from_dict(orjson.loads(orjson.dumps(bloom_filter.to_dict())))
+    assert restored.bits == bloom_filter.bits
+    assert restored.hash_count == bloom_filter.hash_count
+    assert BloomFilter.from_dict({"bits": "??"}) is None
+
+    # equal values are the same value
+    assert 1 in BloomFilter.build([1.0])
+
+
+def test_bloom_filters_written_to_manifest():
+    for format in ("jsonl", "zstd", "parquet"):
+        write_data(format)
+        manifests = glob.glob(FOLDER + "/**/*" + zone_maps.MANIFEST_EXTENSION, recursive=True)
+        assert len(manifests) == 1, format
+        with open(manifests[0], "rb") as manifest_file:
+            manifest = orjson.loads(manifest_file.read())
+        assert len(manifest) > 1
+        for zone_map in manifest.values():
+            assert "request" in zone_map["blooms"], format
+    shutil.rmtree(FOLDER, ignore_errors=True)
+
+
+def test_blobs_skipped_by_bloom_filters():
+    for format in ("jsonl", "parquet"):
+        write_data(format)
+        blobs = len(glob.glob(FOLDER + f"/**/*.{format}", recursive=True))
+        assert blobs > 4
+
+        # the value is in one blob
+        assert read(("request", "=", request_id(1234))) == [1234], format
+        assert len(CountingReader.blobs_read) < blobs, format
+
+        assert read(("request", "in", [request_id(10), request_id(1990)])) == [10, 1990]
+        assert len(CountingReader.blobs_read) < blobs, format
+
+        # the value isn't in any of the blobs
+        assert read(("request", "==", "not-a-request")) == []
+        assert len(CountingReader.blobs_read) <= 1, format
+
+        # the bloom filters can't be used for other comparisons
+        assert len(read(("request", ">", request_id(1234)))) > 0
+        assert len(CountingReader.blobs_read) == blobs, format
+
+        # or for ORs where the other side can't be excluded
+        assert read([[("request", "=", "not-a-request")], [("id", ">=", 0)]]) == list(range(2000))
+        assert len(CountingReader.blobs_read) == blobs, format
+    shutil.rmtree(FOLDER, ignore_errors=True)
+
+
+def test_flat_bloom_filters():
+    records = ({"id": i, "a": {"b": i}} for i in range(10))
+    write_dataset(FOLDER, records, format="flat", schema=False, bloom_on=["a.b", "missing"])
+
+    # filters are built from the nested values, columns without any values don't
+    # have filters
+    manifests = glob.glob(FOLDER + "/**/*" + zone_maps.MANIFEST_EXTENSION, recursive=True)
+    with open(manifests[0], "rb") as manifest_file:
+        manifest = orjson.loads(manifest_file.read())
+    for zone_map in manifest.values():
+        assert list(zone_map["blooms"]) == ["a.b"]
+
+    assert read(("a.b", "==", 3)) == [3]
+    assert read(("a.b", "==", 30)) == []
+    shutil.rmtree(FOLDER, ignore_errors=True)
+
+
+def test_blobs_read_without_bloom_filters():
+    write_data("jsonl", bloom_on=[])
+    blobs = len(glob.glob(FOLDER + "/**/*.jsonl", recursive=True))
+    assert read(("request", "=", request_id(1234))) == [1234]
+    assert len(CountingReader.blobs_read) == blobs
+    shutil.rmtree(FOLDER, ignore_errors=True)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    from tests.helpers.runner import run_tests
+
+    run_tests()
@@ -0,0 +1,73 @@
+import datetime
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+from mabel.adapters.disk import DiskReader
+from mabel.data.readers.internals import base_inner_reader
+from rich import traceback
+
+traceback.install()
+
+
+class SlowReader(DiskReader):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.lock = threading.Lock()
+        self.listed = []
+
+    def get_blobs_at_path(self, path):
+        time.sleep(0.1)
+        with self.lock:
+            self.listed.append(str(path))
+        return super().get_blobs_at_path(path)
+
+
+def get_reader():
+    return SlowReader(
+        dataset="tests/data/dated",
+        partitions=["year_{yyyy}/month_{mm}/day_{dd}"],
+        start_date=datetime.date(2020, 2, 1),
+        end_date=datetime.date(2020, 2, 16),
+    )
+
+
+def test_concurrent_listing_matches_serial():
+    threads = base_inner_reader.LISTING_THREADS
+    try:
+        base_inner_reader.LISTING_THREADS = 1
+        reader = get_reader()
+        start = time.monotonic()
+        serial = reader.get_list_of_blobs()
+        serial_time = time.monotonic() - start
+    finally:
+        base_inner_reader.LISTING_THREADS = threads
+
+    reader = get_reader()
+    start = time.monotonic()
+    concurrent = reader.get_list_of_blobs()
+    concurrent_time = time.monotonic() - start
+
+    assert concurrent == serial
+    assert len(concurrent) == 2, concurrent
+    # each day is only listed once
+    assert len(reader.listed) == len(set(reader.listed)) == 16
+    assert concurrent_time < serial_time / 2, (concurrent_time, serial_time)
+
+
+def test_paths_without_dates_are_listed_once():
+    reader = SlowReader(
+        dataset="tests/data/tweets",
+        start_date=datetime.date(2020, 2, 1),
+        end_date=datetime.date(2020, 2, 16),
+    )
+    assert len(reader.get_list_of_blobs()) == 2
+    assert len(reader.listed) == 1
+
+
+if __name__ == "__main__":  # pragma: no cover
+    from tests.helpers.runner import run_tests
+
+    run_tests()
@@ -0,0 +1,144 @@
+"""
+Test resuming from a cursor by seeking to the row recorded in the cursor, rather
+than reading and discarding the rows before it.
+"""
+
+import glob
+import os
+import shutil
+import sys
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+from rich import traceback
+
+from mabel.data.internals import row_offsets
+from mabel.data.readers.internals.cursor import Cursor
+from tests.helpers.counting_reader import CountingReader
+from tests.helpers.counting_reader import read_dataset
+from tests.helpers.counting_reader import write_dataset
+
+traceback.install()
+
+FOLDER = "_temp/cursor_offsets"
+SCHEMA = [{"name": "id", "type": "INTEGER"}, {"name": "name", "type": "VARCHAR"}]
+
+
+def write_data(format):
+    records = ({"id": i, "name": f"name-{i:04}"} for i in range(1000))
+    write_dataset(FOLDER, records, format=format, schema=SCHEMA, blob_size=8000)
+
+
+def get_reader(cursor=None, **kwargs):
+    return read_dataset(FOLDER, cursor=cursor, **kwargs)
+
+
+def indexes_read():
+    return [
+        blob
+        for blob in CountingReader.bytes_read
+        if blob.endswith(row_offsets.ROW_OFFSETS_EXTENSION)
+    ]
+
+
+def read_with_cursor(stop, **kwargs):
+    first_reader = get_reader(**kwargs)
+    first = [next(first_reader)["id"] for i in range(stop)]
+    cursor = str(first_reader.cursor)
+
+    second_reader = get_reader(cursor=cursor, **kwargs)
+    rest = [record["id"] for record in second_reader]
+    return first, rest
+
+
+def test_row_offsets_index_written():
+    write_data("jsonl")
+    blobs = glob.glob(FOLDER + "/**/*.jsonl", recursive=True)
+    assert len(blobs) > 1
+
+    for blob in blobs:
+        with open(row_offsets.index_name(blob), "rb") as index_file:
+            offsets = row_offsets.deserialize(index_file.read())
+        with open(blob, "rb") as blob_file:
+            data = blob_file.read()
+        lines = data.splitlines()
+        assert len(offsets) == len(lines)
+        for offset, line in zip(offsets, lines):
+            assert data[offset : offset + len(line)] == line
+    shutil.rmtree(FOLDER, ignore_errors=True)
+
+
+def test_resume_seeks_with_row_offsets():
+    write_data("jsonl")
+    first, rest = read_with_cursor(250)
+    assert sorted(first + rest) == list(range(1000))
+    assert len(first + rest) == 1000
+    assert len(indexes_read()) == 1
+    shutil.rmtree(FOLDER, ignore_errors=True)
+
+
+def test_resume_with_filters():
+    write_data("jsonl")
+    for engine in ("python", "arrow"):
+        first, rest = read_with_cursor(150, filters=("id", ">=", 500), engine=engine)
+        assert sorted(first + rest) == list(range(500, 1000)), engine
+        assert len(first + rest) == 500, engine
+    shutil.rmtree(FOLDER, ignore_errors=True)
+
+
+def test_resume_without_row_offsets():
+    write_data("zstd")
+    for engine in ("python", "arrow"):
+        first, rest = read_with_cursor(250, filters=("id", "<", 900), engine=engine)
+        assert sorted(first + rest) == list(range(900)), engine
+        assert len(first + rest) == 900, engine
+        assert len(indexes_read()) == 0, engine
+    shutil.rmtree(FOLDER, ignore_errors=True)
+
+
+def test_resume_parquet():
+    write_data("parquet")
+    for engine in ("python", "arrow"):
+        first, rest = read_with_cursor(250, engine=engine)
+        assert sorted(first + rest) == list(range(1000)), engine
+        assert len(first + rest) == 1000, engine
+    shutil.rmtree(FOLDER, ignore_errors=True)
+
+
+def test_resume_from_cursor_without_offset():
+    write_data("jsonl")
+    first_reader = get_reader()
+    first = [next(first_reader)["id"] for i in range(100)]
+    cursor = first_reader.cursor.get()
+    # cursors created before the offset was recorded
+    cursor.pop("offset")
+
+    rest = [record["id"] for record in get_reader(cursor=cursor)]
+    assert sorted(first + rest) == list(range(1000))
+    assert len(indexes_read()) == 0
+    shutil.rmtree(FOLDER, ignore_errors=True)
+
+
+def test_cursor_walks_blobs_in_order():
+    blobs = [f"blob-{i:05}" for i in range(10000)]
+    cursor = Cursor(readable_blobs=blobs)
+    read = []
+    blob = cursor.next_blob()
+    while blob:
+        read.append(blob)
+        assert cursor.upcoming_blobs(2) == blobs[len(read) : len(read) + 2]
+        blob = cursor.next_blob(blob)
+    assert read == blobs
+
+    # blobs read out of order are skipped when resuming
+    resumed = Cursor(readable_blobs=blobs[:8])
+    resumed.read_blobs = {blobs[0], blobs[2], blobs[3]}
+    resumed.load_cursor(str(resumed))
+    assert resumed.next_blob() == blobs[1]
+    assert resumed.upcoming_blobs(3) == blobs[4:7]
+    assert resumed.next_blob(blobs[1]) == blobs[4]
+
+
+if __name__ == "__main__":  # pragma: no cover
+    from tests.helpers.runner import run_tests
+
+    run_tests()
@@ -0,0 +1,64 @@
+import io
+import os
+import sys
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+import zstandard
+from mabel.data.readers.internals import decompressors
+from rich import traceback
+
+traceback.install()
+
+LINES = [b'{"a":1}', b'{"b":"two"}', b"", b'{"c":[3,3,3]}', b'{"d":"' + b"x" * 50 + b'"}']
+
+
+def test_split_lines_carries_partial_lines():
+    data = b"\n".join(LINES) + b"\n"
+    for chunk_size in (1, 2, 3, 7, 16, 1024):
+        lines = list(decompressors.split_lines(io.BytesIO(data), chunk_size=chunk_size))
+        assert lines == LINES, chunk_size
+
+
+def test_split_lines_without_trailing_newline():
+    data = b"\n".join(LINES)
+    lines = list(decompressors.split_lines(io.BytesIO(data), chunk_size=5))
+    assert lines == LINES
+
+
+def test_split_lines_empty_stream():
+    assert list(decompressors.split_lines(io.BytesIO(b""))) == []
+
+
+def test_zstd_is_streamed():
+    data = b"\n".join(LINES) + b"\n"
+    compressed = zstandard.compress(data)
+    assert list(decompressors.zstd(io.BytesIO(compressed))) == LINES
+
+
+def test_lines_is_streamed():
+    data = b"\n".join(LINES) + b"\n"
+    assert list(decompressors.lines(io.BytesIO(data))) == LINES
+
+
+def test_seekable():
+    class Unseekable(io.RawIOBase):
+        def __init__(self, data):
+            self.data = io.BytesIO(data)
+
+        def readable(self):
+            return True
+
+        def readinto(self, b):
+            return self.data.readinto(b)
+
+    stream = io.BytesIO(b"abc")
+    assert decompressors.seekable(stream) is stream
+    unseekable = decompressors.seekable(Unseekable(b"abc"))
+    assert unseekable.seekable()
+    assert unseekable.read() == b"abc"
+
+
+if __name__ == "__main__":  # pragma: no cover
+    from tests.helpers.runner import run_tests
+
+    run_tests()
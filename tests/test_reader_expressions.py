@@ -73,6 +73,30 @@ def test_simple_compound_expressions():
     assert DATA.filter("name like '%Potter' or alive == true").count() == 5
 
 
+def test_compiled_expressions_match_interpretted():
+    EXPRESSIONS = [
+        "name == 'James Potter'",
+        "age >= 11 and gender == 'female'",
+        "name like '%potter' or age < 11",
+        "name not like '%Potter%'",
+        "not alive == true",
+        "age in (10, 11, 40)",
+        "name in ('Harry Potter', 'Lily Potter')",
+        "affiliations contains 'MoM'",
+        "name matches '^H'",
+        "dob > '1999-01-01'",
+        "`name` == 'Sirius Black'",
+        "affiliations is none",
+        "age < name",
+    ]
+    for expression in EXPRESSIONS:
+        exp = Expression(expression)
+        for record in TEST_DATA:
+            compiled = bool(exp(record))
+            interpretted = bool(exp.evaluate_recursive(exp.root, record))
+            assert compiled == interpretted, f"{expression} {record}"
+
+
 if __name__ == "__main__":  # pragma: no cover
     from tests.helpers.runner import run_tests
 
@@ -4,6 +4,7 @@ import sys
 sys.path.insert(1, os.path.join(sys.path[0], ".."))
 from mabel.adapters.disk import DiskReader
 from mabel.data.internals.dnf_filters import DnfFilters
+from mabel.data.internals.dnf_filters import evaluate
 from mabel.data.internals.dictset import STORAGE_CLASS
 from mabel.data import Reader
 from rich import traceback
@@ -114,6 +115,37 @@ def test_combined_filters():
     assert len([a for a in filter08.filter_dictset(TEST_DATA)]) == 1
 
 
+def test_compiled_filters_match_interpretted():
+    FILTERS = [
+        ("name", "==", "Harry Potter"),
+        [("age", ">", 10), ("gender", "!=", "male")],
+        [[("age", "<", 11)], [("name", "like", "%POTTER")]],
+        [("name", "~", "^H"), ("dob", ">=", "1999-07-30")],
+        ("age", "in", (0, 40)),
+        ("age", "not in", {0, 40}),
+        ("affiliations", "in", [["OotP"], "x"]),
+        ("affiliations", "contains", "Griffindor"),
+        ("affiliations", "!contains", "Griffindor"),
+        ("missing", "==", None),
+        [],
+    ]
+    for predicates in FILTERS:
+        dnf = DnfFilters(predicates)
+        for record in TEST_DATA:
+            compiled = bool(dnf(record))
+            interpretted = bool(evaluate(predicates, record))
+            assert compiled == interpretted, f"{predicates} {record}"
+
+
+def test_malformed_filters_fail_when_evaluated():
+    dnf = DnfFilters([("name", "unknown", "Harry Potter")])
+    try:
+        dnf(TEST_DATA[0])
+        assert False
+    except KeyError:
+        pass
+
+
 if __name__ == "__main__":  # pragma: no cover
     from tests.helpers.runner import run_tests
 
@@ -0,0 +1,76 @@
+import os
+import sys
+import time
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+from mabel.data import Reader
+from mabel.data.readers.internals.listing_cache import LISTING_CACHE
+from mabel.data.readers.internals.listing_cache import ListingCache
+from rich import traceback
+from tests.helpers.counting_reader import CountingReader
+
+traceback.install()
+
+
+def read(**kwargs):
+    return list(
+        Reader(inner_reader=CountingReader, dataset="tests/data/tweets", partitions=[], **kwargs)
+    )
+
+
+def test_listing_cache_is_shared_by_readers():
+    LISTING_CACHE.clear()
+    CountingReader.reset()
+    first = read(listing_cache_ttl=60)
+    second = read(listing_cache_ttl=60)
+    assert first == second
+    assert CountingReader.listings == 1, CountingReader.listings
+
+
+def test_listing_cache_disabled_by_default():
+    LISTING_CACHE.clear()
+    CountingReader.reset()
+    read()
+    read()
+    assert CountingReader.listings == 2, CountingReader.listings
+
+
+def test_listing_cache_expiry():
+    cache = ListingCache()
+    cache.set("open", ["a/blob.jsonl"], ttl=0.1)
+    cache.set("complete", ["a/as_at_1/blob.jsonl", "a/as_at_1/frame.complete"], ttl=0.1)
+    assert cache.get("open") == ["a/blob.jsonl"]
+    assert cache.get("missing") is None
+    time.sleep(0.2)
+    assert cache.get("open") is None
+    # complete frames expire too, newer frames may have been written
+    assert cache.get("complete") is None
+
+
+def test_listing_cache_size():
+    cache = ListingCache(maximum_entries=2)
+    cache.set("a", ["a"], ttl=60)
+    cache.set("b", ["b"], ttl=60)
+    assert cache.get("a") == ["a"]
+    # the least recently used listing is discarded
+    cache.set("c", ["c"], ttl=60)
+    assert cache.get("b") is None
+    assert cache.get("a") == ["a"]
+    assert cache.get("c") == ["c"]
+
+
+def test_listing_cache_scope():
+    from mabel.adapters.minio import MinIoReader
+
+    credentials = {"end_point": "localhost:9000", "secret_key": "secret", "secure": False}
+    first = MinIoReader(dataset="bucket/dataset", access_key="first", **credentials)
+    second = MinIoReader(dataset="bucket/dataset", access_key="second", **credentials)
+    same = MinIoReader(dataset="bucket/dataset", access_key="first", **credentials)
+    assert first.listing_cache_scope != second.listing_cache_scope
+    assert first.listing_cache_scope == same.listing_cache_scope
+
+
+if __name__ == "__main__":  # pragma: no cover
+    from tests.helpers.runner import run_tests
+
+    run_tests()
@@ -0,0 +1,75 @@
+import os
+import sys
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+from mabel import Reader
+from mabel.adapters.disk import DiskReader
+from mabel.data.internals.group_by import GroupBy
+from mabel.data.internals.group_by import partial_aggregator
+from mabel.data.internals.dnf_filters import DnfFilters
+from mabel.data.readers.internals.inline_evaluator import Evaluator
+from mabel.data.readers.internals.multiprocess_wrapper import processed_reader
+from mabel.data.readers.internals.parallel_reader import ParallelReader
+from mabel.data.readers.internals.parallel_reader import pass_thru
+from rich import traceback
+
+traceback.install()
+
+BLOBS = ["tests/data/tweets/tweets-0000.jsonl", "tests/data/tweets/tweets-0001.jsonl"]
+
+
+def get_parallel(**kwargs):
+    reader = DiskReader(dataset="tests/data/tweets/", partitions=None)
+    kwargs["columns"] = kwargs.get("columns", pass_thru)
+    return ParallelReader(reader=reader, **kwargs)
+
+
+def test_multiprocess_matches_serial():
+    parallel = get_parallel()
+    serial = [record for blob in BLOBS for record in parallel(blob, [])]
+    processed = list(processed_reader(parallel, BLOBS, [], processes=2))
+    assert len(processed) == len(serial) == 50, len(processed)
+    key = lambda r: (r["userid"], r["tweet"])
+    assert sorted(processed, key=key) == sorted(serial, key=key)
+
+
+def test_multiprocess_filters_and_projects_in_workers():
+    parallel = get_parallel(
+        columns=Evaluator("username, followers"),
+        filters=DnfFilters([("username", "==", "NBCNews")]),
+    )
+    processed = list(processed_reader(parallel, BLOBS, [], processes=2, page_size=5))
+    assert len(processed) == 44, len(processed)
+    assert all(set(r.keys()) == {"username", "followers"} for r in processed)
+
+
+def test_multiprocess_small_in_flight_budget():
+    parallel = get_parallel()
+    processed = list(processed_reader(parallel, BLOBS * 3, [], processes=1, blobs_in_flight=1))
+    assert len(processed) == 150, len(processed)
+
+
+def test_multiprocess_partial_aggregation():
+    aggregations = [("COUNT", "*"), ("MAX", "followers"), ("AVG", "followers")]
+    expected = list(
+        GroupBy(
+            Reader(inner_reader=DiskReader, dataset="tests/data/tweets/", raw_path=True),
+            "username",
+        ).aggregate(aggregations)
+    )
+    for multiprocess in (False, True):
+        reader = Reader(
+            inner_reader=DiskReader,
+            dataset="tests/data/tweets/",
+            raw_path=True,
+            multiprocess=multiprocess,
+            reducer=partial_aggregator("username", aggregations),
+        )
+        combined = list(GroupBy(reader, "username").aggregate_partials(aggregations))
+        assert combined == expected, multiprocess
+
+
+if __name__ == "__main__":  # pragma: no cover
+    from tests.helpers.runner import run_tests
+
+    run_tests()
@@ -0,0 +1,75 @@
+import os
+import sys
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+from mabel.adapters.disk import DiskReader
+from mabel.data import Reader
+from mabel.data.readers.internals.blob_prefetcher import BlobPrefetcher
+from mabel.data.readers.internals.cursor import Cursor
+from rich import traceback
+from tests.helpers.counting_reader import CountingReader
+
+traceback.install()
+
+BLOBS = ["tests/data/tweets/tweets-0000.jsonl", "tests/data/tweets/tweets-0001.jsonl"]
+
+
+def test_prefetched_bytes_are_used():
+    CountingReader.reset()
+    reader = CountingReader(dataset="tests/data/tweets/", partitions=None)
+    prefetcher = BlobPrefetcher(reader, blobs=2)
+    prefetcher.prefetch(BLOBS)
+    for blob in BLOBS:
+        assert prefetcher.read_blob(blob).read() == open(blob, "rb").read()
+    # each blob was only downloaded once
+    assert sorted(CountingReader.bytes_read) == BLOBS, CountingReader.bytes_read
+    prefetcher.close()
+
+
+def test_prefetch_respects_window_and_budget():
+    reader = CountingReader(dataset="tests/data/tweets/", partitions=None)
+
+    prefetcher = BlobPrefetcher(reader, blobs=1)
+    prefetcher.prefetch(BLOBS)
+    assert list(prefetcher._futures.keys()) == BLOBS[:1]
+    prefetcher.close()
+
+    prefetcher = BlobPrefetcher(reader, blobs=2, byte_budget=1)
+    prefetcher.prefetch(BLOBS[:1])
+    prefetcher._futures[BLOBS[0]].result()
+    # the budget is exhausted by the first blob, so the second isn't started
+    prefetcher.prefetch(BLOBS)
+    assert list(prefetcher._futures.keys()) == BLOBS[:1]
+    prefetcher.read_blob(BLOBS[0])
+    assert prefetcher._held_bytes == 0
+    prefetcher.close()
+
+
+def test_prefetch_disabled():
+    reader = CountingReader(dataset="tests/data/tweets/", partitions=None)
+    prefetcher = BlobPrefetcher(reader, blobs=0)
+    prefetcher.prefetch(BLOBS)
+    assert prefetcher._futures == {}
+    assert prefetcher.read_blob(BLOBS[0]).read() == open(BLOBS[0], "rb").read()
+
+
+def test_upcoming_blobs_follow_cursor_order():
+    cursor = Cursor(readable_blobs=["c", "a", "b", "d"])
+    assert cursor.next_blob() == "a"
+    assert cursor.upcoming_blobs(2) == ["b", "c"]
+    assert cursor.next_blob("a") == "b"
+    assert cursor.upcoming_blobs(5) == ["c", "d"]
+
+
+def test_reader_with_and_without_prefetch():
+    with_prefetch = Reader(
+        inner_reader=DiskReader, dataset="tests/data/tweets", raw_path=True, prefetch=2
+    )
+    without_prefetch = Reader(inner_reader=DiskReader, dataset="tests/data/tweets", raw_path=True)
+    assert list(with_prefetch) == list(without_prefetch)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    from tests.helpers.runner import run_tests
+
+    run_tests()
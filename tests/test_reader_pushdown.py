@@ -0,0 +1,110 @@
+import io
+import os
+import sys
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+import pyarrow
+import pyarrow.parquet as pq
+from mabel.adapters.disk import DiskReader
+from mabel.data import Reader
+from mabel.data.internals.dnf_filters import DnfFilters
+from mabel.data.readers.internals import decompressors
+from mabel.data.readers.internals import pushdown
+from mabel.data.readers.internals.inline_evaluator import Evaluator
+from rich import traceback
+
+traceback.install()
+
+FOLDER = "_temp/pushdown"
+
+
+def make_parquet():
+    table = pyarrow.Table.from_pydict(
+        {
+            "id": list(range(1000)),
+            "name": [f"name-{i}" for i in range(1000)],
+            "group": [i % 7 for i in range(1000)],
+            "payload": ["x" * 20] * 1000,
+        }
+    )
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer, row_group_size=100)
+    buffer.seek(0)
+    return buffer
+
+
+def test_projection_from_evaluator():
+    assert pushdown.get_projection(Evaluator("id, name")) == ["id", "name"]
+    assert pushdown.get_projection(Evaluator("HASH(name) AS h, id")) == ["name", "id"]
+    assert pushdown.get_projection(Evaluator("*")) is None
+    assert pushdown.get_projection(Evaluator("id, *")) is None
+    assert pushdown.get_projection(lambda x: x) is None
+
+
+def test_selection_from_dnf():
+    assert pushdown.get_selection(DnfFilters(("id", "=", 1))) == [[("id", "==", 1)]]
+    assert pushdown.get_selection(DnfFilters([("id", ">", 1), ("name", "like", "a%")])) == [
+        [("id", ">", 1)]
+    ]
+    # one side of the OR can't be pushed, so nothing can be
+    assert pushdown.get_selection(DnfFilters([[("id", ">", 1)], [("name", "like", "a%")]])) is None
+    assert pushdown.get_selection(DnfFilters([[("id", ">", 1)], [("id", "in", (3, 4))]])) == [
+        [("id", ">", 1)],
+        [("id", "in", [3, 4])],
+    ]
+    assert pushdown.get_selection(DnfFilters([("id", "=", None)])) is None
+    assert pushdown.get_selection(DnfFilters(None)) is None
+
+
+def test_parquet_projection():
+    records = list(decompressors.parquet(make_parquet(), projection=["id", "missing"]))
+    assert len(records) == 1000
+    assert all(set(r.keys()) == {"id"} for r in records)
+
+
+def test_parquet_selection():
+    records = list(
+        decompressors.parquet(make_parquet(), selection=[[("id", ">=", 950), ("group", "==", 3)]])
+    )
+    assert sorted(r["id"] for r in records) == [i for i in range(950, 1000) if i % 7 == 3]
+    # filters on columns which aren't in the file are ignored
+    records = list(decompressors.parquet(make_parquet(), selection=[[("missing", "==", 3)]]))
+    assert len(records) == 1000
+    # filters which can't be applied fallback to unfiltered reads
+    records = list(decompressors.parquet(make_parquet(), selection=[[("id", "==", "one")]]))
+    assert len(records) == 1000
+
+
+def test_reader_with_pushdown():
+    os.makedirs(FOLDER, exist_ok=True)
+    with open(f"{FOLDER}/data.parquet", "wb") as file:
+        file.write(make_parquet().read())
+
+    reader = Reader(
+        inner_reader=DiskReader,
+        dataset=FOLDER,
+        raw_path=True,
+        select="id, name",
+        filters=[("group", "==", 3), ("id", "<", 100)],
+    )
+    records = list(reader)
+    # the filters are applied after the projection, so the pushed filters must not
+    # change the result
+    assert records == []
+
+    reader = Reader(
+        inner_reader=DiskReader,
+        dataset=FOLDER,
+        raw_path=True,
+        select="id, group",
+        filters=[("group", "==", 3), ("id", "<", 100)],
+    )
+    records = list(reader)
+    assert sorted(r["id"] for r in records) == [i for i in range(100) if i % 7 == 3]
+    assert all(set(r.keys()) == {"id", "group"} for r in records)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    from tests.helpers.runner import run_tests
+
+    run_tests()
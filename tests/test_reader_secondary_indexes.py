@@ -0,0 +1,148 @@
+"""
+Test the secondary indexes written by the writers are used to only read the rows
+which can match equality filters.
+"""
+
+import glob
+import os
+import shutil
+import sys
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+from rich import traceback
+
+from mabel.data.internals.secondary_index import SecondaryIndex
+from mabel.data.internals.secondary_index import rows_for_filter
+from tests.helpers.counting_reader import CountingReader
+from tests.helpers.counting_reader import read_dataset
+from tests.helpers.counting_reader import write_dataset
+
+traceback.install()
+
+FOLDER = "_temp/secondary_indexes"
+SCHEMA = [
+    {"name": "id", "type": "INTEGER"},
+    {"name": "user", "type": "VARCHAR"},
+    {"name": "score", "type": "INTEGER"},
+]
+
+
+def write_data(format, index_on=["user", "score"]):
+    records = ({"id": i, "user": f"user-{i % 97}", "score": i % 7} for i in range(2000))
+    write_dataset(FOLDER, records, format=format, schema=SCHEMA, blob_size=20000, index_on=index_on)
+
+
+def read(filters, **kwargs):
+    return sorted(record["id"] for record in read_dataset(FOLDER, filters, **kwargs))
+
+
+def test_secondary_index():
+    index = SecondaryIndex.build(["a", "b", None, "a", 1, 2.0, True])
+    assert index.lookup("a") == [0, 3]
+    assert index.lookup("b") == [1]
+    assert index.lookup("c") == []
+    # equal values are found, whatever their type
+    assert index.lookup(1.0) == [4, 6]
+    assert index.lookup(2) == [5]
+
+    index = SecondaryIndex.deserialize(index.serialize())
+    assert index.lookup("a") == [0, 3]
+    assert SecondaryIndex.deserialize(b"not an index") is None
+
+    get_index = {"a": index}.get
+    assert rows_for_filter(("a", "=", "a"), get_index) == {0, 3}
+    assert rows_for_filter(("a", "in", ["a", "b"]), get_index) == {0, 1, 3}
+    assert rows_for_filter([("a", "=", "a"), ("a", "!=", "b")], get_index) == {0, 3}
+    assert rows_for_filter([("a", "=", "a"), ("b", "=", "b")], get_index) == {0, 3}
+    assert rows_for_filter([[("a", "=", "a")], [("a", "=", "b")]], get_index) == {0, 1, 3}
+    # we can't use the index if we need to read rows which aren't in the index
+    assert rows_for_filter([[("a", "=", "a")], [("b", "=", "b")]], get_index) is None
+    assert rows_for_filter(("a", ">", "a"), get_index) is None
+    assert rows_for_filter(("b", "=", "a"), get_index) is None
+
+
+def test_indexes_written():
+    for format in ("jsonl", "zstd", "parquet"):
+        write_data(format)
+        blobs = glob.glob(FOLDER + f"/**/*.{format}", recursive=True)
+        assert len(blobs) > 1, format
+        for blob in blobs:
+            assert os.path.exists(f"{blob}.user.idx"), blob
+            assert os.path.exists(f"{blob}.score.idx"), blob
+    shutil.rmtree(FOLDER, ignore_errors=True)
+
+
+def test_indexed_reads_match_full_reads():
+    filters = [
+        ("user", "=", "user-7"),
+        ("user", "in", ["user-7", "user-70", "user-700"]),
+        [("user", "=", "user-7"), ("score", "==", 3)],
+        [[("user", "=", "user-7")], [("score", "=", 1)]],
+        [[("user", "=", "user-7")], [("id", "<", 50)]],
+        ("user", "=", "nobody"),
+    ]
+    for format in ("jsonl", "zstd", "parquet"):
+        write_data(format, index_on=[])
+        expected = [read(f) for f in filters]
+        write_data(format)
+        for engine in ("python", "arrow"):
+            for f, e in zip(filters, expected):
+                assert read(f, engine=engine) == e, (format, engine, f)
+    shutil.rmtree(FOLDER, ignore_errors=True)
+
+
+def test_only_matching_rows_are_read():
+    write_data("jsonl")
+    blobs = glob.glob(FOLDER + "/**/*.jsonl", recursive=True)
+
+    # no rows match, so no blobs are read
+    assert read(("user", "=", "nobody")) == []
+    assert CountingReader.blobs_read == []
+    assert CountingReader.ranges_read == []
+
+    # the matching rows are read without reading the rest of the blobs, none of
+    # the rows are next to each other so each row is read separately
+    assert read(("user", "=", "user-7")) == list(range(7, 2000, 97))
+    assert CountingReader.blobs_read == []
+    assert len(CountingReader.ranges_read) == len(range(7, 2000, 97))
+
+    # filters the indexes can't be used for read the blobs
+    assert read(("score", "<", 1)) == list(range(0, 2000, 7))
+    assert len(CountingReader.blobs_read) == len(blobs)
+    shutil.rmtree(FOLDER, ignore_errors=True)
+
+
+def test_flat_indexed_read():
+    records = ({"id": i, "a": {"b": i}} for i in range(10))
+    write_dataset(FOLDER, records, format="flat", schema=False, index_on=["a.b", "missing"])
+
+    # the nested values are indexed as they're written, columns without any values
+    # aren't indexed
+    blobs = glob.glob(FOLDER + "/**/*.flat", recursive=True)
+    assert all(os.path.exists(f"{blob}.a.b.idx") for blob in blobs), blobs
+    assert not any(os.path.exists(f"{blob}.missing.idx") for blob in blobs), blobs
+
+    assert read(("a.b", "==", 3)) == [3]
+    assert read(("missing", "==", 3)) == []
+    shutil.rmtree(FOLDER, ignore_errors=True)
+
+
+def test_resume_indexed_read():
+    write_data("jsonl")
+    expected = list(range(5, 2000, 97))
+
+    def get_reader(cursor=None):
+        return read_dataset(FOLDER, ("user", "=", "user-5"), cursor=cursor)
+
+    first_reader = get_reader()
+    first = [next(first_reader)["id"] for i in range(8)]
+    rest = [record["id"] for record in get_reader(str(first_reader.cursor))]
+    assert sorted(first + rest) == expected
+    assert len(first + rest) == len(expected)
+    shutil.rmtree(FOLDER, ignore_errors=True)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    from tests.helpers.runner import run_tests
+
+    run_tests()
@@ -50,9 +50,9 @@ def test_sql_returned_rows():
         {"statement":"SELECT COUNT(*) FROM (SELECT user_name FROM tests.data.index.is GROUP BY user_name)", "result":1},
         {"statement":"SELECT MAX(user_name) FROM tests.data.index.is", "result":1},
         {"statement":"SELECT AVG(followers) FROM tests.data.index.is", "result":1},
-        {"statement":"SELECT * FROM tests.data.index.is ORDER BY user_name", "result":10000}, # ORDER BY is 10000 record limited
-        {"statement":"SELECT * FROM tests.data.index.is ORDER BY user_name ASC", "result":10000},  # ORDER BY is 10000 record limited
-        {"statement":"SELECT * FROM tests.data.index.is ORDER BY user_name DESC", "result":10000},  # ORDER BY is 10000 record limited
+        {"statement":"SELECT * FROM tests.data.index.is ORDER BY user_name", "result":65499},
+        {"statement":"SELECT * FROM tests.data.index.is ORDER BY user_name ASC", "result":65499},
+        {"statement":"SELECT * FROM tests.data.index.is ORDER BY user_name DESC", "result":65499},
         {"statement":"SELECT COUNT(user_id) FROM tests.data.index.is", "result":1},
         {"statement":"SELECT * FROM tests.data.index.is WHERE user_id > 1000000", "result":65475},
         {"statement":"SELECT * FROM tests.data.index.is WHERE followers > 100.0", "result":49601},
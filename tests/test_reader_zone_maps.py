@@ -0,0 +1,184 @@
+import datetime
+import glob
+import os
+import sys
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+import orjson
+import pyarrow
+from mabel.data.internals import zone_maps
+from rich import traceback
+from tests.helpers.counting_reader import CountingReader
+from tests.helpers.counting_reader import read_dataset
+from tests.helpers.counting_reader import write_dataset
+
+traceback.install()
+
+FOLDER = "_temp/zone_maps"
+SCHEMA = [
+    {"name": "id", "type": "INTEGER"},
+    {"name": "name", "type": "VARCHAR"},
+    {"name": "when", "type": "TIMESTAMP"},
+]
+
+
+def write_data(format):
+    records = (
+        {
+            "id": i,
+            "name": f"name-{i:04}",
+            "when": datetime.datetime(2022, 1, 1) + datetime.timedelta(hours=i),
+        }
+        for i in range(1000)
+    )
+    write_dataset(FOLDER, records, format=format, schema=SCHEMA, blob_size=4000)
+
+
+def read(filters):
+    return list(read_dataset(FOLDER, filters))
+
+
+def test_profile_table():
+    table = pyarrow.Table.from_pylist(
+        [{"a": 1, "b": "x", "c": None, "d": 1.5}, {"a": 3, "b": None, "c": None, "d": float("nan")}]
+    )
+    zone_map = zone_maps.profile_table(table)
+    assert zone_map["records"] == 2
+    assert zone_map["columns"]["a"] == {"type": "int64", "nulls": 0, "min": 1, "max": 3}
+    assert zone_map["columns"]["b"] == {"type": "string", "nulls": 1, "min": "x", "max": "x"}
+    assert "min" not in zone_map["columns"]["c"]
+    # NaNs can't be used to prune
+    assert "min" not in zone_map["columns"]["d"]
+
+
+def test_zone_map_builder():
+    table = pyarrow.Table.from_pylist(
+        [{"a": i, "b": str(i % 7) if i > 50 else None, "d": float(i)} for i in range(100)]
+    )
+    builder = zone_maps.ZoneMapBuilder()
+    for batch in table.to_batches(max_chunksize=30):
+        builder.add(pyarrow.Table.from_batches([batch]))
+    # building the zone map from parts is the same as from the whole table
+    assert builder.zone_map() == zone_maps.profile_table(table)
+    assert builder.zone_map()["columns"]["b"] == {
+        "type": "string",
+        "nulls": 51,
+        "min": "0",
+        "max": "6",
+    }
+
+    builder.add(pyarrow.Table.from_pylist([{"a": 200, "d": float("nan")}]))
+    zone_map = builder.zone_map()
+    assert zone_map["records"] == 101
+    assert zone_map["columns"]["a"]["max"] == 200
+    assert zone_map["columns"]["b"]["nulls"] == 52
+    assert "min" not in zone_map["columns"]["d"]
+
+
+def test_record_zone_map_builder():
+    records = [
+        {"a": i, "b": str(i % 7) if i > 50 else None, "d": float(i), "e": i % 2 == 0}
+        for i in range(100)
+    ]
+    builder = zone_maps.RecordZoneMapBuilder()
+    for record in records:
+        builder.add(record)
+    # the zone map is the same as the one built by pyarrow
+    assert builder.zone_map() == zone_maps.profile_table(pyarrow.Table.from_pylist(records))
+
+    when = datetime.datetime(2022, 1, 1)
+    builder.add({"a": 200.5, "d": float("nan"), "e": 1, "t": when, "s": "x" * 100})
+    zone_map = builder.zone_map()
+    assert zone_map["records"] == 101
+    # ints and floats are compared, NaNs and different types can't be used to prune
+    assert zone_map["columns"]["a"] == {"type": "double", "nulls": 0, "min": 0, "max": 200.5}
+    assert zone_map["columns"]["b"]["nulls"] == 52
+    assert "min" not in zone_map["columns"]["d"]
+    assert "min" not in zone_map["columns"]["e"]
+    assert zone_map["columns"]["t"]["nulls"] == 100
+    assert zone_maps.excludes(("t", "<", when), zone_map)
+    # long strings aren't kept
+    assert "min" not in zone_map["columns"]["s"]
+
+
+def test_excludes():
+    zone_map = {
+        "records": 10,
+        "columns": {
+            "a": {"type": "int64", "nulls": 0, "min": 10, "max": 20},
+            "b": {"type": "null", "nulls": 10},
+            "t": {
+                "type": "timestamp[us]",
+                "nulls": 0,
+                "min": "2022-01-01T00:00:00",
+                "max": "2022-01-02T00:00:00",
+            },
+        },
+    }
+    assert zone_maps.excludes(("a", "=", 5), zone_map)
+    assert not zone_maps.excludes(("a", "=", 15), zone_map)
+    assert zone_maps.excludes(("a", ">", 20), zone_map)
+    assert not zone_maps.excludes(("a", ">=", 20), zone_map)
+    assert zone_maps.excludes(("a", "<", 10), zone_map)
+    assert zone_maps.excludes(("a", "in", (1, 2, 30)), zone_map)
+    assert not zone_maps.excludes(("a", "like", "1%"), zone_map)
+    # comparing different types doesn't prune
+    assert not zone_maps.excludes(("a", "=", "15"), zone_map)
+    # null and missing columns never match
+    assert zone_maps.excludes(("b", "=", 1), zone_map)
+    assert zone_maps.excludes(("z", "=", 1), zone_map)
+    assert zone_maps.excludes(("t", ">", datetime.datetime(2022, 1, 3)), zone_map)
+    # ANDs prune if any predicate prunes, ORs only if all do
+    assert zone_maps.excludes([("a", "=", 5), ("a", "=", 15)], zone_map)
+    assert not zone_maps.excludes([[("a", "=", 5)], [("a", "=", 15)]], zone_map)
+    assert zone_maps.excludes([[("a", "=", 5)], [("a", "=", 25)]], zone_map)
+    assert not zone_maps.excludes([("a", "=", 15)], None)
+
+
+def test_zone_maps_prune_reads():
+    for format in ("jsonl", "zstd", "parquet"):
+        write_data(format)
+        manifests = glob.glob(f"{FOLDER}/**/*.manifest", recursive=True)
+        assert len(manifests) == 1, manifests
+        with open(manifests[0], "rb") as manifest:
+            assert len(orjson.loads(manifest.read())) > 4
+
+        all_records = read(None)
+        all_blobs = len(CountingReader.blobs_read)
+        assert len(all_records) == 1000
+
+        records = read([("id", ">=", 990)])
+        assert sorted(r["id"] for r in records) == list(range(990, 1000)), format
+        assert len(CountingReader.blobs_read) == 1, (format, CountingReader.blobs_read)
+
+        records = read([[("id", "<", 2)], [("name", "in", ("name-0500", "name-9999"))]])
+        assert sorted(r["id"] for r in records) == [0, 1, 500], format
+        assert len(CountingReader.blobs_read) == 2, (format, CountingReader.blobs_read)
+
+        records = read([("id", "=", 5000)])
+        assert records == []
+        assert len(CountingReader.blobs_read) == 0
+
+        # predicates which can't be used to prune are ignored
+        records = read([("id", "<", 100), ("name", "like", "%5")])
+        assert len(records) == 10
+        assert 0 < len(CountingReader.blobs_read) < all_blobs
+
+
+def test_zone_maps_with_projections():
+    write_data("jsonl")
+    # the filters are applied after the projection, to keys which aren't in the
+    # zone maps, so the zone maps can't be used to prune
+    records = list(read_dataset(FOLDER, [("UPPER(name)", "==", "NAME-0005")], select="UPPER(name)"))
+    assert records == [{"UPPER(name)": "NAME-0005"}], records
+
+    # selecting columns doesn't change them, so the zone maps are still used
+    records = list(read_dataset(FOLDER, [("id", "=", 5)], select="id, name"))
+    assert records == [{"id": 5, "name": "name-0005"}], records
+    assert len(CountingReader.blobs_read) == 1, CountingReader.blobs_read
+
+
+if __name__ == "__main__":  # pragma: no cover
+    from tests.helpers.runner import run_tests
+
+    run_tests()
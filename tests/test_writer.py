@@ -113,6 +113,281 @@ def test_write_to_path_logged():
     print(nw.finalize())
 
 
+def write_records(format, bulk, blob_size=64 * 1024):
+    shutil.rmtree("_temp", ignore_errors=True)
+    records = [{"name": f"name{i}", "value": i, "flag": i % 2 == 0} for i in range(25000)]
+    w = Writer(
+        inner_writer=DiskWriter,
+        dataset="_temp",
+        format=format,
+        blob_size=blob_size,
+        schema=[
+            {"name": "name", "type": "VARCHAR"},
+            {"name": "value", "type": "INTEGER"},
+            {"name": "flag", "type": "BOOLEAN"},
+        ],
+    )
+    if bulk:
+        assert w.append_many(iter(records)) == 25000
+    else:
+        for record in records:
+            w.append(record)
+    w.finalize()
+    blobs = sorted(glob.glob(f"_temp/**/*.{format}", recursive=True))
+    return records, blobs
+
+
+def test_writer_append_many():
+    for format in ("jsonl", "zstd", "parquet"):
+        records, blobs = write_records(format, bulk=False)
+        if format != "parquet":
+            # the same blobs are written as when appending one at a time
+            expected = [open(blob, "rb").read() for blob in blobs]
+            records, blobs = write_records(format, bulk=True)
+            assert [open(blob, "rb").read() for blob in blobs] == expected, format
+        else:
+            records, blobs = write_records(format, bulk=True)
+        assert len(blobs) > 1, blobs
+
+        r = Reader(inner_reader=DiskReader, dataset="_temp")
+        read = sorted(r, key=lambda record: record["value"])
+        assert read == records, format
+        shutil.rmtree("_temp", ignore_errors=True)
+
+
+def test_writer_append_table():
+    import pyarrow
+
+    records, blobs = write_records("parquet", bulk=True)
+    table = pyarrow.Table.from_pylist(records)
+    for format in ("parquet", "jsonl"):
+        shutil.rmtree("_temp", ignore_errors=True)
+        w = Writer(
+            inner_writer=DiskWriter,
+            dataset="_temp",
+            format=format,
+            schema=[
+                {"name": "name", "type": "VARCHAR"},
+                {"name": "value", "type": "INTEGER"},
+                {"name": "flag", "type": "BOOLEAN"},
+            ],
+        )
+        # mixing the ways of appending keeps the records in order
+        w.append(records[0])
+        assert w.append_table(table.slice(1, 9999)) == 9999
+        w.append_many(records[10000:20000])
+        w.append_table(table.slice(20000))
+        w.finalize()
+        r = Reader(inner_reader=DiskReader, dataset="_temp")
+        assert list(r) == records, format
+    shutil.rmtree("_temp", ignore_errors=True)
+
+
+def test_writer_parquet_row_groups():
+    from pyarrow import parquet
+
+    from mabel.data.writers.internals import blob_writer
+
+    row_group_size = blob_writer.ROW_GROUP_SIZE
+    blob_writer.ROW_GROUP_SIZE = 1000
+    try:
+        shutil.rmtree("_temp", ignore_errors=True)
+        w = Writer(
+            inner_writer=DiskWriter,
+            dataset="_temp",
+            format="parquet",
+            schema=[
+                {"name": "name", "type": "VARCHAR"},
+                {"name": "value", "type": "INTEGER"},
+                {"name": "extra", "type": "STRUCT"},
+            ],
+            index_on=["name"],
+        )
+        records = [
+            {"name": f"name-{i % 10}", "value": i, "extra": {"one": "1"}} for i in range(4500)
+        ]
+        records.append({"name": "name-0", "value": 4500, "extra": {"two": "2"}})
+        w.append_many(records[:10])
+        for record in records[10:]:
+            w.append(record)
+        w.finalize()
+    finally:
+        blob_writer.ROW_GROUP_SIZE = row_group_size
+
+    blobs = sorted(glob.glob("_temp/**/*.parquet", recursive=True))
+    assert len(blobs) == 2, blobs
+    # the records are written a row group at a time
+    assert parquet.ParquetFile(blobs[0]).num_row_groups == 4
+    assert parquet.ParquetFile(blobs[0]).metadata.num_rows == 4000
+    # the type of the struct changed in the last row group, so it's in a new blob
+    assert parquet.ParquetFile(blobs[1]).metadata.num_rows == 501
+
+    r = Reader(inner_reader=DiskReader, dataset="_temp")
+    assert [record["value"] for record in r] == list(range(4501))
+    # the zone maps and indexes cover all of the row groups
+    r = Reader(inner_reader=DiskReader, dataset="_temp", filters=("value", ">=", 4400))
+    assert len(list(r)) == 101
+    r = Reader(inner_reader=DiskReader, dataset="_temp", filters=("name", "=", "name-3"))
+    assert len(list(r)) == 450
+    shutil.rmtree("_temp", ignore_errors=True)
+
+
+def test_writer_parquet_row_group_bytes(monkeypatch):
+    import orso
+    from pyarrow import parquet
+
+    from mabel.data.writers.internals import blob_writer
+
+    def nbytes(self):
+        raise AssertionError("the WAL size is estimated, not measured")
+
+    # each record is about 1000 bytes, so there are about 100 in a row group
+    monkeypatch.setattr(blob_writer, "ROW_GROUP_BYTES", 100000)
+    monkeypatch.setattr(orso.DataFrame, "nbytes", nbytes)
+    shutil.rmtree("_temp", ignore_errors=True)
+    w = Writer(
+        inner_writer=DiskWriter,
+        dataset="_temp",
+        format="parquet",
+        schema=[{"name": "value", "type": "INTEGER"}, {"name": "text", "type": "VARCHAR"}],
+    )
+    for i in range(1000):
+        w.append({"value": i, "text": "x" * 1000})
+    w.finalize()
+
+    blobs = glob.glob("_temp/**/*.parquet", recursive=True)
+    assert len(blobs) == 1, blobs
+    assert 8 <= parquet.ParquetFile(blobs[0]).num_row_groups <= 12
+    r = Reader(inner_reader=DiskReader, dataset="_temp")
+    assert [record["value"] for record in r] == list(range(1000))
+    shutil.rmtree("_temp", ignore_errors=True)
+
+
+class SlowWriter(DiskWriter):
+    """
+    Records how many data blobs are being committed at the same time
+    """
+
+    active = 0
+    most_active = 0
+    fail_on = None
+    lock = __import__("threading").Lock()
+
+    def commit(self, byte_data, override_blob_name=None):
+        import time
+
+        if override_blob_name and not override_blob_name.endswith(".jsonl"):
+            # indexes, row offsets and manifests
+            return super().commit(byte_data, override_blob_name)
+        with SlowWriter.lock:
+            SlowWriter.active += 1
+            SlowWriter.most_active = max(SlowWriter.most_active, SlowWriter.active)
+            SlowWriter.fail_on = None if SlowWriter.fail_on is None else SlowWriter.fail_on - 1
+            fail = SlowWriter.fail_on == 0
+        time.sleep(0.05)
+        try:
+            if fail:
+                raise OSError("Unable to write blob")
+            return super().commit(byte_data, override_blob_name)
+        finally:
+            with SlowWriter.lock:
+                SlowWriter.active -= 1
+
+
+def background_writer(commit_workers):
+    shutil.rmtree("_temp", ignore_errors=True)
+    return Writer(
+        inner_writer=SlowWriter,
+        dataset="_temp",
+        format="jsonl",
+        blob_size=16 * 1024,
+        schema=["name", "value"],
+        index_on=["name"],
+        bloom_on=["value"],
+        commit_workers=commit_workers,
+    )
+
+
+def write_in_background(w, records):
+    w.append_many(records[:5000])
+    for record in records[5000:]:
+        w.append(record)
+    w.finalize()
+
+
+def test_writer_background_commits():
+    records = [{"name": f"name{i % 100}", "value": i} for i in range(10000)]
+    write_in_background(background_writer(0), records)
+    blobs = sorted(glob.glob("_temp/**/*.jsonl", recursive=True))
+    expected = [open(blob, "rb").read() for blob in blobs]
+    assert len(expected) > 10
+
+    for commit_workers in (1, 3):
+        SlowWriter.most_active = 0
+        write_in_background(background_writer(commit_workers), records)
+        # no more than the number of workers are committed at a time
+        assert SlowWriter.most_active == commit_workers, SlowWriter.most_active
+        # the same blobs are written, the blobs are named in the order they were written
+        blobs = sorted(glob.glob("_temp/**/*.jsonl", recursive=True))
+        assert [open(blob, "rb").read() for blob in blobs] == expected
+
+        r = Reader(inner_reader=DiskReader, dataset="_temp", filters=("name", "=", "name7"))
+        assert len(list(r)) == 100
+    shutil.rmtree("_temp", ignore_errors=True)
+
+
+def test_writer_background_commit_errors():
+    import pytest
+
+    records = [{"name": f"name{i % 100}", "value": i} for i in range(10000)]
+    w = background_writer(2)
+    SlowWriter.fail_on = 2
+    with pytest.raises(OSError):
+        write_in_background(w, records)
+    SlowWriter.fail_on = None
+    # the error is only raised once, the records in the current blob are written
+    w.finalize()
+    shutil.rmtree("_temp", ignore_errors=True)
+
+
+def test_writer_background_blob_names(monkeypatch):
+    from mabel.adapters.google import google_cloud_storage_writer
+
+    uploaded = []
+
+    class Blob:
+        def __init__(self, name):
+            self.name = name
+
+        def upload_from_string(self, data, content_type=None):
+            uploaded.append(self.name)
+
+    class Bucket:
+        def blob(self, name):
+            return Blob(name)
+
+    monkeypatch.setattr(
+        google_cloud_storage_writer, "get_gcs_bucket", lambda bucket, credentials: Bucket()
+    )
+    w = Writer(
+        inner_writer=google_cloud_storage_writer.GoogleCloudStorageWriter,
+        dataset="bucket/folder",
+        format="jsonl",
+        blob_size=16 * 1024,
+        schema=["name", "value"],
+        commit_workers=2,
+    )
+    for i in range(5000):
+        w.append({"name": f"name{i % 100}", "value": i})
+    w.finalize()
+
+    blobs = [name for name in uploaded if name.endswith(".jsonl")]
+    assert len(blobs) > 2, blobs
+    # the names are in the bucket, they don't include it
+    assert all(name.startswith("folder/") for name in uploaded), uploaded
+    assert len(set(blobs)) == len(blobs)
+
+
 def get_data():
     r = Reader(inner_reader=DiskReader, dataset="tests/data/tweets", raw_path=True)
     return r
@@ -60,6 +60,20 @@ def test_blobs():
     w.finalize()
 
 
+def test_append_many_schema_error():
+    shutil.rmtree("_temp", ignore_errors=True)
+    w = BatchWriter(inner_writer=DiskWriter, date=datetime.datetime.utcnow().date(), **dataset)
+    records = [{"character": f"c{i}", "persona": f"p{i}"} for i in range(100)]
+    records[60] = {"persona": "Jackie Daytona"}
+    with pytest.raises(DataValidationError) as err:
+        w.append_many(records)
+    assert "character" in str(err)
+    # the records before the invalid record are written
+    assert w.records == 60
+    w.finalize()
+    shutil.rmtree("_temp", ignore_errors=True)
+
+
 if __name__ == "__main__":  # pragma: no cover
     from tests.helpers.runner import run_tests
 
@@ -51,6 +51,27 @@ def test_writer_backout():
     assert len(list(r)) == 8
 
 
+def test_writer_backout_append_many():
+    if Path(TEST_FOLDER).exists():  # pragma: no cover
+        shutil.rmtree(TEST_FOLDER)
+
+    w = StreamWriter(
+        dataset=TEST_FOLDER,
+        inner_writer=DiskWriter,
+        format="zstd",
+        schema=SCHEMA,
+        idle_timeout_seconds=1,
+    )
+
+    assert w.append_many(DATA_SET) == 10
+
+    time.sleep(4)
+
+    r = Reader(dataset=TEST_FOLDER, inner_reader=DiskReader)
+
+    assert len(list(r)) == 8
+
+
 if __name__ == "__main__":  # pragma: no cover
     from tests.helpers.runner import run_tests
 